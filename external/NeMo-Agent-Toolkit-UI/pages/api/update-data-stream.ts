@@ -109,7 +109,30 @@ export default function handler(req: NextApiRequest, res: NextApiResponse) {
 
   // PATCH method for updating entry processing status
   if (req.method === 'PATCH') {
-    const { uuid, pending } = req.body;
+    const { uuid, uuids, pending } = req.body;
+
+    // Bulk update of several entries
+    if (Array.isArray(uuids)) {
+      const uuidSet = new Set<string>(uuids);
+      const missing = new Set<string>(uuids);
+      let updated = 0;
+      for (const entry of finalizedEntries) {
+        if (entry.uuid && uuidSet.has(entry.uuid)) {
+          entry.pending = pending;
+          missing.delete(entry.uuid);
+          updated++;
+        }
+      }
+      if (missing.size > 0) {
+        // Report the entries not exported yet so that the caller can retry them
+        return res.status(404).json({
+          error: 'Entries not found.',
+          updated,
+          missing: Array.from(missing)
+        });
+      }
+      return res.status(200).json({ success: true, updated });
+    }
 
     if (!uuid) {
       return res.status(400).json({ error: 'UUID is required.' });
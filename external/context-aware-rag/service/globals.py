@@ -13,4 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-DEFAULT_CONFIG_PATH = "/app/config/config.yaml"
+import os
+
+# Config used by /init and /update_config requests that do not pass one
+DEFAULT_CONFIG_PATH = os.environ.get("CA_RAG_CONFIG", "/app/config/config.yaml")
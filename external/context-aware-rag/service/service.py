@@ -14,11 +14,20 @@
 # limitations under the License.
 
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
+import asyncio
 import os
 import yaml
 import json
 from vss_ctx_rag.context_manager import ContextManager
 from vss_ctx_rag.utils.ctx_rag_logger import logger
+from vss_ctx_rag.utils.ctx_rag_loop_monitor import PACKAGE_DIR, loop_monitor_from_env
+from vss_ctx_rag.utils.utils import load_dc_docs
+from vss_ctx_rag.utils.ctx_rag_metrics import (
+    merge_snapshots,
+    registry,
+    render_prometheus,
+)
 from .models import (
     AddRequest,
     RequestInfo,
@@ -39,17 +48,28 @@ common_router = APIRouter()
 data_ingest_router = APIRouter()
 data_retrieval_router = APIRouter()
 dev_router = APIRouter()
+dev_ingest_router = APIRouter()
 
 
 class AppState:
     def __init__(self):
         self.ctx_mgr = None
         self.req_info = RequestInfo()
+        self.loop_monitor = loop_monitor_from_env(
+            "service",
+            attribute_paths=(PACKAGE_DIR, os.path.dirname(os.path.abspath(__file__))),
+        )
 
 
 app_state = AppState()
 
 
+@app.on_event("startup")
+async def start_loop_monitor():
+    if app_state.loop_monitor:
+        app_state.loop_monitor.start()
+
+
 @common_router.post("/init")
 async def init_context_manager(init_request: InitRequest):
     try:
@@ -133,6 +153,24 @@ async def call_endpoint(call_request: CallRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@data_retrieval_router.post("/call_stream")
+async def call_stream_endpoint(call_request: CallRequest):
+    check_context_manager()
+
+    def event_stream():
+        try:
+            for event in app_state.ctx_mgr.call_stream(call_request.state):
+                if "error" in event:
+                    yield f"event: error\ndata: {json.dumps(event['error'])}\n\n"
+                else:
+                    yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+        except Exception as e:
+            traceback.print_exc()
+            yield f"event: error\ndata: {json.dumps(str(e))}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @common_router.post("/update_config")
 async def update_config(config_request: UpdateConfigRequest):
     check_context_manager()
@@ -177,58 +215,46 @@ async def health_check():
     return {"status": "success", "message": "Service is healthy"}
 
 
-@dev_router.get("/add_doc_from_dc")
+@common_router.get("/metrics")
+async def metrics():
+    """Prometheus metrics of the service and its context manager process"""
+    snapshots = [registry.snapshot()]
+    if app_state.ctx_mgr is not None:
+        snapshot = await asyncio.to_thread(app_state.ctx_mgr.metrics)
+        if snapshot:
+            snapshots.append(snapshot)
+    return PlainTextResponse(
+        render_prometheus(merge_snapshots(snapshots)),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+@dev_router.get("/debug/event-loop")
+async def event_loop_report(max_sites: int = 20):
+    """Event loop lag and the code sites that stalled the loops of the service
+    and of its context manager process, with the most stalled time first"""
+    report = {
+        "service": (
+            app_state.loop_monitor.report(max_sites) if app_state.loop_monitor else None
+        ),
+        "context_manager": None,
+    }
+    if app_state.ctx_mgr is not None:
+        context_manager_report = await asyncio.to_thread(
+            app_state.ctx_mgr.event_loop_report
+        )
+        if context_manager_report:
+            context_manager_report["sites"] = context_manager_report["sites"][:max_sites]
+        report["context_manager"] = context_manager_report
+    return report
+
+
+@dev_ingest_router.get("/add_doc_from_dc")
 async def add_doc_from_dc(dc_file_path: DCFileRequest):
     check_context_manager()
     try:
-        data_list = []
-        file_path = dc_file_path.dc_file_path
-        with open(file_path, "r") as file:
-            for line in file:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    data = json.loads(line)
-                    formatted_dict = {
-                        "vlm_response": data.get("vlm_response", ""),
-                        "frame_times": data.get("frame_times", []),
-                        "chunk": data.get("chunk", {}),
-                        "streamId": data.get("chunk", {}).get("streamId", ""),
-                        "chunkIdx": data.get("chunk", {}).get("chunkIdx", None),
-                        "file": data.get("chunk", {}).get("file", ""),
-                        "pts_offset_ns": 0,
-                        "start_pts": data.get("chunk", {}).get("start_pts", None),
-                        "end_pts": data.get("chunk", {}).get("end_pts", None),
-                        "start_ntp": data.get("chunk", {}).get("start_ntp", ""),
-                        "end_ntp": data.get("chunk", {}).get("end_ntp", ""),
-                        "start_ntp_float": data.get("chunk", {}).get(
-                            "start_ntp_float", None
-                        ),
-                        "end_ntp_float": data.get("chunk", {}).get(
-                            "end_ntp_float", None
-                        ),
-                        "is_first": data.get("chunk", {}).get("is_first", False),
-                        "is_last": data.get("chunk", {}).get("is_last", False),
-                        "uuid": "",
-                        "cv_meta": "[]",
-                    }
-                    data_list.append(formatted_dict)
-                except json.JSONDecodeError as e:
-                    logger.info(
-                        f"Skipping invalid JSON line: {line[:100]}... Error: {e}"
-                    )
-        for vlm_chunk in data_list:
-            doc_meta = {
-                _key: _val
-                for _key, _val in vlm_chunk.items()
-                if _key != "vlm_response" and _key != "frame_times" and _key != "chunk"
-            }
-            app_state.ctx_mgr.add_doc(
-                vlm_chunk["vlm_response"],
-                doc_i=vlm_chunk["chunkIdx"],
-                doc_meta=doc_meta,
-            )
+        for doc, doc_i, doc_meta in load_dc_docs(dc_file_path.dc_file_path):
+            app_state.ctx_mgr.add_doc(doc, doc_i=doc_i, doc_meta=doc_meta)
 
         app_state.ctx_mgr.call({"chat": {"post_process": True}})
         return {"status": "success", "message": "Documents added"}
@@ -240,9 +266,12 @@ async def add_doc_from_dc(dc_file_path: DCFileRequest):
 
 app.include_router(common_router)
 
+enable_dev = str(os.environ.get("VIA_CTX_RAG_ENABLE_DEV")).lower() in ["true", "1"]
 if str(os.environ.get("VIA_CTX_RAG_ENABLE_RET")).lower() in ["true", "1"]:
     app.include_router(data_retrieval_router)
 else:
     app.include_router(data_ingest_router)
-    if str(os.environ.get("VIA_CTX_RAG_ENABLE_DEV")).lower() in ["true", "1"]:
-        app.include_router(dev_router)
+    if enable_dev:
+        app.include_router(dev_ingest_router)
+if enable_dev:
+    app.include_router(dev_router)
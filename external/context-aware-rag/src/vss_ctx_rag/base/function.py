@@ -15,6 +15,7 @@
 
 """function.py: File contains Function class"""
 
+import asyncio
 from typing import Optional
 from vss_ctx_rag.base import Tool
 from vss_ctx_rag.utils.ctx_rag_logger import logger
@@ -97,6 +98,21 @@ class Function:
         result = await self.aprocess_doc(doc, doc_i, doc_meta)
         return result
 
+    async def askip_doc_(
+        self, doc: str, doc_i: int, doc_meta: Optional[dict] = None
+    ):
+        if not self.is_setup:
+            raise RuntimeError("Function not setup. Call done()!")
+        if doc_meta is None:
+            doc_meta = {}
+        return await self.askip_doc(doc, doc_i, doc_meta)
+
+    async def astream_(self, state: dict):
+        if not self.is_setup:
+            raise RuntimeError("Function not setup. Call done()!")
+        async for event in self.astream(state):
+            yield event
+
     # Update top_p, temperature, max_tokens for functions
     def update_llm(self, **params):
         """Updates LLM parameters (top_p, temperature, max_tokens) for the function.
@@ -184,6 +200,18 @@ class Function:
     async def areset(self, state: dict):
         pass
 
+    async def aclose(self):
+        """Close the sub-functions and tools of the function, once it is no
+        longer used"""
+        results = await asyncio.gather(
+            *[f.aclose() for f in self._functions.values()],
+            *[t.aclose() for t in self._tools.values() if isinstance(t, Tool)],
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error closing {self.name}: {result}")
+
     # TODO: change the function definition.
     # Pass **config, **tools, **functions instead of this
     # Or even better add _config, _tools and _functions in self and
@@ -211,6 +239,23 @@ class Function:
         """
         raise RuntimeError("`call` method not Implemented!")
 
+    async def astream(self, state: dict):
+        """Streaming variant of acall. Yields events as dicts with an "event"
+        name and its "data":
+
+        - "context": retrieval metadata (e.g. citations), sent before generation
+        - "token": a piece of the response text
+        - "done": the complete response, always the last event
+
+        Functions that cannot stream fall back to this implementation, which
+        sends the result of acall as a single "done" event.
+
+        Args:
+            state (dict): This is the dict of the state
+        """
+        state = await self.acall(state)
+        yield {"event": "done", "data": state.get("response")}
+
     async def aprocess_doc(self, doc: str, doc_i: int, doc_meta: dict):
         """This method is called every time a doc is added to
         the Context Manager. The function has the option to process the
@@ -222,3 +267,15 @@ class Function:
             meta (dict): document metadata
         """
         pass
+
+    async def askip_doc(self, doc: str, doc_i: int, doc_meta: dict):
+        """This method is called instead of aprocess_doc for a doc the
+        Context Manager dropped before ingestion, such as a near duplicate.
+        Functions that group docs by index count it as an empty slot.
+
+        Args:
+            doc (str): document
+            i (int): document index
+            meta (dict): document metadata
+        """
+        pass
@@ -23,3 +23,7 @@ class Tool:
 
     def __init__(self, name) -> None:
         self.name = name
+
+    async def aclose(self):
+        """Release the resources held by the tool, e.g. pooled connections"""
+        pass
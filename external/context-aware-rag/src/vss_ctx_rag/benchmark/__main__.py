@@ -0,0 +1,290 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of document ingestion and retrieval, with stubbed backends
+
+Replays a dense caption JSONL recording, or a synthetic document stream, and a
+question set through a ContextManagerHandler. The results can be saved as JSON
+and compared against a baseline run, exiting non-zero on a regression:
+
+    python -m vss_ctx_rag.benchmark --output results.json
+    python -m vss_ctx_rag.benchmark --baseline results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+from datetime import datetime, timezone
+
+import yaml
+
+from vss_ctx_rag.benchmark.runner import (
+    DEFAULT_BENCHMARK_CONFIG,
+    SCENARIOS,
+    run_scenario,
+)
+from vss_ctx_rag.benchmark.stubs import StubBackends
+from vss_ctx_rag.benchmark.workload import (
+    DEFAULT_QUESTIONS,
+    load_questions,
+    save_dc_docs,
+    synthetic_docs,
+)
+from vss_ctx_rag.utils.ctx_rag_logger import logger
+from vss_ctx_rag.utils.utils import load_dc_docs
+
+# (phase, metric path, higher is better) compared against the baseline
+COMPARED_METRICS = (
+    ("ingest", "docs_per_sec", True),
+    ("post_process", "sec", False),
+    ("summarization", "sec", False),
+    ("questions", "latency.p50", False),
+    ("questions", "latency.p99", False),
+    ("total", "stall_sec", False),
+)
+# Absolute increase of a duration, in seconds, below which it is not a regression
+MIN_REGRESSION_SEC = 0.01
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark of the context-aware RAG ingestion and retrieval paths"
+    )
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=list(SCENARIOS),
+        default=["vector-rag"],
+        help="Retrieval functions to benchmark. The graph scenarios need a Neo4j "
+        "server, set with GRAPH_DB_URI, GRAPH_DB_USERNAME and GRAPH_DB_PASSWORD",
+    )
+    parser.add_argument(
+        "--docs",
+        type=str,
+        default=None,
+        help="Dense caption JSONL recording to replay, as read by /add_doc_from_dc",
+    )
+    parser.add_argument(
+        "--synthetic-docs",
+        type=int,
+        default=200,
+        help="Number of synthetic documents, when no recording is given",
+    )
+    parser.add_argument("--streams", type=int, default=4)
+    parser.add_argument("--words-per-doc", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--save-docs",
+        type=str,
+        default=None,
+        help="Save the replayed documents as dense caption JSONL",
+    )
+    parser.add_argument(
+        "--questions",
+        type=str,
+        default=None,
+        help="Question file, one per line or JSONL with a question key",
+    )
+    parser.add_argument(
+        "--question-rounds",
+        type=int,
+        default=4,
+        help="Times the question set is asked",
+    )
+    parser.add_argument("--question-concurrency", type=int, default=1)
+    parser.add_argument(
+        "--doc-rate",
+        type=float,
+        default=0.0,
+        help="Documents submitted per second, 0 to submit all at once",
+    )
+    parser.add_argument(
+        "--config",
+        type=str,
+        default=None,
+        help="CA-RAG config file, to benchmark its function parameters. "
+        "Its models are replaced by the stubs",
+    )
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0)
+    parser.add_argument(
+        "--llm-tokens-per-sec",
+        type=float,
+        default=0.0,
+        help="Generation speed of the LLM stub, 0 for none",
+    )
+    parser.add_argument("--llm-output-tokens", type=int, default=64)
+    parser.add_argument("--embedding-latency-ms", type=float, default=10.0)
+    parser.add_argument("--reranker-latency-ms", type=float, default=20.0)
+    parser.add_argument(
+        "--db-latency-ms",
+        type=float,
+        default=0.0,
+        help="Latency added to every vector DB insert and query",
+    )
+    parser.add_argument("--loop-interval-ms", type=float, default=10.0)
+    parser.add_argument(
+        "--stall-threshold-ms",
+        type=float,
+        default=50.0,
+        help="Event loop lag counted as a stall",
+    )
+    parser.add_argument("--output", type=str, default="ca_rag_benchmark_results.json")
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        default=None,
+        help="Results of a previous run to compare against",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="Relative change versus the baseline reported as a regression",
+    )
+    return parser.parse_args()
+
+
+def _get(result, path):
+    for key in path.split("."):
+        if not isinstance(result, dict):
+            return None
+        result = result.get(key)
+    return result
+
+
+async def run(args) -> dict:
+    if args.docs:
+        docs = load_dc_docs(args.docs)
+    else:
+        docs = synthetic_docs(
+            args.synthetic_docs, args.streams, args.words_per_doc, seed=args.seed
+        )
+    if args.save_docs:
+        save_dc_docs(args.save_docs, docs)
+    questions = load_questions(args.questions) if args.questions else DEFAULT_QUESTIONS
+    questions = questions * args.question_rounds
+
+    base_config = DEFAULT_BENCHMARK_CONFIG
+    if args.config:
+        with open(args.config) as f:
+            base_config = yaml.safe_load(f)
+    backends = StubBackends(
+        llm_latency_sec=args.llm_latency_ms / 1e3,
+        llm_tokens_per_sec=args.llm_tokens_per_sec,
+        llm_output_tokens=args.llm_output_tokens,
+        embedding_latency_sec=args.embedding_latency_ms / 1e3,
+        reranker_latency_sec=args.reranker_latency_ms / 1e3,
+        db_latency_sec=args.db_latency_ms / 1e3,
+    )
+
+    results = []
+    for scenario in args.scenarios:
+        if SCENARIOS[scenario][0] == "graph-rag" and not os.getenv("GRAPH_DB_URI"):
+            logger.warning(f"Skipping {scenario}, GRAPH_DB_URI is not set")
+            continue
+        result = await run_scenario(
+            scenario,
+            docs,
+            questions,
+            backends,
+            base_config=base_config,
+            doc_rate=args.doc_rate,
+            question_concurrency=args.question_concurrency,
+            loop_interval=args.loop_interval_ms / 1e3,
+            stall_threshold=args.stall_threshold_ms / 1e3,
+        )
+        phases = ("ingest", "post_process", "summarization", "questions")
+        result["total"] = {
+            "stall_sec": sum(result[p]["event_loop"]["stall_sec"] for p in phases),
+            "max_lag_sec": max(result[p]["event_loop"]["max_lag_sec"] for p in phases),
+        }
+        results.append(result)
+        log_result(result)
+    return {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "system": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "workload": {
+            "docs": args.docs or "synthetic",
+            "doc_count": len(docs),
+            "questions": len(questions),
+            "doc_rate": args.doc_rate,
+            "question_concurrency": args.question_concurrency,
+        },
+        "backends": vars(backends),
+        "results": results,
+    }
+
+
+def log_result(result):
+    ingest, questions = result["ingest"], result["questions"]
+    latency = questions["latency"] or {}
+    logger.info(
+        f"{result['scenario']}: ingest {ingest['docs_per_sec']:.1f} docs/s "
+        f"({ingest['errors']} errors), post-process {result['post_process']['sec']:.2f} s, "
+        f"summarization {result['summarization']['sec']:.2f} s, "
+        f"question p50 {latency.get('p50', 0):.3f} s p99 {latency.get('p99', 0):.3f} s "
+        f"({questions['errors']} errors), event loop stalled "
+        f"{result['total']['stall_sec']:.3f} s, max lag {result['total']['max_lag_sec']:.3f} s"
+    )
+
+
+def compare(report, baseline, tolerance):
+    """Log changes versus a baseline report, returning the number of regressions"""
+    previous = {r["scenario"]: r for r in baseline["results"]}
+    regressions = 0
+    for result in report["results"]:
+        before = previous.get(result["scenario"])
+        if before is None:
+            continue
+        for phase, path, higher_is_better in COMPARED_METRICS:
+            old, new = _get(before[phase], path), _get(result[phase], path)
+            if old is None or new is None:
+                continue
+            if higher_is_better:
+                regressed = new < old * (1 - tolerance)
+            else:
+                regressed = new > old * (1 + tolerance) + MIN_REGRESSION_SEC
+            change = f"{100 * (new / old - 1):+.1f}%" if old else f"{old} -> {new}"
+            message = f"{result['scenario']} {phase} {path}: {change}"
+            if regressed:
+                regressions += 1
+                logger.warning(f"REGRESSION {message}")
+            else:
+                logger.info(message)
+    return regressions
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = asyncio.run(run(args))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Saved results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.tolerance):
+            sys.exit(1)
@@ -0,0 +1,174 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Cold import time of the service and context manager entry points
+
+Every module is imported in a fresh interpreter, as in a newly spawned context
+manager process. The import time is compared against a budget, exiting non-zero
+when it is exceeded or a module fails to import, and the packages that take the
+most time are listed:
+
+    python -m vss_ctx_rag.benchmark.imports
+    python -m vss_ctx_rag.benchmark.imports --budget vss_ctx_rag.context_manager=800
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from vss_ctx_rag.utils.ctx_rag_logger import logger
+
+# Module -> import time budget in milliseconds, None to only report it.
+# vss_ctx_rag.context_manager is imported by the service and by every context
+# manager process before it reads its config, so the functions, storage
+# backends and LLM clients must stay off its import path.
+IMPORT_BUDGETS_MS = {
+    "vss_ctx_rag.context_manager": 1000,
+    "vss_ctx_rag.context_manager.context_manager_handler": 1500,
+    # Loaded by the handler when the config enables them. They pull in the
+    # LangChain clients, so the budgets only catch a new heavy dependency.
+    "vss_ctx_rag.functions.summarization": 3000,
+    "vss_ctx_rag.functions.rag.vector_rag.vector_retrieval_func": 3000,
+    "vss_ctx_rag.functions.rag.graph_rag.graph_retrieval_func": 3000,
+    "vss_ctx_rag.functions.rag.adv_graph_rag.adv_graph_rag_func": 3000,
+    "vss_ctx_rag.tools.storage.memory_db": None,
+    "vss_ctx_rag.tools.storage.milvus_db": None,
+    "vss_ctx_rag.tools.storage.neo4j_db": None,
+}
+
+_TIMED_IMPORT = (
+    "import time; start = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def measure_import(module: str) -> Dict:
+    """Wall time of importing `module` in a fresh interpreter, and the self
+    time of the top-level packages it imported, from -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _TIMED_IMPORT.format(module=module)],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()
+        return {"error": error[-1] if error else f"exit code {result.returncode}"}
+    packages = defaultdict(float)
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:") :].split("|")
+        try:
+            self_us = int(fields[0])
+        except ValueError:
+            continue
+        packages[fields[2].strip().split(".")[0]] += self_us / 1e3
+    return {
+        "ms": float(result.stdout.strip().splitlines()[-1]) * 1e3,
+        "packages_ms": dict(packages),
+    }
+
+
+def measure(modules: List[str], repeat: int, top: int) -> Dict[str, Dict]:
+    """Median import time of each module over `repeat` cold imports"""
+    results = {}
+    for module in modules:
+        runs = [measure_import(module) for _ in range(repeat)]
+        errors = [run["error"] for run in runs if "error" in run]
+        if errors:
+            results[module] = {"error": errors[0]}
+            continue
+        packages = defaultdict(list)
+        for run in runs:
+            for package, ms in run["packages_ms"].items():
+                packages[package].append(ms)
+        heaviest = sorted(
+            ((package, statistics.median(ms)) for package, ms in packages.items()),
+            key=lambda item: -item[1],
+        )
+        results[module] = {
+            "ms": statistics.median(run["ms"] for run in runs),
+            "top_packages_ms": dict(heaviest[:top]),
+        }
+    return results
+
+
+def check(results: Dict[str, Dict], budgets: Dict[str, Optional[float]]) -> int:
+    """Log each module against its budget, returning the number exceeded or failing.
+    A module that fails to import counts even without a budget."""
+    exceeded = 0
+    for module, result in results.items():
+        budget = budgets.get(module)
+        if "error" in result:
+            exceeded += 1
+            logger.error(f"{module}: import failed: {result['error']}")
+            continue
+        top = ", ".join(f"{p} {ms:.0f}" for p, ms in result["top_packages_ms"].items())
+        message = f"{module}: {result['ms']:.0f} ms"
+        if budget is not None:
+            message += f" (budget {budget:.0f} ms)"
+        message += f", top packages (ms): {top}"
+        if budget is not None and result["ms"] > budget:
+            exceeded += 1
+            logger.warning(f"OVER BUDGET {message}")
+        else:
+            logger.info(message)
+    return exceeded
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Cold import time of the context-aware RAG modules"
+    )
+    parser.add_argument(
+        "--modules",
+        nargs="+",
+        default=list(IMPORT_BUDGETS_MS),
+        help="Modules to import, the entry points and functions by default",
+    )
+    parser.add_argument(
+        "--budget",
+        nargs="+",
+        default=[],
+        metavar="MODULE=MS",
+        help="Override the import time budget of a module",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--top", type=int, default=5, help="Slowest packages listed per module"
+    )
+    parser.add_argument("--output", type=str, default=None)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    budgets = dict(IMPORT_BUDGETS_MS)
+    for entry in args.budget:
+        module, ms = entry.split("=", 1)
+        budgets[module] = float(ms)
+
+    results = measure(args.modules, args.repeat, args.top)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"budgets_ms": budgets, "results": results}, f, indent=2)
+    if check(results, budgets):
+        sys.exit(1)
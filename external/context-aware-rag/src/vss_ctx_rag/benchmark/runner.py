@@ -0,0 +1,280 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""runner.py: Replays a workload through a ContextManagerHandler with stubbed backends"""
+
+import asyncio
+import copy
+import os
+import time
+from typing import Dict, List, Optional
+
+from vss_ctx_rag.benchmark.stubs import StubBackends, stub_calls
+from vss_ctx_rag.benchmark.workload import Doc
+from vss_ctx_rag.context_manager.context_manager_handler import ContextManagerHandler
+from vss_ctx_rag.tools.llm import LLMTool
+from vss_ctx_rag.tools.storage import Neo4jGraphDB
+from vss_ctx_rag.utils.ctx_rag_logger import logger
+from vss_ctx_rag.utils.ctx_rag_loop_monitor import EventLoopMonitor
+from vss_ctx_rag.utils.ctx_rag_metrics import registry
+from vss_ctx_rag.utils.utils import RequestInfo
+
+# Scenario name -> (chat rag type, chain-of-thought graph retrieval)
+SCENARIOS = {
+    "vector-rag": ("vector-rag", False),
+    "graph-rag": ("graph-rag", False),
+    "adv-graph-rag": ("graph-rag", True),
+}
+
+# Model names and URLs are unused, every backend is stubbed
+_STUB_LLM = {"model": "benchmark/stub", "base_url": "http://stub"}
+_STUB_EMBEDDING = {"model": "benchmark/stub-embedding", "base_url": "http://stub"}
+_STUB_RERANKER = {"model": "benchmark/stub-reranker", "base_url": "http://stub"}
+
+DEFAULT_BENCHMARK_CONFIG = {
+    "api_key": "benchmark",
+    "summarization": {
+        "enable": True,
+        "method": "batch",
+        "llm": dict(_STUB_LLM),
+        "embedding": dict(_STUB_EMBEDDING),
+        "params": {"batch_size": 5, "batch_max_concurrency": 20},
+        "prompts": {
+            "caption": "Write a concise and clear dense caption for the provided transcript.",
+            "caption_summarization": "Summarize the transcripts as bullet points.",
+            "summary_aggregation": "Aggregate the following summaries as bullet points.",
+        },
+    },
+    "chat": {
+        "rag": "vector-rag",
+        "params": {"batch_size": 1, "top_k": 5, "fast_path": True},
+        "llm": dict(_STUB_LLM),
+        "embedding": dict(_STUB_EMBEDDING),
+        "reranker": dict(_STUB_RERANKER),
+    },
+    "notification": {"enable": False},
+}
+
+
+class BenchmarkHandler(ContextManagerHandler):
+    """ContextManagerHandler whose LLMs, embeddings, reranker and vector DB are stubs.
+
+    The graph scenarios still need a Neo4j server (GRAPH_DB_URI,
+    GRAPH_DB_USERNAME and GRAPH_DB_PASSWORD), only its embeddings are stubbed.
+    """
+
+    def __init__(self, config: Dict, backends: StubBackends, req_info: RequestInfo):
+        self.backends = backends
+        super().__init__(config, 0, req_info)
+        # Documents are not exported to a frontend
+        self.frontend_client = None
+
+    def _create_llm(self, api_key: str, llm_params: Dict) -> LLMTool:
+        return LLMTool(self.backends.chat_model())
+
+    def _create_vector_db(self, config: Dict, chat_config: Dict, collection_name: str):
+        return self.backends.vector_db(collection_name)
+
+    def _create_graph_db(self, chat_config: Dict) -> Neo4jGraphDB:
+        return Neo4jGraphDB(
+            url=self.neo4j_uri,
+            username=self.neo4j_username,
+            password=self.neo4j_password,
+            embeddings=self.backends.embeddings(),
+        )
+
+
+def scenario_config(base_config: Dict, scenario: str) -> Dict:
+    rag, cot = SCENARIOS[scenario]
+    config = copy.deepcopy(base_config)
+    config.setdefault("api_key", "benchmark")
+    config["notification"] = {"enable": False}
+    chat_config = config["chat"]
+    chat_config["rag"] = rag
+    chat_config.setdefault("advanced_features", {})["cot"] = cot
+    # The in-memory vector DB only serves the retrieval fast path
+    chat_config.setdefault("params", {})["fast_path"] = True
+    return config
+
+
+def distribution(values: List[float]) -> Optional[Dict]:
+    """Count, mean and nearest-rank quantiles"""
+    if not values:
+        return None
+    ordered = sorted(values)
+
+    def quantile(q):
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "p50": quantile(0.5),
+        "p90": quantile(0.9),
+        "p99": quantile(0.99),
+        "max": ordered[-1],
+    }
+
+
+class _Phase:
+    """Times a phase, with the event loop lag and stall sites, stage durations and
+    stub calls within it"""
+
+    def __init__(self, monitor: EventLoopMonitor):
+        self.monitor = monitor
+
+    def __enter__(self):
+        registry.reset()
+        self.monitor.reset()
+        self.start = time.perf_counter()
+        self.result = {}
+        return self.result
+
+    def __exit__(self, exc_type, exc, tb):
+        self.result["sec"] = time.perf_counter() - self.start
+        self.result["event_loop"] = self.monitor.stats()
+        self.result["stall_sites"] = self.monitor.report(max_sites=5)["sites"]
+        self.result["stub_calls"] = {
+            labels[0]: cell[0] for labels, cell in stub_calls.collect().items()
+        }
+        self.result["stages"] = registry.summary()
+
+
+async def _ingest(handler: BenchmarkHandler, docs: List[Doc], doc_rate: float) -> Dict:
+    latencies = []
+    errors = 0
+
+    async def process(doc, doc_i, doc_meta):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            await handler.aprocess_doc(doc, doc_i, doc_meta)
+        except Exception as e:
+            errors += 1
+            logger.error(f"Benchmark: processing doc {doc_i} failed: {e}")
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    tasks = []
+    for i, (doc, doc_i, doc_meta) in enumerate(docs):
+        if doc_rate > 0:
+            delay = start + i / doc_rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        tasks.append(
+            asyncio.create_task(process(doc, doc_i, copy.deepcopy(doc_meta)))
+        )
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    return {
+        "docs": len(docs),
+        "errors": errors,
+        "docs_per_sec": len(docs) / elapsed if elapsed > 0 else None,
+        "doc_latency": distribution(latencies),
+    }
+
+
+async def _ask(handler: BenchmarkHandler, questions: List[str], concurrency: int) -> Dict:
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def ask(question):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                result = await handler.call(
+                    {
+                        "chat": {
+                            "question": question,
+                            "is_live": False,
+                            "is_last": False,
+                        }
+                    }
+                )
+                if not result["chat"].get("response"):
+                    errors += 1
+            except Exception as e:
+                errors += 1
+                logger.error(f"Benchmark: question {question!r} failed: {e}")
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(ask(question) for question in questions))
+    return {"questions": len(questions), "errors": errors, "latency": distribution(latencies)}
+
+
+async def run_scenario(
+    scenario: str,
+    docs: List[Doc],
+    questions: List[str],
+    backends: StubBackends,
+    base_config: Dict = DEFAULT_BENCHMARK_CONFIG,
+    doc_rate: float = 0.0,
+    question_concurrency: int = 1,
+    loop_interval: float = 0.01,
+    stall_threshold: float = 0.05,
+) -> Dict:
+    """
+    Run the ingestion, post-processing, summarization and question phases of
+    one scenario on a fresh handler. Documents are submitted at `doc_rate`
+    per second, or all at once when it is 0.
+    """
+    config = scenario_config(base_config, scenario)
+    req_info = RequestInfo(
+        uuid=f"benchmark_{scenario.replace('-', '_')}_{os.getpid()}",
+        caption_summarization_prompt="",
+        summary_aggregation_prompt="",
+    )
+    handler = BenchmarkHandler(config, backends, req_info)
+    monitor = EventLoopMonitor(
+        interval=loop_interval,
+        stall_threshold=stall_threshold,
+        name="benchmark",
+        capture_stacks=True,
+    )
+    monitor.start()
+    result = {"scenario": scenario}
+    try:
+        with _Phase(monitor) as phase:
+            phase.update(await _ingest(handler, docs, doc_rate))
+        result["ingest"] = phase
+
+        with _Phase(monitor) as phase:
+            await handler.call({"chat": {"post_process": True}})
+        result["post_process"] = phase
+
+        doc_indices = [doc_i for _, doc_i, _ in docs if doc_i is not None]
+        with _Phase(monitor) as phase:
+            summary = await handler.call(
+                {
+                    "summarization": {
+                        "start_index": min(doc_indices, default=0),
+                        "end_index": -1,
+                    }
+                }
+            )
+            phase["error"] = summary["summarization"].get("error_code")
+        result["summarization"] = phase
+
+        with _Phase(monitor) as phase:
+            phase.update(await _ask(handler, questions, question_concurrency))
+        result["questions"] = phase
+    finally:
+        await monitor.stop()
+        await handler.areset(
+            {"summarization": {"expr": "pk > 0"}, "chat": {"expr": "pk > 0"}}
+        )
+    return result
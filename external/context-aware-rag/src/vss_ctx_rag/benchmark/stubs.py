@@ -0,0 +1,285 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""stubs.py: LLM, embedding, reranker and vector DB stand-ins with configurable latency"""
+
+import asyncio
+import json
+import math
+import re
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+    Callbacks,
+)
+from langchain_core.documents import BaseDocumentCompressor, Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from vss_ctx_rag.tools.storage import InMemoryDBTool
+from vss_ctx_rag.utils.ctx_rag_metrics import registry
+
+_WORD_PATTERN = re.compile(r"[A-Za-z][A-Za-z0-9]{3,}")
+
+stub_calls = registry.counter(
+    "ca_rag_benchmark_stub_calls_total",
+    "Requests served by the benchmark stubs",
+    ("backend",),
+)
+stub_items = registry.counter(
+    "ca_rag_benchmark_stub_items_total",
+    "Tokens generated by the LLM stub, texts embedded and documents reranked",
+    ("backend",),
+)
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_PATTERN.findall(text)
+
+
+def stub_response(prompt: str, output_tokens: int) -> str:
+    """
+    Response of the LLM stub, built from the words of the prompt.
+
+    Prompts asking for JSON get a reply in the format the calling function
+    parses: the graph extraction list of relationships, the question analyses
+    of the advanced graph retrieval and its answer object. Other prompts get
+    `output_tokens` words.
+    """
+    words = _words(prompt) or ["nothing"]
+    text = " ".join(words[i % len(words)] for i in range(output_tokens))
+    if "head_type" in prompt:
+        # LLMGraphTransformer without tool calling, the chunk follows "Text:"
+        chunk_words = _words(prompt.rsplit("Text:", 1)[-1])
+        entities = list(dict.fromkeys(word.lower() for word in chunk_words))[:8]
+        return json.dumps(
+            [
+                {
+                    "head": head,
+                    "head_type": "Entity",
+                    "relation": "RELATED_TO",
+                    "tail": tail,
+                    "tail_type": "Entity",
+                }
+                for head, tail in zip(entities, entities[1:])
+            ]
+        )
+    if "updated_question" in prompt:
+        return json.dumps(
+            {
+                "description": text,
+                "answer": text,
+                "updated_question": None,
+                "confidence": 1.0,
+            }
+        )
+    if "temporal_strategy" in prompt:
+        return json.dumps({"temporal_strategy": "none"})
+    if "retrieval_strategy" in prompt:
+        return json.dumps(
+            {
+                "entity_types": [],
+                "relationships": [],
+                "location_references": [],
+                "stream_ids": [],
+                "retrieval_strategy": "similarity",
+            }
+        )
+    return text
+
+
+class StubChatModel(BaseChatModel):
+    """
+    Chat model answering from the prompt after a fixed latency plus the time
+    to generate `output_tokens` at `tokens_per_sec` (0 for no generation time).
+    """
+
+    latency_sec: float = 0.0
+    tokens_per_sec: float = 0.0
+    output_tokens: int = 64
+
+    @property
+    def _llm_type(self) -> str:
+        return "benchmark-stub"
+
+    def _respond(self, messages: List[BaseMessage]):
+        prompt = "\n".join(str(message.content) for message in messages)
+        content = stub_response(prompt, self.output_tokens)
+        delay = self.latency_sec
+        if self.tokens_per_sec > 0:
+            delay += self.output_tokens / self.tokens_per_sec
+        stub_calls.inc("llm")
+        stub_items.inc("llm", amount=self.output_tokens)
+        result = ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+        return result, delay
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        result, delay = self._respond(messages)
+        time.sleep(delay)
+        return result
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        result, delay = self._respond(messages)
+        await asyncio.sleep(delay)
+        return result
+
+
+class StubEmbeddings(Embeddings):
+    """Normalized bag-of-words vectors, with words hashed to dimensions"""
+
+    def __init__(self, latency_sec: float = 0.0, dimensions: int = 1024):
+        self.latency_sec = latency_sec
+        self.dimensions = dimensions
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for word in _words(text.lower()):
+            vector[zlib.crc32(word.encode()) % self.dimensions] += 1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def _embed_all(self, texts: List[str]) -> List[List[float]]:
+        stub_calls.inc("embedding")
+        stub_items.inc("embedding", amount=len(texts))
+        return [self._embed(text) for text in texts]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.latency_sec)
+        return self._embed_all(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        await asyncio.sleep(self.latency_sec)
+        return self._embed_all(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+
+class StubReranker(BaseDocumentCompressor):
+    """Keeps the `top_n` documents sharing the most words with the query"""
+
+    top_n: int = 5
+    latency_sec: float = 0.0
+
+    def _rerank(self, documents: Sequence[Document], query: str) -> List[Document]:
+        stub_calls.inc("reranker")
+        stub_items.inc("reranker", amount=len(documents))
+        query_words = set(_words(query.lower()))
+        scored = []
+        for doc in documents:
+            overlap = len(query_words.intersection(_words(doc.page_content.lower())))
+            scored.append(
+                Document(
+                    page_content=doc.page_content,
+                    metadata={**doc.metadata, "relevance_score": float(overlap)},
+                )
+            )
+        scored.sort(key=lambda doc: -doc.metadata["relevance_score"])
+        return scored[: self.top_n]
+
+    def compress_documents(
+        self,
+        documents: Sequence[Document],
+        query: str,
+        callbacks: Optional[Callbacks] = None,
+    ) -> Sequence[Document]:
+        time.sleep(self.latency_sec)
+        return self._rerank(documents, query)
+
+    async def acompress_documents(
+        self,
+        documents: Sequence[Document],
+        query: str,
+        callbacks: Optional[Callbacks] = None,
+    ) -> Sequence[Document]:
+        await asyncio.sleep(self.latency_sec)
+        return self._rerank(documents, query)
+
+
+class StubVectorDB(InMemoryDBTool):
+    """In-memory vector DB adding `latency_sec` to every insert and query"""
+
+    def __init__(self, collection_name, latency_sec: float = 0.0, **kwargs):
+        super().__init__(collection_name, **kwargs)
+        self.latency_sec = latency_sec
+
+    def _add_documents(self, docs):
+        time.sleep(self.latency_sec)
+        stub_calls.inc("vector_db")
+        return super()._add_documents(docs)
+
+    def _select(self, expr):
+        time.sleep(self.latency_sec)
+        stub_calls.inc("vector_db")
+        return super()._select(expr)
+
+
+@dataclass
+class StubBackends:
+    """Latencies and sizes of the stubbed backends, in seconds"""
+
+    llm_latency_sec: float = 0.2
+    llm_tokens_per_sec: float = 0.0
+    llm_output_tokens: int = 64
+    embedding_latency_sec: float = 0.01
+    embedding_dimensions: int = 1024
+    reranker_latency_sec: float = 0.02
+    reranker_top_n: int = 5
+    db_latency_sec: float = 0.0
+
+    def chat_model(self) -> StubChatModel:
+        return StubChatModel(
+            latency_sec=self.llm_latency_sec,
+            tokens_per_sec=self.llm_tokens_per_sec,
+            output_tokens=self.llm_output_tokens,
+        )
+
+    def embeddings(self) -> StubEmbeddings:
+        return StubEmbeddings(self.embedding_latency_sec, self.embedding_dimensions)
+
+    def reranker(self) -> StubReranker:
+        return StubReranker(
+            top_n=self.reranker_top_n, latency_sec=self.reranker_latency_sec
+        )
+
+    def vector_db(self, collection_name: str) -> StubVectorDB:
+        return StubVectorDB(
+            collection_name,
+            latency_sec=self.db_latency_sec,
+            embedding=self.embeddings(),
+            reranker=self.reranker(),
+        )
@@ -0,0 +1,104 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""workload.py: Document streams and question sets replayed by the benchmark"""
+
+import json
+import random
+from typing import List, Optional, Tuple
+
+# (doc, doc_i, doc_meta), as passed to ContextManagerHandler.aprocess_doc
+Doc = Tuple[str, Optional[int], dict]
+
+_VOCABULARY = (
+    "alpha bravo charlie delta echo foxtrot unit engine ladder medic dispatch "
+    "copy roger affirmative negative standby north south east west street avenue "
+    "bridge station tower harbor airport highway traffic weather wind rain heavy "
+    "report status arrival departure vehicle truck patrol team sector zone "
+    "checkpoint perimeter incident cleared responding enroute onscene available "
+    "returning hold proceed caution advise"
+).split()
+
+DEFAULT_QUESTIONS = [
+    "Summarize the traffic on all channels.",
+    "Which units responded to an incident?",
+    "What was reported about the weather?",
+    "Was any vehicle stopped at a checkpoint?",
+    "Which sectors were cleared?",
+]
+
+
+def synthetic_docs(
+    count: int,
+    streams: int = 1,
+    words_per_doc: int = 40,
+    doc_duration_sec: float = 10.0,
+    seed: int = 0,
+) -> List[Doc]:
+    """
+    Radio-like transcripts interleaved across `streams`, in the dense caption
+    metadata format. Documents are numbered in arrival order, and only the last
+    one is flagged `is_last`, so that summarization batches stay contiguous.
+    """
+    rng = random.Random(seed)
+    docs = []
+    for i in range(count):
+        stream, chunk_idx = i % streams, i // streams
+        start = chunk_idx * doc_duration_sec
+        doc_meta = {
+            "streamId": f"benchmark-ch{stream}",
+            "chunkIdx": i,
+            "file": f"benchmark-ch{stream}",
+            "pts_offset_ns": 0,
+            "start_pts": int(start * 1e9),
+            "end_pts": int((start + doc_duration_sec) * 1e9),
+            "start_ntp": "",
+            "end_ntp": "",
+            "start_ntp_float": start,
+            "end_ntp_float": start + doc_duration_sec,
+            "is_first": i == 0,
+            "is_last": i == count - 1,
+            "uuid": "",
+            "cv_meta": "[]",
+        }
+        text = " ".join(rng.choice(_VOCABULARY) for _ in range(words_per_doc))
+        docs.append((text, i, doc_meta))
+    return docs
+
+
+def save_dc_docs(file_path: str, docs: List[Doc]):
+    """Write docs in the dense caption JSONL format read by load_dc_docs"""
+    with open(file_path, "w") as f:
+        for doc, _, doc_meta in docs:
+            chunk = {
+                k: v
+                for k, v in doc_meta.items()
+                if k not in ("pts_offset_ns", "uuid", "cv_meta")
+            }
+            f.write(json.dumps({"vlm_response": doc, "chunk": chunk}) + "\n")
+
+
+def load_questions(file_path: str) -> List[str]:
+    """Questions from a text file, one per line, or JSONL objects with a `question` key"""
+    questions = []
+    with open(file_path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            questions.append(
+                json.loads(line)["question"] if line.startswith("{") else line
+            )
+    return questions
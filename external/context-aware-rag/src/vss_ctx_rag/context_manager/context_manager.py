@@ -23,21 +23,23 @@ import asyncio
 import random
 import traceback
 import time
-from threading import Thread
+from queue import Queue
+from threading import Lock, Thread
 from typing import Dict, Optional
 import os
 import multiprocessing
 import concurrent.futures
 
 from vss_ctx_rag.utils.ctx_rag_logger import TimeMeasure, logger
-from vss_ctx_rag.utils.otel import init_otel
-from vss_ctx_rag.context_manager.context_manager_handler import (
-    ContextManagerHandler,
-)
+from vss_ctx_rag.utils.ctx_rag_loop_monitor import loop_monitor_from_env
+from vss_ctx_rag.utils.ctx_rag_metrics import registry
 from vss_ctx_rag.utils.utils import RequestInfo
 from vss_ctx_rag.utils.utils import validate_config
 
 WAIT_ON_PENDING = 10  # Amount of time to wait before clearing the pending
+METRICS_TIMEOUT = 5  # Seconds to wait for a metrics snapshot of the process
+EVENT_LOOP_REPORT = "event_loop"  # Metrics pipe request for the loop monitor report
+CLOSE_TIMEOUT = 10  # Seconds to wait for the handler to close its connections on stop
 
 mp_ctx = multiprocessing.get_context("spawn")
 
@@ -62,6 +64,13 @@ class ContextManagerProcess(mp_ctx.Process):
         self.process_index = process_index
         self.req_info = req_info
         self._init_done_event = mp_ctx.Event()
+        # Metrics and the event loop report are served on their own pipe so
+        # that scrapes never queue behind documents or calls
+        self._metrics_conn, self._child_metrics_conn = mp_ctx.Pipe()
+        self._metrics_lock = mp_ctx.Lock()
+        self._stale_metrics_replies = mp_ctx.Value("i", 0, lock=False)
+        # Created in the process, see run()
+        self.loop_monitor = None
 
     def wait_for_initialization(self):
         """Wait for the process initialization to complete
@@ -82,6 +91,8 @@ class ContextManagerProcess(mp_ctx.Process):
             "yes",
             "on",
         ]:
+            from vss_ctx_rag.utils.otel import init_otel
+
             exporter_type = os.environ.get("VIA_CTX_RAG_EXPORTER", "console")
             endpoint = os.environ.get("VIA_CTX_RAG_OTEL_ENDPOINT", "")
             service_name = (
@@ -92,11 +103,55 @@ class ContextManagerProcess(mp_ctx.Process):
                 exporter_type=exporter_type,
                 endpoint=endpoint,
             )
-        self.cm_handler = ContextManagerHandler(
-            self.config, self.process_index, self.req_info
-        )
+        # Imported in the process only, the service that spawns it never runs a handler
+        with TimeMeasure("context_manager/init", "green"):
+            from vss_ctx_rag.context_manager.context_manager_handler import (
+                ContextManagerHandler,
+            )
+
+            self.cm_handler = ContextManagerHandler(
+                self.config, self.process_index, self.req_info
+            )
         self._init_done_event.set()
 
+    def _serve_metrics(self) -> None:
+        while True:
+            try:
+                request = self._child_metrics_conn.recv()
+                if request == EVENT_LOOP_REPORT:
+                    reply = self.loop_monitor.report() if self.loop_monitor else None
+                else:
+                    reply = registry.snapshot()
+                self._child_metrics_conn.send(reply)
+            except (EOFError, OSError):
+                return
+            except Exception as e:
+                logger.error(f"Error serving metrics: {e}")
+
+    def metrics(self) -> Optional[dict]:
+        """Snapshot of the metrics registry of the process, None on timeout"""
+        return self._query_metrics(None)
+
+    def event_loop_report(self) -> Optional[dict]:
+        """Lag and stall sites of the process event loop, None when not monitored"""
+        return self._query_metrics(EVENT_LOOP_REPORT)
+
+    def _query_metrics(self, request) -> Optional[dict]:
+        with self._metrics_lock:
+            self._metrics_conn.send(request)
+            # Answers to requests that timed out earlier come first, skip them
+            while True:
+                if not self._metrics_conn.poll(METRICS_TIMEOUT):
+                    self._stale_metrics_replies.value += 1
+                    logger.warning(
+                        f"Timed out collecting metrics of process {self.process_index}"
+                    )
+                    return None
+                snapshot = self._metrics_conn.recv()
+                if not self._stale_metrics_replies.value:
+                    return snapshot
+                self._stale_metrics_replies.value -= 1
+
     def start_bg_loop(self) -> None:
         asyncio.set_event_loop(self.event_loop)
         self.event_loop.run_forever()
@@ -118,6 +173,10 @@ class ContextManagerProcess(mp_ctx.Process):
             self.event_loop = asyncio.new_event_loop()
             self.t = Thread(target=self.start_bg_loop, daemon=True)
             self.t.start()
+            self.loop_monitor = loop_monitor_from_env("context_manager")
+            if self.loop_monitor:
+                self.loop_monitor.start(self.event_loop)
+            Thread(target=self._serve_metrics, daemon=True).start()
             self._initialize()
 
             while not self._stop.is_set():
@@ -163,27 +222,22 @@ class ContextManagerProcess(mp_ctx.Process):
                                 self.cm_handler.areset(state), loop=self.event_loop
                             )
                             future.result()
+                    elif item and "call_stream" in item:
+                        with TimeMeasure("context_manager/call_stream-manager", "blue"):
+                            self._wait_for_pending_add_docs()
+                            try:
+                                future = asyncio.run_coroutine_threadsafe(
+                                    self._aforward_stream(item["call_stream"]),
+                                    self.event_loop,
+                                )
+                                future.result()
+                            except Exception as e:
+                                traceback.print_exc()
+                                logger.error(f"Error streaming context manager call: {e}")
+                                self._response_queue.put({"error": f"{e}"})
                     elif item and "call" in item:
                         with TimeMeasure("context_manager/call-manager", "blue"):
-                            # TODO: Wait for add docs to finish
-                            with TimeMeasure(
-                                "context_manager/call/pending_add_doc", "blue"
-                            ):
-                                with self._pending_requests_lock:
-                                    pending_requests_copy = (
-                                        self._pending_add_doc_requests.copy()
-                                    )
-                                done, not_done = concurrent.futures.wait(
-                                    pending_requests_copy
-                                )
-                                # Check each completed future for exceptions
-                                for future in done:
-                                    try:
-                                        future.result()  # This will raise the exception if one occurred
-                                    except Exception as e:
-                                        logger.error(
-                                            f"Some add_doc failed to complete: {e}"
-                                        )
+                            self._wait_for_pending_add_docs()
                             try:
                                 state = item["call"]
                                 future = asyncio.run_coroutine_threadsafe(
@@ -206,10 +260,30 @@ class ContextManagerProcess(mp_ctx.Process):
                             logger.error(f"Error in updating config: {e}")
                             self._response_queue.put({"error": f"{e}"})
 
+            asyncio.run_coroutine_threadsafe(
+                self.cm_handler.aclose(), self.event_loop
+            ).result(timeout=CLOSE_TIMEOUT)
         except Exception as e:
             logger.error("Exception %s", str(e))
             logger.error(traceback.format_exc())
 
+    def _wait_for_pending_add_docs(self):
+        # TODO: Wait for add docs to finish
+        with TimeMeasure("context_manager/call/pending_add_doc", "blue"):
+            with self._pending_requests_lock:
+                pending_requests_copy = self._pending_add_doc_requests.copy()
+            done, not_done = concurrent.futures.wait(pending_requests_copy)
+            # Check each completed future for exceptions
+            for future in done:
+                try:
+                    future.result()  # This will raise the exception if one occurred
+                except Exception as e:
+                    logger.error(f"Some add_doc failed to complete: {e}")
+
+    async def _aforward_stream(self, state):
+        async for event in self.cm_handler.call_stream(state):
+            self._response_queue.put(event)
+
     def _add_pending_request(self, future):
         with self._pending_requests_lock:
             self._pending_add_doc_requests.append(future)
@@ -273,6 +347,25 @@ class ContextManagerProcess(mp_ctx.Process):
         self._queue.put({"call": state})
         return self._response_queue.get()
 
+    def call_stream(self, state):
+        """Generator over the events of a streaming call.
+
+        Ends after the "done" event, or an {"error": ...} item on failure.
+        """
+        self._queue.put({"call_stream": state})
+        finished = False
+        try:
+            while not finished:
+                event = self._response_queue.get()
+                finished = "error" in event or event.get("event") == "done"
+                yield event
+        finally:
+            # Drain the rest of the stream if the consumer stopped early so that
+            # the next call does not read stale events
+            while not finished:
+                event = self._response_queue.get()
+                finished = "error" in event or event.get("event") == "done"
+
     def reset(self, state):
         self._queue.put({"reset": state})
 
@@ -295,6 +388,8 @@ class ContextManager:
             logger.error(f"Config validation failed: {e}")
             raise
         self._process_index = process_index
+        # Calls share the process response queue, serialize them
+        self._call_lock = Lock()
         logger.debug(f"Initializing Context Manager index: {self._process_index}")
         try:
             self.process = ContextManagerProcess(config, self._process_index, req_info)
@@ -364,8 +459,37 @@ class ContextManager:
         self.process.configure_update(config=config, req_info=req_info_obj)
 
     def call(self, state):
-        return self.process.call(state)
+        with self._call_lock:
+            return self.process.call(state)
+
+    def call_stream(self, state):
+        """Generator over the events of a streaming call.
+
+        A thread reads the events of the process under the call lock until the
+        stream ends, so a slow consumer does not hold up other calls.
+        """
+        events = Queue()
+
+        def forward():
+            with self._call_lock:
+                try:
+                    for event in self.process.call_stream(state):
+                        events.put(event)
+                except Exception as e:
+                    logger.error(f"Error streaming context manager call: {e}")
+                    events.put({"error": f"{e}"})
+            events.put(None)
+
+        Thread(target=forward, name="ctx-rag-call-stream", daemon=True).start()
+        while (event := events.get()) is not None:
+            yield event
 
     def reset(self, state):
         logger.debug(f"Resetting Context Manager index: {self._process_index}")
         return self.process.reset(state)
+
+    def metrics(self) -> Optional[dict]:
+        return self.process.metrics()
+
+    def event_loop_report(self) -> Optional[dict]:
+        return self.process.event_loop_report()
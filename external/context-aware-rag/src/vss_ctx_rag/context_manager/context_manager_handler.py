@@ -24,19 +24,11 @@ import copy
 import traceback
 import time
 import json
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional
 import os
-import requests
 
 from vss_ctx_rag.base import Function
 from vss_ctx_rag.utils.ctx_rag_logger import TimeMeasure, logger
-from vss_ctx_rag.functions.notification import Notifier
-from vss_ctx_rag.functions.summarization import (
-    BatchSummarization,
-)
-from vss_ctx_rag.tools.llm import ChatOpenAITool
-from vss_ctx_rag.tools.notification import AlertSSETool
-from vss_ctx_rag.tools.storage import MilvusDBTool, Neo4jGraphDB
 from vss_ctx_rag.utils.globals import (
     DEFAULT_BATCH_SUMMARIZATION_BATCH_SIZE,
     DEFAULT_LLM_PARAMS,
@@ -45,20 +37,26 @@ from vss_ctx_rag.utils.globals import (
     LLM_TOOL_NAME,
     DEFAULT_MULTI_CHANNEL,
     DEFAULT_CHAT_HISTORY,
+    DEFAULT_MILVUS_PARTITION_BY_STREAM_DAY,
+    DEFAULT_MILVUS_MAINTENANCE_INTERVAL,
+    DEFAULT_MILVUS_MAX_PARTITIONS,
+    DEFAULT_VECTOR_DB_BACKEND,
+    DEFAULT_DEDUP_WINDOW_SIZE,
+    DEFAULT_DEDUP_HAMMING_THRESHOLD,
+    DEFAULT_DEDUP_SHINGLE_SIZE,
 )
-from vss_ctx_rag.functions.rag.chat_function import ChatFunction
-
-from vss_ctx_rag.functions.rag.graph_rag.graph_extraction_func import (
-    GraphExtractionFunc,
-)
-from vss_ctx_rag.functions.rag.graph_rag.graph_retrieval_func import GraphRetrievalFunc
-from vss_ctx_rag.functions.rag.adv_graph_rag.adv_graph_rag_func import AdvGraphRAGFunc
-from vss_ctx_rag.functions.rag.vector_rag.vector_retrieval_func import (
-    VectorRetrievalFunc,
-)
+from vss_ctx_rag.utils.ctx_rag_dedup import NearDuplicateFilter
+from vss_ctx_rag.utils.frontend_client import get_frontend_client
 from vss_ctx_rag.utils.utils import RequestInfo
 from vss_ctx_rag.utils.globals import DEFAULT_CONCURRENT_DOC_PROCESSING_LIMIT
 
+# The functions and tools pull in langchain, the database clients and the NVIDIA
+# endpoints. They are imported where the config enables them, so a process only
+# loads the ones it runs.
+if TYPE_CHECKING:
+    from vss_ctx_rag.tools.llm import ChatOpenAITool
+    from vss_ctx_rag.tools.storage import MilvusDBTool, Neo4jGraphDB, StorageTool
+
 
 class ContextManagerHandler:
     """Main controller for RAG system operations.
@@ -94,53 +92,43 @@ class ContextManagerHandler:
         self.auto_indexing: Optional[bool] = None
         self.curr_doc_index: int = -1
         self.rag_type = None
-        self.milvus_db: MilvusDBTool = None
-        self.chat_llm: ChatOpenAITool = None
-        self.llm: ChatOpenAITool = None
-        self.notification_llm: ChatOpenAITool = None
+        self.milvus_db: "MilvusDBTool" = None
+        self.chat_llm: "ChatOpenAITool" = None
+        self.llm: "ChatOpenAITool" = None
+        self.notification_llm: "ChatOpenAITool" = None
         self._process_index = process_index
         self.neo4j_uri = None
         self.neo4j_username = None
         self.neo4j_password = None
-        self.neo4jDB: Neo4jGraphDB = None
-        self.frontend_endpoint = os.environ.get('CHAT_FRONTEND_ENDPOINT', None)
+        self.neo4jDB: "Neo4jGraphDB" = None
+        self.frontend_client = get_frontend_client()
+        self.log_dir = os.environ.get("VIA_LOG_DIR", None)
+        self.dedup_filter: Optional[NearDuplicateFilter] = None
         self.configure_init(config, req_info)
         self._doc_processing_semaphore = asyncio.Semaphore(
             DEFAULT_CONCURRENT_DOC_PROCESSING_LIMIT
         )
 
-    def _frontend_export(self, transcript, stream_id, timestamp, uuid):
-        """Export transcript to frontend interface.
+    def _frontend_export(self, transcript, stream_id, timestamp, uuid, processed=False):
+        """Export transcript to frontend interface in the background.
 
         Args:
             transcript: The transcript text to export
             stream_id: Stream identifier
             timestamp: UTC timestamp in %Y-%m-%d %H:%M:%S format
             uuid: UUID for tracking
+            processed: Also mark the transcript as no longer pending
         """
-        if not self.frontend_endpoint:
+        if self.frontend_client is None:
             logger.debug("No CHAT_FRONTEND_ENDPOINT configured, skipping frontend export")
             return
 
-        endpoint = f"{self.frontend_endpoint}/api/update-data-stream"
-        data = {
-            "text": transcript,
-            "stream_id": stream_id,
-            "timestamp": timestamp,
-            "finalized": True,
-            "uuid": uuid
-        }
-
-        try:
-            response = requests.post(endpoint, json=data, timeout=10)
-            if response.status_code == 200:
-                logger.debug(f"Successfully exported to frontend: UUID {uuid}")
-            else:
-                logger.warning(f"Failed to export to frontend: {response.status_code}")
-        except requests.exceptions.ConnectionError:
-            logger.error(f"Failed to connect to frontend at {self.frontend_endpoint}")
-        except Exception as e:
-            logger.error(f"Error exporting to frontend: {e}")
+        self.frontend_client.submit_export(transcript, stream_id, timestamp, uuid)
+        if processed:
+            # Sent once the export above has completed
+            self.frontend_client.submit(
+                self.frontend_client.update_status([uuid], pending=False)
+            )
 
     def _connect_neo4j(self, chat_config: Dict):
         try:
@@ -162,17 +150,60 @@ class ContextManagerHandler:
                 and self.neo4j_username is not None
                 and self.neo4j_password is not None
             ):
-                self.neo4jDB = Neo4jGraphDB(
-                    url=self.neo4j_uri,
-                    username=self.neo4j_username,
-                    password=self.neo4j_password,
-                    embedding_model_name=chat_config["embedding"]["model"],
-                    embedding_base_url=chat_config["embedding"]["base_url"],
-                )
+                self.neo4jDB = self._create_graph_db(chat_config)
         except Exception as e:
             logger.error(f"Error setting up Neo4j: {e}")
             raise e
 
+    # Factories of the LLM and database tools, overridden to substitute
+    # other backends (e.g. the stubs of vss_ctx_rag.benchmark)
+    def _create_llm(self, api_key: str, llm_params: Dict) -> "ChatOpenAITool":
+        from vss_ctx_rag.tools.llm import ChatOpenAITool
+
+        return ChatOpenAITool(api_key=api_key, **llm_params)
+
+    def _create_graph_db(self, chat_config: Dict) -> "Neo4jGraphDB":
+        from vss_ctx_rag.tools.storage import Neo4jGraphDB
+
+        return Neo4jGraphDB(
+            url=self.neo4j_uri,
+            username=self.neo4j_username,
+            password=self.neo4j_password,
+            embedding_model_name=chat_config["embedding"]["model"],
+            embedding_base_url=chat_config["embedding"]["base_url"],
+        )
+
+    def _create_vector_db(
+        self, config: Dict, chat_config: Dict, collection_name: str
+    ) -> "StorageTool":
+        vector_db_config = config.get("vector_db") or {}
+        vector_db_backend = vector_db_config.get("backend", DEFAULT_VECTOR_DB_BACKEND)
+        if vector_db_backend == "memory":
+            from vss_ctx_rag.tools.storage import InMemoryDBTool
+
+            logger.info("Using the in-memory vector DB")
+            return InMemoryDBTool(
+                collection_name=collection_name,
+                reranker_base_url=chat_config["reranker"]["base_url"],
+                reranker_model_name=chat_config["reranker"]["model"],
+                embedding_base_url=chat_config["embedding"]["base_url"],
+                embedding_model_name=chat_config["embedding"]["model"],
+            )
+        if vector_db_backend == "milvus":
+            from vss_ctx_rag.tools.storage import MilvusDBTool
+
+            return MilvusDBTool(
+                collection_name=collection_name,
+                host=config["milvus_db_host"],
+                port=config["milvus_db_port"],
+                reranker_base_url=chat_config["reranker"]["base_url"],
+                reranker_model_name=chat_config["reranker"]["model"],
+                embedding_base_url=chat_config["embedding"]["base_url"],
+                embedding_model_name=chat_config["embedding"]["model"],
+                **self._vector_db_storage_params(vector_db_config),
+            )
+        raise ValueError(f"Unknown vector_db backend {vector_db_backend}")
+
     def setup_neo4j(self, chat_config: Dict, max_tries=5):
         tries = 0
         while tries < max_tries:
@@ -188,6 +219,25 @@ class ContextManagerHandler:
                     raise e
                 time.sleep(wait_time)
 
+    @staticmethod
+    def _vector_db_storage_params(vector_db_config: Optional[Dict]) -> Dict:
+        """MilvusDBTool partitioning and retention options from the config"""
+        if not vector_db_config:
+            return {}
+        return {
+            "partition_by_stream_day": vector_db_config.get(
+                "partition_by_stream_day", DEFAULT_MILVUS_PARTITION_BY_STREAM_DAY
+            ),
+            "retention_days": vector_db_config.get("retention_days"),
+            "rollup_after_days": vector_db_config.get("rollup_after_days"),
+            "maintenance_interval": vector_db_config.get(
+                "maintenance_interval_sec", DEFAULT_MILVUS_MAINTENANCE_INTERVAL
+            ),
+            "max_partitions": vector_db_config.get(
+                "max_partitions", DEFAULT_MILVUS_MAX_PARTITIONS
+            ),
+        }
+
     def configure_init(self, config: Dict, req_info: Optional[RequestInfo] = None):
         """Initialize system components based on configuration.
 
@@ -207,18 +257,31 @@ class ContextManagerHandler:
         collection_name = "summary_till_now_" + str(time.time()).replace(".", "_")
         if req_info and req_info.uuid:
             collection_name = "summary_till_now_" + req_info.uuid
-        self.milvus_db = MilvusDBTool(
-            collection_name=collection_name,
-            host=config["milvus_db_host"],
-            port=config["milvus_db_port"],
-            reranker_base_url=chat_config["reranker"]["base_url"],
-            reranker_model_name=chat_config["reranker"]["model"],
-            embedding_base_url=chat_config["embedding"]["base_url"],
-            embedding_model_name=chat_config["embedding"]["model"],
-        )
+        self.milvus_db = self._create_vector_db(config, chat_config, collection_name)
+        dedup_config = config.get("ingestion_dedup")
+        if dedup_config and dedup_config.get("enable"):
+            self.dedup_filter = NearDuplicateFilter(
+                window_size=dedup_config.get("window_size")
+                or DEFAULT_DEDUP_WINDOW_SIZE,
+                hamming_threshold=(
+                    dedup_config.get("hamming_threshold")
+                    if dedup_config.get("hamming_threshold") is not None
+                    else DEFAULT_DEDUP_HAMMING_THRESHOLD
+                ),
+                shingle_size=dedup_config.get("shingle_size")
+                or DEFAULT_DEDUP_SHINGLE_SIZE,
+            )
+            logger.info(
+                f"Ingestion near-duplicate filter enabled: window "
+                f"{self.dedup_filter.window_size}, hamming threshold "
+                f"{self.dedup_filter.hamming_threshold}"
+            )
         # Init time Notification config
         notification_config = config.get("notification")
         if notification_config and notification_config.get("enable"):
+            from vss_ctx_rag.functions.notification import Notifier
+            from vss_ctx_rag.tools.notification import AlertSSETool
+
             notification_llm_params = notification_config.get("llm")
             if notification_llm_params["model"] == "gpt-4o":
                 api_key = os.environ["OPENAI_API_KEY"]
@@ -227,9 +290,7 @@ class ContextManagerHandler:
             logger.info(
                 "Using %s as the notification llm", notification_llm_params["model"]
             )
-            notification_llm = ChatOpenAITool(
-                api_key=api_key, **notification_llm_params
-            )
+            notification_llm = self._create_llm(api_key, notification_llm_params)
             self.add_function(
                 Notifier("notification")
                 .add_tool(LLM_TOOL_NAME, notification_llm)
@@ -254,7 +315,7 @@ class ContextManagerHandler:
         else:
             api_key = config["api_key"]
         logger.info("Using %s as the chat llm", chat_llm_params["model"])
-        self.chat_llm = ChatOpenAITool(api_key=api_key, **chat_llm_params)
+        self.chat_llm = self._create_llm(api_key, chat_llm_params)
         # Init time Summarization config
         summ_config = copy.deepcopy(config.get("summarization"))
         llm_params = summ_config.get(LLM_TOOL_NAME, DEFAULT_LLM_PARAMS)
@@ -263,7 +324,7 @@ class ContextManagerHandler:
         else:
             api_key = config["api_key"]
         logger.info("Using %s as the summarization llm", llm_params["model"])
-        self.llm = ChatOpenAITool(api_key=api_key, **llm_params)
+        self.llm = self._create_llm(api_key, llm_params)
         # Init time Neo4j config
         if chat_config.get("rag", None) == "graph-rag":
             self.setup_neo4j(chat_config)
@@ -314,6 +375,8 @@ class ContextManagerHandler:
 
             if enable_summarization and self.get_function("summarization") is None:
                 if summ_config["method"] == "batch":
+                    from vss_ctx_rag.functions.summarization import BatchSummarization
+
                     summ_config["params"] = summ_config.get(
                         "params",
                         {
@@ -379,6 +442,8 @@ class ContextManagerHandler:
                     )
                     self.rag_type = None
                 if self.get_function("chat") is None:
+                    from vss_ctx_rag.functions.rag.chat_function import ChatFunction
+
                     logger.info("Setting up QnA, rag type: %s", chat_config["rag"])
 
                     chat_config["params"] = chat_config.get(
@@ -401,6 +466,10 @@ class ContextManagerHandler:
                         "chat_history", DEFAULT_CHAT_HISTORY
                     )
                     if chat_config["rag"] == "graph-rag":
+                        from vss_ctx_rag.functions.rag.graph_rag.graph_extraction_func import (
+                            GraphExtractionFunc,
+                        )
+
                         if self.neo4jDB is None:
                             self.setup_neo4j(chat_config)
                         cot = chat_config.get("advanced_features", {}).get("cot", False)
@@ -408,10 +477,18 @@ class ContextManagerHandler:
                             cot = cot.lower() in ["true", "1"]
                         logger.debug(f"COT: {cot}")
                         if cot and self.neo4jDB is not None:
+                            from vss_ctx_rag.functions.rag.adv_graph_rag.adv_graph_rag_func import (
+                                AdvGraphRAGFunc,
+                            )
+
                             retrieval_function = AdvGraphRAGFunc(
                                 "graph_retrieval_function"
                             )
                         else:
+                            from vss_ctx_rag.functions.rag.graph_rag.graph_retrieval_func import (
+                                GraphRetrievalFunc,
+                            )
+
                             retrieval_function = GraphRetrievalFunc(
                                 "retrieval_function"
                             )
@@ -432,11 +509,17 @@ class ContextManagerHandler:
                                 .config(**chat_config)
                                 .done(),
                             )
+                            .add_tool("graph_db", self.neo4jDB)
+                            .add_tool("vector_db", self.milvus_db)
                             .config(**chat_config)
                             .done(),
                         )
                         self.rag_type = "graph-rag"
                     elif chat_config["rag"] == "vector-rag":
+                        from vss_ctx_rag.functions.rag.vector_rag.vector_retrieval_func import (
+                            VectorRetrievalFunc,
+                        )
+
                         self.add_function(
                             ChatFunction("chat")
                             .add_function(
@@ -447,6 +530,7 @@ class ContextManagerHandler:
                                 .config(**chat_config)
                                 .done(),
                             )
+                            .add_tool("vector_db", self.milvus_db)
                             .config(**chat_config)
                             .done(),
                         )
@@ -527,14 +611,8 @@ class ContextManagerHandler:
         elif doc_i is None:
             raise ValueError("Param doc_i missing.")
 
-        # Export to frontend as pending ingestion
-        if doc_meta and self.frontend_endpoint:
-            self._frontend_export(
-                transcript=doc,
-                stream_id=doc_meta.get('streamId'),
-                timestamp=doc_meta.get('timestamp'),
-                uuid=doc_meta.get('uuid')
-            )
+        suppressed = self._is_near_duplicate(doc, doc_i, doc_meta)
+        self._export_doc_to_frontend(doc, doc_meta, processed=suppressed)
 
         # Process document through all functions with semaphore control
         async with self._doc_processing_semaphore:
@@ -542,6 +620,9 @@ class ContextManagerHandler:
 
             async def timed_function_call(func, doc, doc_i, doc_meta):
                 with TimeMeasure(f"context_manager/aprocess_doc/{func.name}", "yellow"):
+                    if suppressed:
+                        # Keeps doc_i, batches count it as an empty slot
+                        return await func.askip_doc_(doc, doc_i, doc_meta)
                     return await func.aprocess_doc_(doc, doc_i, doc_meta)
 
             with TimeMeasure("context_manager/aprocess_doc/total", "green"):
@@ -553,6 +634,47 @@ class ContextManagerHandler:
                     )
                 return await asyncio.gather(*tasks)
 
+    def _export_doc_to_frontend(self, doc, doc_meta, processed=False):
+        if doc_meta and self.frontend_client:
+            self._frontend_export(
+                transcript=doc,
+                stream_id=doc_meta.get('streamId'),
+                timestamp=doc_meta.get('timestamp'),
+                uuid=doc_meta.get('uuid'),
+                processed=processed,
+            )
+
+    def _is_near_duplicate(self, doc, doc_i, doc_meta) -> bool:
+        """Whether to suppress a near duplicate of a recent document of the same stream.
+
+        Stream start and end markers are always kept. Suppressed documents
+        still reach the frontend transcript, already marked as processed, and
+        the notifier, but are neither embedded, summarized nor added to the graph.
+        """
+        if self.dedup_filter is None:
+            return False
+        doc_meta = doc_meta or {}
+        if doc_meta.get("is_first") or doc_meta.get("is_last"):
+            return False
+        with TimeMeasure("context_manager/aprocess_doc/dedup", "yellow"):
+            duplicate = self.dedup_filter.is_duplicate(
+                doc_meta.get("streamId"), doc
+            )
+        if not duplicate:
+            return False
+        logger.debug(
+            f"Suppressed near-duplicate doc {doc_i} of stream "
+            f"{doc_meta.get('streamId')}: {doc}"
+        )
+        return True
+
+    async def _adump_dedup_stats(self):
+        if self.dedup_filter is not None and self.log_dir:
+            await asyncio.to_thread(
+                self.dedup_filter.dump_json,
+                os.path.join(self.log_dir, "ingestion_dedup_metrics.json"),
+            )
+
     async def call(self, state):
         """Execute registered functions with the given state.
 
@@ -577,8 +699,24 @@ class ContextManagerHandler:
             task_results = await asyncio.gather(*tasks)
             for index, func in enumerate(state):
                 results[func] = task_results[index]
+        await self._adump_dedup_stats()
         return results
 
+    async def call_stream(self, state):
+        """Stream the events of a single registered function.
+
+        Args:
+            state: Dictionary with exactly one function name and its parameters
+        Yields:
+            Events produced by the function's astream
+        """
+        if len(state) != 1:
+            raise ValueError("Streaming call expects exactly one function")
+        func_name, call_params = next(iter(state.items()))
+        with TimeMeasure(f"context_manager/call_stream/{func_name}", "green"):
+            async for event in self._functions[func_name].astream_(call_params):
+                yield event
+
     async def areset(self, state):
         """Reset the context manager and all registered functions.
 
@@ -589,6 +727,10 @@ class ContextManagerHandler:
         """
         self.curr_doc_index = -1
         self.auto_indexing = False
+        if self.dedup_filter is not None:
+            logger.info(f"Ingestion dedup stats: {self.dedup_filter.stats()}")
+            await self._adump_dedup_stats()
+            self.dedup_filter.reset()
         tasks = []
         for func, reset_params in state.items():
             if func in self._functions:
@@ -600,3 +742,10 @@ class ContextManagerHandler:
             else:
                 logger.debug("Function %s not found. Not resetting.", func)
         return await asyncio.gather(*tasks)
+
+    async def aclose(self):
+        """Close the functions, their tools and the frontend client before the
+        process stops"""
+        await asyncio.gather(*[f.aclose() for f in self._functions.values()])
+        if self.frontend_client is not None:
+            await self.frontend_client.aclose()
@@ -34,6 +34,8 @@ class SummarizationParams(BaseModel):
     batch_size: int = Field(default=6, ge=1)
     batch_max_concurrency: int = Field(default=20, ge=1)
     top_k: Optional[int] = Field(default=5, ge=1)
+    summary_tree_fanout: Optional[int] = Field(default=4, ge=0)
+    max_input_tokens: Optional[int] = Field(default=16384, ge=1)
 
 
 class Prompts(BaseModel):
@@ -78,12 +80,37 @@ class NotificationConfig(BaseModel):
     enable: bool
     endpoint: str
     llm: LLMConfig
+    batch_events: Optional[bool] = Field(default=False)
+
+
+class VectorDBConfig(BaseModel):
+    backend: Optional[str] = Field(default="milvus")
+    partition_by_stream_day: Optional[bool] = Field(default=False)
+    retention_days: Optional[float] = Field(default=None, gt=0)
+    rollup_after_days: Optional[float] = Field(default=None, gt=0)
+    maintenance_interval_sec: Optional[float] = Field(default=3600, gt=0)
+    max_partitions: Optional[int] = Field(default=1000, ge=1)
+
+    @field_validator("backend")
+    def validate_backend(cls, v):
+        if v not in ["milvus", "memory"]:
+            raise ValueError("Invalid vector_db backend value")
+        return v
+
+
+class IngestionDedupConfig(BaseModel):
+    enable: bool = Field(default=False)
+    window_size: Optional[int] = Field(default=256, ge=1)
+    hamming_threshold: Optional[int] = Field(default=6, ge=0, le=64)
+    shingle_size: Optional[int] = Field(default=3, ge=1)
 
 
 class ContextManagerConfig(BaseModel):
     summarization: SummarizationConfig
     chat: ChatConfig
     notification: NotificationConfig
+    vector_db: Optional[VectorDBConfig] = None
+    ingestion_dedup: Optional[IngestionDedupConfig] = None
     milvus_db_host: str = Field(default="localhost")
     milvus_db_port: str = Field(default="19530")
 
@@ -97,6 +124,7 @@ class ContextManagerConfig(BaseModel):
 class Event(BaseModel):
     event_id: str
     event_list: List[str]
+    keywords: Optional[List[str]] = None
 
 
 class Alert(BaseModel):
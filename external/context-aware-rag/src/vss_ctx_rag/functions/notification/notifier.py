@@ -17,6 +17,7 @@
 
 import asyncio
 import json
+import re
 
 from vss_ctx_rag.base import Function
 from vss_ctx_rag.tools.notification import NotificationTool
@@ -24,12 +25,18 @@ from vss_ctx_rag.utils.ctx_rag_logger import logger, TimeMeasure
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables.base import RunnableSequence
-from vss_ctx_rag.utils.globals import LLM_TOOL_NAME
+from vss_ctx_rag.utils.globals import LLM_TOOL_NAME, DEFAULT_NOTIFICATION_BATCH_EVENTS
 
 
 class Notifier(Function):
     """
     Notifier Function
+
+    By default every event group is evaluated with its own LLM call. With
+    `batch_events`, all the event groups that pass the keyword prefilter are
+    evaluated with a single LLM call per document. An event group with
+    `keywords` is only evaluated when one of them appears in the document,
+    so documents matching no rule skip the LLM entirely.
     """
 
     prompt_str: str = 'You are a Event Detection System. From the following\
@@ -54,8 +61,28 @@ class Notifier(Function):
                         where "$event_name_i" is the ith event to be detected and\
                         "$is_detected" is either true or false.\
                         Output should only be the said json; nothing else!'
+    batch_prompt_str: str = 'You are a Event Detection System. From the following\
+                        text, detect which of the following events are present.\
+                        The events are grouped, each group has an id:\
+                        {events}\
+                        The output should be a json in the format:\
+                        {{\
+                            "result" : [\
+                                {{\
+                                    "event_id": "$event_id",\
+                                    "event": "$event_name",\
+                                    "is_detected": $is_detected\
+                                }}\
+                            ]\
+                        }}\
+                        with one entry for every event of every group, where\
+                        "$event_id" is the id of the group of the event,\
+                        "$event_name" is the event exactly as given and\
+                        "$is_detected" is either true or false.\
+                        Output should only be the said json; nothing else!'
     output_parser = StrOutputParser()
     pipeline: RunnableSequence
+    batch_pipeline: RunnableSequence
     notification_tool: NotificationTool
     events: list[dict]
 
@@ -66,73 +93,156 @@ class Notifier(Function):
             if self.get_param("events", required=False)
             else []
         )
+        batch_events = self.get_param("batch_events", required=False)
+        self.batch_events = (
+            batch_events if batch_events is not None else DEFAULT_NOTIFICATION_BATCH_EVENTS
+        )
+        self._keyword_patterns = {
+            event_item["event_id"]: re.compile(
+                r"\b(?:"
+                + "|".join(re.escape(k.lower()) for k in event_item["keywords"])
+                + r")\b"
+            )
+            for event_item in self.events
+            if event_item.get("keywords")
+        }
         self.prompt = ChatPromptTemplate.from_messages(
             [("system", self.prompt_str), ("user", "{input}")]
         )
+        self.batch_prompt = ChatPromptTemplate.from_messages(
+            [("system", self.batch_prompt_str), ("user", "{input}")]
+        )
         self.output_parser = StrOutputParser()
         self.pipeline = self.prompt | self.get_tool(LLM_TOOL_NAME) | self.output_parser
+        self.batch_pipeline = (
+            self.batch_prompt | self.get_tool(LLM_TOOL_NAME) | self.output_parser
+        )
 
     async def acall(self, state: dict):
         return await asyncio.sleep(0.001)
 
-    async def aprocess_doc(self, doc: str, doc_i: int, doc_meta: dict):
-        # TODO: Ensure the output is proper. Ensure json load works.
-        notifications = []
-        tasks = []
-
+    def _prefilter(self, doc: str) -> list[dict]:
+        """Event groups that may match the document"""
+        text = doc.lower()
+        return [
+            event_item
+            for event_item in self.events
+            if event_item["event_id"] not in self._keyword_patterns
+            or self._keyword_patterns[event_item["event_id"]].search(text)
+        ]
+
+    @staticmethod
+    def _parse_result(result: str):
+        result = result.strip().strip("`")
+        if result.startswith("json"):
+            result = result[len("json") :]
+        return json.loads(result)["result"]
+
+    def _alert(self, doc: str, doc_meta: dict, event_id: str, events_detected: list):
+        events_detected_str = " ".join(events_detected)
+        return {
+            "title": f"{events_detected_str} detected!",
+            "message": f"{events_detected_str} detected in '{doc}'",
+            "metadata": doc_meta
+            | {
+                "doc": doc,
+                "events_detected": events_detected,
+                "event_id": event_id,
+            },
+        }
+
+    async def _adetect_per_group(self, doc: str, doc_meta: dict, event_items):
         with TimeMeasure("notifier/llm_call"):
-            for event_item in self.events:
-                event = event_item["event_list"]
-                event_id = event_item["event_id"]
-
-                tasks.append(
+            results = await asyncio.gather(
+                *[
                     self.pipeline.ainvoke(
                         {
-                            "events": str(event),
+                            "events": str(event_item["event_list"]),
                             "input": doc,
                         }
                     )
+                    for event_item in event_items
+                ],
+                return_exceptions=True,
+            )
+
+        alerts = []
+        for result, event_item in zip(results, event_items):
+            event_id = event_item["event_id"]
+
+            if isinstance(result, Exception):
+                logger.warning(
+                    f"Pipeline invocation failed for event_id {event_id}: {result}"
                 )
+                continue
 
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                result = self._parse_result(result)
+            except Exception:
+                logger.warning(
+                    f"Notification failed due to incorrect json generation:\n{result}"
+                )
+                continue
 
-        with TimeMeasure("notifier/notify_call"):
-            for result, event_item in zip(results, self.events):
-                event_id = event_item["event_id"]
+            events_detected = [item["event"] for item in result if item["is_detected"]]
+            if events_detected:
+                alerts.append(self._alert(doc, doc_meta, event_id, events_detected))
+        return alerts
 
-                if isinstance(result, Exception):
-                    logger.warning(
-                        f"Pipeline invocation failed for event_id {event_id}: {result}"
-                    )
-                    continue
-
-                result = result.strip("`json")
-                try:
-                    result = json.loads(result)
-                except Exception:
-                    logger.warning(
-                        f"Notification failed due to incorrect json generation:\n{result}"
-                    )
-                    continue
-
-                events_detected = [
-                    item["event"] for item in result["result"] if item["is_detected"]
-                ]
-
-                if events_detected:
-                    events_detected_str = " ".join(events_detected)
-                    notifications.append(
-                        self.notification_tool.notify(
-                            title=f"{events_detected_str} detected!",
-                            message=f"{events_detected_str} detected in '{doc}'",
-                            metadata=doc_meta
-                            | {
-                                "doc": doc,
-                                "events_detected": events_detected,
-                                "event_id": event_id,
-                            },
-                        )
-                    )
+    async def _adetect_batched(self, doc: str, doc_meta: dict, event_items):
+        events = "\n".join(
+            f"- {event_item['event_id']}: {event_item['event_list']}"
+            for event_item in event_items
+        )
+        with TimeMeasure("notifier/batched_llm_call"):
+            try:
+                result = await self.batch_pipeline.ainvoke(
+                    {"events": events, "input": doc}
+                )
+            except Exception as e:
+                logger.warning(f"Batched pipeline invocation failed: {e}")
+                return []
+
+        try:
+            result = self._parse_result(result)
+        except Exception:
+            logger.warning(
+                f"Notification failed due to incorrect json generation:\n{result}"
+            )
+            return []
+
+        # Only keep detections of events that were actually asked for
+        detected = {}
+        for event_item in event_items:
+            event_id = event_item["event_id"]
+            for item in result:
+                if (
+                    item.get("is_detected")
+                    and item.get("event_id") == event_id
+                    and item.get("event") in event_item["event_list"]
+                    and item["event"] not in detected.get(event_id, [])
+                ):
+                    detected.setdefault(event_id, []).append(item["event"])
+        return [
+            self._alert(doc, doc_meta, event_id, events_detected)
+            for event_id, events_detected in detected.items()
+        ]
 
-            if notifications:
-                await asyncio.gather(*notifications)
+    async def aprocess_doc(self, doc: str, doc_i: int, doc_meta: dict):
+        event_items = self._prefilter(doc)
+        if not event_items:
+            logger.debug(f"Notifier prefilter skipped doc {doc_i}")
+            return
+
+        if self.batch_events:
+            alerts = await self._adetect_batched(doc, doc_meta, event_items)
+        else:
+            alerts = await self._adetect_per_group(doc, doc_meta, event_items)
+
+        if alerts:
+            with TimeMeasure("notifier/notify_call"):
+                await self.notification_tool.notify_batch(alerts)
+
+    async def askip_doc(self, doc: str, doc_i: int, doc_meta: dict):
+        # Repeated transcripts are still checked for alerts
+        await self.aprocess_doc(doc, doc_i, doc_meta)
@@ -69,6 +69,13 @@ class AdvGraphRAGFunc(Function):
             graph=self.graph_db,
             top_k=self.top_k,
             max_retries=self.max_ret_retries,
+            schema_cache_ttl=self.get_param(
+                "params", "schema_cache_ttl", required=False
+            ),
+            analysis_cache_size=self.get_param(
+                "params", "analysis_cache_size", required=False
+            ),
+            fast_path=bool(self.get_param("params", "fast_path", required=False)),
         )
         logger.info(f"Initialized retriever with top_k={self.top_k}")
 
@@ -171,6 +178,9 @@ class AdvGraphRAGFunc(Function):
             # Initial retrieval
             context, retrieval_strategy = await self.retriever.retrieve_relevant_context(question)
             retrieved_context = deepcopy(context)
+            if retrieval_strategy and retrieval_strategy[2]:
+                # The answer only depends on these streams (see the chat answer cache)
+                state["source_stream_ids"] = list(retrieval_strategy[2])
 
             # If no context is found, assume that we did a temporal retrieval and
             # nothing turned up
@@ -327,8 +337,12 @@ class AdvGraphRAGFunc(Function):
             self.chat_history.append(current_interaction)
             return state
 
+    def has_chat_history(self) -> bool:
+        return bool(self.chat_history)
+
     async def areset(self, state: dict):
         """Reset the function state"""
         logger.info("Resetting AdvGraphRAGFunc state")
         self.chat_history = []
+        self.retriever.clear_cache()
         await asyncio.sleep(0.01)
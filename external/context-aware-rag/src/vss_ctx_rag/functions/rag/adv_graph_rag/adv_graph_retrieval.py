@@ -16,14 +16,22 @@
 """adv_graph_retrieval.py: File contains AdvGraphRetrieval class"""
 
 from datetime import datetime, timezone, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+import asyncio
 import json
+import time
 
 from langchain_core.documents import Document
 from vss_ctx_rag.utils.ctx_rag_logger import TimeMeasure, logger
 from vss_ctx_rag.tools.storage.neo4j_db import Neo4jGraphDB
 from vss_ctx_rag.utils.utils import remove_lucene_chars, remove_think_tags
+from vss_ctx_rag.utils.ctx_rag_cache import LRUCache
+from vss_ctx_rag.utils.globals import (
+    DEFAULT_GRAPH_SCHEMA_CACHE_TTL,
+    DEFAULT_QUESTION_ANALYSIS_CACHE_SIZE,
+)
 from vss_ctx_rag.functions.rag.graph_rag.constants import (
+    CHAT_FAST_PATH_SCORE_THRESHOLD,
     CHAT_SEARCH_KWARG_SCORE_THRESHOLD,
     QUESTION_TRANSFORM_TEMPLATE,
     VECTOR_SEARCH_TOP_K,
@@ -43,23 +51,41 @@ from langchain_core.messages import HumanMessage
 
 
 class AdvGraphRetrieval:
-    def __init__(self, llm, graph: Neo4jGraphDB, top_k=None, max_retries=None):
+    def __init__(
+        self,
+        llm,
+        graph: Neo4jGraphDB,
+        top_k=None,
+        max_retries=None,
+        schema_cache_ttl=None,
+        analysis_cache_size=None,
+        fast_path=False,
+    ):
         logger.info("Initializing AdvGraphRetrieval")
         self.chat_llm = llm
         self.graph_db = graph
         self.top_k = top_k
+        self.fast_path = fast_path
         self.max_retries = max_retries if max_retries else 3
-        self.vector_retriever = Neo4jVector.from_existing_index(
+        self.schema_cache_ttl = (
+            schema_cache_ttl
+            if schema_cache_ttl is not None
+            else DEFAULT_GRAPH_SCHEMA_CACHE_TTL
+        )
+        # (schema_version, fetched_at, entity_types, stream_ids)
+        self._schema_cache = None
+        self._schema_lock = asyncio.Lock()
+        self._analysis_cache = LRUCache(
+            analysis_cache_size
+            if analysis_cache_size is not None
+            else DEFAULT_QUESTION_ANALYSIS_CACHE_SIZE
+        )
+        self.vector_store = Neo4jVector.from_existing_index(
             embedding=self.graph_db.embeddings,
             index_name="vector",
             graph=self.graph_db.graph_db,
-        ).as_retriever(
-            search_type="similarity_score_threshold",
-            search_kwargs={
-                "k": self.top_k or VECTOR_SEARCH_TOP_K,
-                "score_threshold": CHAT_SEARCH_KWARG_SCORE_THRESHOLD,
-            },
         )
+        self.vector_retriever = self._create_vector_retriever()
         self.doc_retriever = self.create_document_retriever_chain()
         logger.info(f"Initialized with top_k={top_k}")
 
@@ -72,6 +98,39 @@ class AdvGraphRetrieval:
         diff = now - timestamp
         return f"{int(diff)} seconds ago"
 
+    def _create_vector_retriever(self, filter: Dict = None):
+        search_kwargs = {
+            "k": self.top_k or VECTOR_SEARCH_TOP_K,
+            "score_threshold": (
+                CHAT_FAST_PATH_SCORE_THRESHOLD
+                if self.fast_path
+                else CHAT_SEARCH_KWARG_SCORE_THRESHOLD
+            ),
+        }
+        if filter:
+            # Neo4jVector applies metadata filters as Cypher predicates ahead of
+            # the similarity scoring, so they are served by the chunk indexes.
+            search_kwargs["filter"] = filter
+        return self.vector_store.as_retriever(
+            search_type="similarity_score_threshold",
+            search_kwargs=search_kwargs,
+        )
+
+    def _create_compression_retriever(self, base_retriever):
+        if self.fast_path:
+            return base_retriever
+        embeddings_filter = EmbeddingsFilter(
+            embeddings=self.graph_db.embeddings,
+            similarity_threshold=CHAT_EMBEDDING_FILTER_SCORE_THRESHOLD,
+        )
+        pipeline_compressor = DocumentCompressorPipeline(
+            transformers=[embeddings_filter]
+        )
+        return ContextualCompressionRetriever(
+            base_compressor=pipeline_compressor,
+            base_retriever=base_retriever,
+        )
+
     def create_document_retriever_chain(self):
         with TimeMeasure("GraphRetrieval/CreateDocRetChain", "blue"):
             try:
@@ -86,16 +145,8 @@ class AdvGraphRetrieval:
 
                 output_parser = StrOutputParser()
 
-                embeddings_filter = EmbeddingsFilter(
-                    embeddings=self.graph_db.embeddings,
-                    similarity_threshold=CHAT_EMBEDDING_FILTER_SCORE_THRESHOLD,
-                )
-                pipeline_compressor = DocumentCompressorPipeline(
-                    transformers=[embeddings_filter]
-                )
-                compression_retriever = ContextualCompressionRetriever(
-                    base_compressor=pipeline_compressor,
-                    base_retriever=self.vector_retriever,
+                compression_retriever = self._create_compression_retriever(
+                    self.vector_retriever
                 )
                 query_transforming_retriever_chain = RunnableBranch(
                     (
@@ -162,13 +213,47 @@ class AdvGraphRetrieval:
             logger.error(f"Error fetching stream_ids: {e}")
             return []
 
-    def _build_property_filters(self, properties: Dict) -> str:
+    async def get_schema(self) -> Tuple[List[str], List[str]]:
+        """Return (entity_types, stream_ids), served from cache while it is fresh.
+
+        The cache is dropped when ingestion bumps the graph's schema version or
+        after schema_cache_ttl seconds, whichever comes first. The TTL bounds
+        staleness when ingestion runs in a different process.
+        """
+        async with self._schema_lock:
+            cached = self._schema_cache
+            if (
+                cached is not None
+                and cached[0] == self.graph_db.schema_version
+                and time.time() - cached[1] < self.schema_cache_ttl
+            ):
+                return cached[2], cached[3]
+
+            version = self.graph_db.schema_version
+            entity_types, stream_ids = await asyncio.gather(
+                self.get_all_entity_types(), self.get_all_stream_ids()
+            )
+            self._schema_cache = (version, time.time(), entity_types, stream_ids)
+            return entity_types, stream_ids
+
+    @staticmethod
+    def _normalize_question(question: str) -> str:
+        return " ".join(question.lower().split()).rstrip("?!. ")
+
+    @staticmethod
+    def _escape_name(name: str) -> str:
+        """Quote a label, relationship type or property key for Cypher"""
+        return "`" + str(name).replace("`", "") + "`"
+
+    def _build_property_filters(self, properties: Dict) -> Tuple[str, Dict]:
         if not properties:
-            return ""
+            return "", {}
         filters = []
-        for key, value in properties.items():
-            filters.append(f"n.{key} = '{value}'")
-        return "WHERE " + " AND ".join(filters)
+        params = {}
+        for i, (key, value) in enumerate(properties.items()):
+            filters.append(f"n.{self._escape_name(key)} = $prop_{i}")
+            params[f"prop_{i}"] = value
+        return "WHERE " + " AND ".join(filters), params
 
     async def retrieve_by_entity_type(
         self, entity_type: str, properties: Dict = None
@@ -177,13 +262,15 @@ class AdvGraphRetrieval:
         logger.info(
             f"Retrieving entities of type {entity_type} with properties {properties}"
         )
+        property_filter, params = self._build_property_filters(properties)
+        params["limit"] = self.top_k or 10
         query = f"""
-        MATCH (n:{entity_type})
-        {self._build_property_filters(properties) if properties else ""}
+        MATCH (n:{self._escape_name(entity_type)})
+        {property_filter}
         RETURN n
-        LIMIT {self.top_k or 10}
+        LIMIT $limit
         """
-        return await self.graph_db.arun_cypher_query(query)
+        return await self.graph_db.arun_cypher_query(query, params)
 
     async def retrieve_by_relationship(
         self,
@@ -197,21 +284,25 @@ class AdvGraphRetrieval:
             f"Retrieving relationships {relationship} between "
             f"{start_type} and {end_type}"
         )
-        time_filter = ""
+        params = {"limit": self.top_k or 10}
+        conditions = []
         if time_range:
-            time_filter = f"""
-            WHERE r.start_timestamp >= {time_range.get("start", 0)}
-            AND r.end_timestamp <= {time_range.get("end", "infinity")}
-            """
+            if time_range.get("start") is not None:
+                conditions.append("r.start_timestamp >= $start")
+                params["start"] = time_range["start"]
+            if time_range.get("end") is not None:
+                conditions.append("r.end_timestamp <= $end")
+                params["end"] = time_range["end"]
             logger.info(f"Added time filter: {time_range}")
+        time_filter = "WHERE " + " AND ".join(conditions) if conditions else ""
 
         query = f"""
-        MATCH (start:{start_type})-[r:{relationship}]->(end:{end_type})
+        MATCH (start:{self._escape_name(start_type)})-[r:{self._escape_name(relationship)}]->(end:{self._escape_name(end_type)})
         {time_filter}
         RETURN start, r, end
-        LIMIT {self.top_k or 10}
+        LIMIT $limit
         """
-        return await self.graph_db.arun_cypher_query(query)
+        return await self.graph_db.arun_cypher_query(query, params)
 
     async def retrieve_temporal_context(
         self, start_time: float, end_time: float, stream_ids: List[str] = None
@@ -221,42 +312,50 @@ class AdvGraphRetrieval:
         if stream_ids:
             logger.info(f"Filtering by stream_ids: {stream_ids}")
 
-        result = []
-        temporal_filter = ""
-        stream_filter = ""
-
         if start_time is None and end_time is None:
-            return result
+            return []
+
+        # Only the set of predicates varies between calls, never the values, so
+        # Neo4j can reuse cached plans that seek the chunk range indexes.
+        params = {"limit": self.top_k or 10}
         if start_time is not None:
-            temporal_filter = f"""
-            AND toFloat(n.start_time) >= {start_time}
-            """
+            conditions = ["n.start_time >= $start_time"]
+            params["start_time"] = float(start_time)
+        else:
+            conditions = ["n.start_time IS NOT NULL"]
         if end_time is not None:
-            temporal_filter = (
-                temporal_filter
-                + f"""
-            AND toFloat(n.end_time) <= {end_time}
-            """
-            )
-
+            conditions.append("n.end_time <= $end_time")
+            params["end_time"] = float(end_time)
+        else:
+            conditions.append("n.end_time IS NOT NULL")
         if stream_ids:
-            # Create filter for multiple stream_ids
-            stream_conditions = [f"n.stream_id = '{stream_id}'" for stream_id in stream_ids]
-            stream_filter = f"""
-            AND ({' OR '.join(stream_conditions)})
-            """
+            conditions.append("n.stream_id IN $stream_ids")
+            params["stream_ids"] = list(stream_ids)
 
         query = f"""
-        MATCH (n: Chunk)
-        WHERE n.start_time IS NOT NULL AND n.end_time IS NOT NULL
-        {temporal_filter}
-        {stream_filter}
-        RETURN n
-            ORDER BY n.start_time
-            LIMIT {self.top_k or 10}
-            """
-        result = await self.graph_db.arun_cypher_query(query)
-        return result
+        MATCH (n:Chunk)
+        WHERE {" AND ".join(conditions)}
+        RETURN n {{.text, .start_time, .end_time, .stream_id, .chunkIdx}} AS n
+        ORDER BY n.start_time
+        LIMIT $limit
+        """
+        result = await self.graph_db.arun_cypher_query(query, params)
+        return result or []
+
+    def _build_vector_filter(
+        self,
+        start_time: float = None,
+        end_time: float = None,
+        stream_ids: List[str] = None,
+    ) -> Dict:
+        vector_filter = {}
+        if start_time is not None:
+            vector_filter["start_time"] = {"$gte": float(start_time)}
+        if end_time is not None:
+            vector_filter["end_time"] = {"$lte": float(end_time)}
+        if stream_ids:
+            vector_filter["stream_id"] = {"$in": list(stream_ids)}
+        return vector_filter
 
     async def retrieve_semantic_context(
         self,
@@ -266,7 +365,11 @@ class AdvGraphRetrieval:
         sort_by: str = None,
         stream_ids: List[str] = None,
     ) -> List[Dict]:
-        """Retrieve semantically similar content using vector similarity search"""
+        """Retrieve semantically similar content using vector similarity search
+
+        Time and stream_id restrictions are applied inside the vector search
+        rather than on its results, so they do not eat into top_k.
+        """
         logger.info(
             f"Retrieving semantic context for question: {question} "
             f"between {start_time} and {end_time}"
@@ -275,19 +378,19 @@ class AdvGraphRetrieval:
             logger.info(f"Filtering by stream_ids: {stream_ids}")
 
         try:
-            result = await self.doc_retriever.ainvoke(
-                {"messages": [HumanMessage(content=question)]}
-            )
+            vector_filter = self._build_vector_filter(start_time, end_time, stream_ids)
+            if vector_filter:
+                retriever = self._create_compression_retriever(
+                    self._create_vector_retriever(vector_filter)
+                )
+                result = await retriever.ainvoke(remove_lucene_chars(question))
+            else:
+                result = await self.doc_retriever.ainvoke(
+                    {"messages": [HumanMessage(content=question)]}
+                )
             # logger.info(f"Semantic search results raw: {result}")
             processed_results = []
             for doc in result:
-                # Filter by stream_id if specified
-                if stream_ids:
-                    doc_stream_id = doc.metadata.get("stream_id")
-                    if doc_stream_id not in stream_ids:
-                        logger.debug(f"Skipping document with stream_id '{doc_stream_id}' (not in {stream_ids})")
-                        continue
-
                 processed_results.append(
                     {
                         "n": {
@@ -295,19 +398,21 @@ class AdvGraphRetrieval:
                             "start_time": doc.metadata.get("start_time", ""),
                             "end_time": doc.metadata.get("end_time", ""),
                             "chunkIdx": doc.metadata.get("chunkIdx", ""),
-                            "score": doc.state.get("query_similarity_score", 0),
+                            # Fast path results carry no filter score and keep
+                            # the order of the vector search
+                            "score": getattr(doc, "state", {}).get(
+                                "query_similarity_score", 0
+                            ),
                             "stream_id": doc.metadata.get("stream_id", ""),
                         }
                     }
                 )
-                if sort_by == "score":
-                    processed_results.sort(key=lambda x: x["n"]["score"], reverse=True)
-                elif sort_by == "start_time":
-                    processed_results.sort(key=lambda x: x["n"]["start_time"])
-                elif sort_by == "end_time":
-                    processed_results.sort(key=lambda x: x["n"]["end_time"])
-                else:
-                    processed_results.sort(key=lambda x: x["n"]["score"], reverse=True)
+            if sort_by == "start_time":
+                processed_results.sort(key=lambda x: x["n"]["start_time"])
+            elif sort_by == "end_time":
+                processed_results.sort(key=lambda x: x["n"]["end_time"])
+            else:
+                processed_results.sort(key=lambda x: x["n"]["score"], reverse=True)
             logger.debug(f"Semantic search results: {processed_results}")
             return processed_results
         except Exception as e:
@@ -317,14 +422,15 @@ class AdvGraphRetrieval:
     async def analyze_question(self, question: str) -> Dict[str, Any]:
         """Use LLM to analyze question and determine basic retrieval elements"""
         logger.info(f"Analyzing question: {question}")
+        entity_types, stream_ids = await self.get_schema()
         prompt = f"""Analyze this question and identify key elements for graph database retrieval.
         Question: {question}
 
         Identify and return as JSON:
-        1. Entity types mentioned. Available entity types: {await self.get_all_entity_types()}
+        1. Entity types mentioned. Available entity types: {entity_types}
         2. Relationships of interest
         3. Location references
-        4. Stream IDs mentioned. Available stream_ids: {await self.get_all_stream_ids()}
+        4. Stream IDs mentioned. Available stream_ids: {stream_ids}
         5. Retrieval strategy (similarity, temporal)
             a. similarity: If the question needs to find similar content, return the retrieval strategy as similarity
             b. temporal: If the question is about a specific time range or time-based filtering, return the strategy as temporal
@@ -643,8 +749,33 @@ class AdvGraphRetrieval:
         with TimeMeasure("AdvGraphRetrieval/retrieve_context", "blue"):
             logger.info(f"Starting context retrieval for question: {question}")
 
-            # Step 1: Basic question analysis
-            analysis = await self._parse_json_with_retries(self.analyze_question, "basic analysis", question)
+            # The basic analysis and the temporal analyses are independent LLM
+            # calls, so run them concurrently. Parsed results are memoized per
+            # normalized question and graph schema; timestamps are still
+            # resolved against the current time below.
+            entity_types, available_stream_ids = await self.get_schema()
+            cache_key = (
+                self._normalize_question(question),
+                tuple(entity_types),
+                tuple(available_stream_ids),
+            )
+            cached = self._analysis_cache.get(cache_key)
+            if cached is not None:
+                logger.info("Using cached question analysis")
+                analysis, temporal_strategy, temporal_times = cached
+            else:
+                analysis, (temporal_strategy, temporal_times) = await asyncio.gather(
+                    self._parse_json_with_retries(
+                        self.analyze_question, "basic analysis", question
+                    ),
+                    self._analyze_temporal(question),
+                )
+                if temporal_strategy is not None and analysis and (
+                    temporal_strategy == "none" or temporal_times is not None
+                ):
+                    self._analysis_cache.put(
+                        cache_key, (analysis, temporal_strategy, temporal_times)
+                    )
 
             if not analysis:
                 logger.error("Failed to parse basic analysis, using defaults")
@@ -659,30 +790,20 @@ class AdvGraphRetrieval:
             # Get basic parameters from analysis
             strategy = analysis.get("retrieval_strategy", "")
             stream_ids = analysis.get("stream_ids", [])
+            temporal_strategy = temporal_strategy or "none"
             logger.info(f"Using retrieval strategy: {strategy}")
+            logger.info(f"Using temporal strategy: {temporal_strategy}")
 
-            # Step 2 & 3: Temporal analysis
             start_time = None
             end_time = None
-            temporal_strategy = "none"
-
-            # Step 2: Determine temporal strategy type
-            temporal_strategy_analysis = await self._parse_json_with_retries(self.analyze_temporal_strategy, "temporal strategy", question)
-
-            if temporal_strategy_analysis:
-                temporal_strategy = temporal_strategy_analysis.get("temporal_strategy", "none")
-                logger.info(f"Using temporal strategy: {temporal_strategy}")
-
-                # Step 3: Determine specific times if not "none"
-                if temporal_strategy != "none":
-                    temporal_times = await self._parse_json_with_retries(self.analyze_temporal_times, "temporal times", question, temporal_strategy)
-
-                    if temporal_times:
-                        # Convert to actual timestamps
-                        timestamps = self._convert_temporal_times_to_timestamps(temporal_times, temporal_strategy)
-                        start_time = timestamps.get("start_time")
-                        end_time = timestamps.get("end_time")
-                        logger.info(f"Temporal range: {start_time} to {end_time}")
+            if temporal_times:
+                # Convert to actual timestamps
+                timestamps = self._convert_temporal_times_to_timestamps(
+                    temporal_times, temporal_strategy
+                )
+                start_time = timestamps.get("start_time")
+                end_time = timestamps.get("end_time")
+                logger.info(f"Temporal range: {start_time} to {end_time}")
 
             # Collect context from retrieval strategies
             contexts = []
@@ -757,6 +878,34 @@ class AdvGraphRetrieval:
             start_str, end_str = self._format_start_end_times(start_time, end_time)
             return documents, (start_str, end_str, stream_ids)
 
+    async def _analyze_temporal(self, question: str) -> Tuple[str, Dict]:
+        """Run the temporal strategy and temporal times analyses (steps 2 and 3)
+
+        Returns:
+            Tuple[str, Dict]: The temporal strategy (None if it could not be parsed)
+                              and the parsed temporal times (None if no times are
+                              needed or parsing failed).
+        """
+        temporal_strategy_analysis = await self._parse_json_with_retries(
+            self.analyze_temporal_strategy, "temporal strategy", question
+        )
+        if not temporal_strategy_analysis:
+            return None, None
+
+        temporal_strategy = temporal_strategy_analysis.get("temporal_strategy", "none")
+        if temporal_strategy == "none":
+            return temporal_strategy, None
+
+        temporal_times = await self._parse_json_with_retries(
+            self.analyze_temporal_times, "temporal times", question, temporal_strategy
+        )
+        return temporal_strategy, temporal_times
+
+    def clear_cache(self):
+        """Drop cached schema lookups and question analyses"""
+        self._schema_cache = None
+        self._analysis_cache.clear()
+
     async def _parse_json_with_retries(self, analysis_func, analysis_type: str, *args, **kwargs) -> Dict:
         """Helper method to retry analysis function calls and parse JSON responses"""
         retry_count = 0
@@ -0,0 +1,171 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""answer_cache.py: File contains AnswerCache class"""
+
+import json
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Hashable, Optional
+
+import numpy as np
+
+
+@dataclass
+class CachedAnswer:
+    partition: Hashable
+    question: str
+    embedding: np.ndarray
+    response: str
+    created: float
+    streams: Optional[frozenset]
+    versions: Dict[str, tuple]
+
+
+class AnswerCache:
+    """
+    Semantic cache of chat answers.
+
+    Questions are normalized and embedded. A question hits an entry of the same
+    partition (rag type and requested stream filter) when the cosine similarity
+    of the embeddings reaches `similarity_threshold`.
+
+    Entries expire after `ttl` seconds. They are also invalidated when documents
+    arrive for the streams the answer depends on, or for any stream if the
+    answer was not restricted to some. Arrivals are tracked as per-stream
+    ingestion versions that the caller snapshots before answering. At most
+    `max_entries` entries are kept, least recently used first out.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        similarity_threshold: float,
+        ttl: Optional[float],
+        max_entries: int,
+    ):
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, CachedAnswer]" = OrderedDict()
+        self._next_id = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def normalize(question: str) -> str:
+        question = re.sub(r"\s+", " ", question.strip().lower())
+        return question.rstrip("?!. ")
+
+    async def aembed(self, question: str) -> np.ndarray:
+        embedding = np.asarray(
+            await self.embeddings.aembed_query(self.normalize(question)),
+            dtype=np.float32,
+        )
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm else embedding
+
+    def _is_stale(self, entry: CachedAnswer, versions: Dict[str, tuple], now: float):
+        if self.ttl is not None and now - entry.created > self.ttl:
+            return True
+        if entry.streams is None:
+            return versions != entry.versions
+        return any(versions.get(s) != entry.versions.get(s) for s in entry.streams)
+
+    def lookup(
+        self, partition: Hashable, embedding: np.ndarray, versions: Dict[str, tuple]
+    ) -> Optional[str]:
+        """Return the cached answer closest to the question, if similar enough"""
+        now = time.time()
+        candidates = []
+        for entry_id, entry in list(self._entries.items()):
+            if self._is_stale(entry, versions, now):
+                del self._entries[entry_id]
+                self.invalidations += 1
+            elif entry.partition == partition:
+                candidates.append(entry_id)
+
+        if candidates:
+            similarities = (
+                np.stack([self._entries[i].embedding for i in candidates]) @ embedding
+            )
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.similarity_threshold:
+                self._entries.move_to_end(candidates[best])
+                self.hits += 1
+                return self._entries[candidates[best]].response
+        self.misses += 1
+        return None
+
+    def put(
+        self,
+        partition: Hashable,
+        question: str,
+        embedding: np.ndarray,
+        response: str,
+        created: float,
+        streams: Optional[list],
+        versions: Dict[str, tuple],
+    ):
+        """
+        Store an answer.
+
+        Args:
+            created: Time the question was received, the TTL counts from it.
+            streams: Stream ids the answer depends on, None for all streams.
+            versions: Ingestion versions snapshotted when the question was received.
+        """
+        if self.max_entries <= 0:
+            return
+        self._entries[self._next_id] = CachedAnswer(
+            partition=partition,
+            question=question,
+            embedding=embedding,
+            response=response,
+            created=created,
+            streams=frozenset(streams) if streams else None,
+            versions=dict(versions),
+        )
+        self._next_id += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def dump_json(self, file_name: str):
+        with open(file_name, "w") as f:
+            json.dump(self.stats(), f, indent=4)
+
+    def __len__(self):
+        return len(self._entries)
@@ -15,7 +15,22 @@
 
 """function.py: File contains Function class"""
 
+import os
+import time
+from collections import Counter
+from pathlib import Path
+
 from vss_ctx_rag.base import Function
+from vss_ctx_rag.functions.rag.answer_cache import AnswerCache
+from vss_ctx_rag.utils.ctx_rag_logger import TimeMeasure, logger
+from vss_ctx_rag.utils.globals import (
+    DEFAULT_ANSWER_CACHE_MAX_ENTRIES,
+    DEFAULT_ANSWER_CACHE_SIMILARITY_THRESHOLD,
+    DEFAULT_ANSWER_CACHE_TTL,
+)
+
+# Responses that must not be served from the cache
+UNCACHED_RESPONSES = ("That didn't work. Try another question.",)
 
 
 class ChatFunction(Function):
@@ -27,6 +42,95 @@ class ChatFunction(Function):
         self.vector_db = self.get_tool("vector_db")
         self.extraction_function = self.get_function("extraction_function")
         self.retrieval_function = self.get_function("retrieval_function")
+        self.log_dir = os.environ.get("VIA_LOG_DIR", None)
+
+        # Ingestion versions of the answer cache: documents ingested per stream id,
+        # and how many of them the last graph post-processing covered
+        self._ingested = Counter()
+        self._post_processed = Counter()
+        self.answer_cache = None
+        if self.get_param("answer_cache", "enable", required=False):
+            if self.vector_db is None:
+                logger.warning("Answer cache needs the vector_db embeddings, disabled")
+            else:
+                similarity_threshold = self.get_param(
+                    "answer_cache", "similarity_threshold", required=False
+                )
+                ttl = self.get_param("answer_cache", "ttl_sec", required=False)
+                max_entries = self.get_param(
+                    "answer_cache", "max_entries", required=False
+                )
+                self.answer_cache = AnswerCache(
+                    embeddings=self.vector_db.embedding,
+                    similarity_threshold=(
+                        similarity_threshold
+                        if similarity_threshold is not None
+                        else DEFAULT_ANSWER_CACHE_SIMILARITY_THRESHOLD
+                    ),
+                    ttl=ttl if ttl is not None else DEFAULT_ANSWER_CACHE_TTL,
+                    max_entries=(
+                        max_entries
+                        if max_entries is not None
+                        else DEFAULT_ANSWER_CACHE_MAX_ENTRIES
+                    ),
+                )
+
+    def _ingestion_versions(self) -> dict:
+        """Per-stream ingestion versions, bumped by aprocess_doc and post-processing"""
+        return {
+            stream_id: (ingested, self._post_processed[stream_id])
+            for stream_id, ingested in self._ingested.items()
+        }
+
+    def _has_chat_history(self) -> bool:
+        """Whether the retrieval function answers in the context of earlier turns"""
+        has_chat_history = getattr(self.retrieval_function, "has_chat_history", None)
+        return bool(has_chat_history and has_chat_history())
+
+    async def _alookup_answer(self, state: dict):
+        """
+        Look the question up in the answer cache.
+
+        Returns:
+            Tuple: The cached response (None on a miss) and the cache request to
+                   pass to _store_answer, None if the question is not cacheable.
+        """
+        question = state.get("question", "").strip()
+        if self.answer_cache is None or not question or question.startswith("/"):
+            return None, None
+        if self._has_chat_history():
+            # Follow-up questions depend on the conversation, not only their text
+            return None, None
+        try:
+            with TimeMeasure("chat/answer_cache/lookup", "yellow"):
+                partition = (self.rag, tuple(sorted(state.get("stream_ids") or [])))
+                created = time.time()
+                versions = self._ingestion_versions()
+                embedding = await self.answer_cache.aembed(question)
+                response = self.answer_cache.lookup(partition, embedding, versions)
+        except Exception as e:
+            logger.error(f"Answer cache lookup failed: {e}")
+            return None, None
+        if response is not None:
+            logger.info("Answer cache hit")
+        self._dump_cache_metrics()
+        return response, (partition, question, embedding, created, versions)
+
+    def _store_answer(self, cache_request, state: dict):
+        response = state.get("response")
+        if cache_request is None or not response or response in UNCACHED_RESPONSES:
+            return
+        partition, question, embedding, created, versions = cache_request
+        # Retrieval functions that restrict the answer to some streams report them
+        streams = state.get("source_stream_ids") or list(partition[1]) or None
+        self.answer_cache.put(
+            partition, question, embedding, response, created, streams, versions
+        )
+
+    def _dump_cache_metrics(self):
+        if self.log_dir:
+            log_path = Path(self.log_dir).joinpath("answer_cache_metrics.json")
+            self.answer_cache.dump_json(log_path.absolute())
 
     async def acall(self, state: dict) -> dict:
         if (
@@ -35,15 +139,50 @@ class ChatFunction(Function):
             and state["post_process"]
         ):
             state = await self.extraction_function.acall(state)
+            self._post_processed = self._ingested.copy()
         if "question" in state:
+            cached, cache_request = await self._alookup_answer(state)
+            if cached is not None:
+                state["response"] = cached
+                return state
             state = await self.retrieval_function.acall(state)
+            self._store_answer(cache_request, state)
         return state
 
+    async def astream(self, state: dict):
+        if (
+            self.extraction_function
+            and "post_process" in state
+            and state["post_process"]
+        ):
+            state = await self.extraction_function.acall(state)
+            self._post_processed = self._ingested.copy()
+        if "question" in state:
+            cached, cache_request = await self._alookup_answer(state)
+            if cached is not None:
+                state["response"] = cached
+                yield {"event": "done", "data": cached}
+                return
+            async for event in self.retrieval_function.astream(state):
+                yield event
+            self._store_answer(cache_request, state)
+        else:
+            yield {"event": "done", "data": state.get("response")}
+
     async def aprocess_doc(self, doc: str, doc_i: int, doc_meta: dict):
+        self._ingested[(doc_meta or {}).get("streamId", "")] += 1
         if self.extraction_function:
             await self.extraction_function.aprocess_doc(doc, doc_i, doc_meta)
 
+    async def askip_doc(self, doc: str, doc_i: int, doc_meta: dict):
+        if self.extraction_function:
+            await self.extraction_function.askip_doc(doc, doc_i, doc_meta)
+
     async def areset(self, state: dict):
+        if self.answer_cache is not None:
+            self.answer_cache.clear()
+        self._ingested.clear()
+        self._post_processed.clear()
         if self.extraction_function:
             await self.extraction_function.areset(state)
         await self.retrieval_function.areset(state)
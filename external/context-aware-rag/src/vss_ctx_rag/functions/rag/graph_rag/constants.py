@@ -34,6 +34,20 @@ HYBRID_SEARCH_FULL_TEXT_QUERY = (
     "CREATE FULLTEXT INDEX keyword FOR (n:Chunk) ON EACH [n.text]"
 )
 
+# Range indexes backing the temporal and stream filters used at retrieval time
+CHUNK_PROPERTY_INDEX_QUERIES = [
+    "CREATE RANGE INDEX chunk_start_time IF NOT EXISTS FOR (c:Chunk) ON (c.start_time)",
+    "CREATE RANGE INDEX chunk_end_time IF NOT EXISTS FOR (c:Chunk) ON (c.end_time)",
+    "CREATE RANGE INDEX chunk_stream_id IF NOT EXISTS FOR (c:Chunk) ON (c.stream_id)",
+    "CREATE RANGE INDEX chunk_stream_id_start_time IF NOT EXISTS FOR (c:Chunk) ON (c.stream_id, c.start_time)",
+]
+# Older graphs may hold chunk times as strings, which range predicates on floats skip
+CHUNK_TIME_PROPERTY_MIGRATION_QUERY = """
+MATCH (c:Chunk)
+WHERE c.start_time IS :: STRING NOT NULL OR c.end_time IS :: STRING NOT NULL
+SET c.start_time = toFloat(c.start_time), c.end_time = toFloat(c.end_time)
+"""
+
 
 ### Vector graph search
 VECTOR_GRAPH_SEARCH_ENTITY_LIMIT = 40
@@ -217,6 +231,12 @@ VECTOR_SEARCH_TOP_K = 5
 ## CHAT SETUP
 CHAT_SEARCH_KWARG_SCORE_THRESHOLD = 0.5
 CHAT_EMBEDDING_FILTER_SCORE_THRESHOLD = 0.10
+# The retrieval fast path skips the EmbeddingsFilter, which re-embeds every
+# retrieved document, and applies its threshold to the vector index score
+# instead. Neo4j reports cosine similarity as (1 + cos) / 2.
+CHAT_FAST_PATH_SCORE_THRESHOLD = max(
+    CHAT_SEARCH_KWARG_SCORE_THRESHOLD, (1 + CHAT_EMBEDDING_FILTER_SCORE_THRESHOLD) / 2
+)
 
 QUERY_TO_DELETE_UUID_GRAPH = """
                                 MATCH (d:Document {uuid:$uuid})
@@ -15,12 +15,16 @@
 
 import os
 import asyncio
+import copy
 import hashlib
+import json
+import random
+import re
 import time
-from typing import List
+from typing import List, Optional
 
-import aiohttp
 from langchain_community.graphs.graph_document import GraphDocument
+from langchain_core.prompts import BasePromptTemplate
 
 from langchain_text_splitters import TokenTextSplitter
 from langchain.docstore.document import Document
@@ -29,7 +33,9 @@ from langchain_community.vectorstores import Neo4jVector
 
 from vss_ctx_rag.tools.storage.neo4j_db import Neo4jGraphDB
 from vss_ctx_rag.utils.ctx_rag_batcher import Batch
+from vss_ctx_rag.utils.ctx_rag_cache import LRUCache
 from vss_ctx_rag.utils.ctx_rag_logger import TimeMeasure, logger
+from vss_ctx_rag.utils.frontend_client import get_frontend_client
 from vss_ctx_rag.functions.rag.graph_rag.constants import (
     CHUNK_VECTOR_INDEX_NAME,
     DROP_CHUNK_VECTOR_INDEX_QUERY,
@@ -40,12 +46,27 @@ from vss_ctx_rag.functions.rag.graph_rag.constants import (
     LABELS_QUERY,
     HYBRID_SEARCH_FULL_TEXT_QUERY,
     FILTER_LABELS,
+    CHUNK_PROPERTY_INDEX_QUERIES,
+    CHUNK_TIME_PROPERTY_MIGRATION_QUERY,
 )
 from vss_ctx_rag.utils.globals import (
     DEFAULT_EMBEDDING_PARALLEL_COUNT,
     DEFAULT_CONCURRENT_EMBEDDING_LIMIT,
+    DEFAULT_GRAPH_EXTRACTION_CONCURRENCY,
+    DEFAULT_GRAPH_EXTRACTION_MAX_RETRIES,
+    DEFAULT_GRAPH_EXTRACTION_RETRY_BACKOFF_SEC,
 )
 
+# Live stream chunks are prefixed with "<start_ntp> <end_ntp>" tags
+TIMESTAMP_TAG_PATTERN = re.compile(r"<[0-9:.+\-TZ ]+>")
+
+
+def chunk_cache_key(text: str, extractor: str = "") -> str:
+    """Hash of a chunk's text without timestamp tags, so replays hit the cache,
+    and of the extractor fingerprint, so another model or prompt misses it"""
+    normalized = " ".join(TIMESTAMP_TAG_PATTERN.sub(" ", text).split())
+    return hashlib.sha1(f"{extractor}\0{normalized}".encode()).hexdigest()
+
 
 class GraphExtraction:
     """Handles extraction and processing of graph-based knowledge representations.
@@ -61,6 +82,10 @@ class GraphExtraction:
         llm,
         graph: Neo4jGraphDB,
         embedding_parallel_count: int = DEFAULT_EMBEDDING_PARALLEL_COUNT,
+        extraction_concurrency: int = DEFAULT_GRAPH_EXTRACTION_CONCURRENCY,
+        extraction_max_retries: int = DEFAULT_GRAPH_EXTRACTION_MAX_RETRIES,
+        extraction_cache: Optional[LRUCache] = None,
+        llm_params: Optional[dict] = None,
     ):
         self.graph_db = graph
         self.transformer = LLMGraphTransformer(
@@ -73,6 +98,7 @@ class GraphExtraction:
         self.uuid = uuid
         self.batcher = batcher
         self.create_chunk_vector_index()
+        self.create_chunk_property_indexes()
         self.cleaned_graph_documents_list = []
         self.previous_chunk_id = 0
         self.last_position = 0
@@ -80,6 +106,25 @@ class GraphExtraction:
         self._embedding_semaphore = asyncio.Semaphore(
             DEFAULT_CONCURRENT_EMBEDDING_LIMIT
         )
+        self._extraction_semaphore = asyncio.Semaphore(extraction_concurrency)
+        self.extraction_max_retries = extraction_max_retries
+        # chunk_cache_key -> (nodes, relationships) as returned by the LLM
+        self.extraction_cache = extraction_cache
+        self._extractor_fingerprint = self._fingerprint(llm_params)
+
+    def _fingerprint(self, llm_params: Optional[dict]) -> str:
+        """Model, parameters and prompt of the extraction, part of the cache keys"""
+        prompt = getattr(getattr(self.transformer, "chain", None), "first", None)
+        return json.dumps(
+            {
+                "llm": llm_params or {},
+                "prompt": (
+                    repr(prompt) if isinstance(prompt, BasePromptTemplate) else None
+                ),
+            },
+            sort_keys=True,
+            default=str,
+        )
 
     def handle_backticks_nodes_relationship_id_type(
         self, graph_document_list: List[GraphDocument]
@@ -228,8 +273,12 @@ class GraphExtraction:
                     "start_ntp_float" in chunk.source.metadata
                     and "end_ntp_float" in chunk.source.metadata
                 ):
-                    chunk_data["start_time"] = chunk.source.metadata["start_ntp_float"]
-                    chunk_data["end_time"] = chunk.source.metadata["end_ntp_float"]
+                    chunk_data["start_time"] = float(
+                        chunk.source.metadata["start_ntp_float"]
+                    )
+                    chunk_data["end_time"] = float(
+                        chunk.source.metadata["end_ntp_float"]
+                    )
 
                 batch_data.append(chunk_data)
 
@@ -519,6 +568,19 @@ class GraphExtraction:
             else:
                 raise
 
+    def create_chunk_property_indexes(self):
+        """Create the chunk time and stream_id range indexes used by retrieval"""
+        with TimeMeasure("GraphExtraction/ChunkPropertyIndexes", "blue"):
+            try:
+                self.graph_db.graph_db.query(CHUNK_TIME_PROPERTY_MIGRATION_QUERY)
+            except Exception as e:
+                logger.error(f"Failed to convert chunk time properties to float: {e}")
+            for query in CHUNK_PROPERTY_INDEX_QUERIES:
+                try:
+                    self.graph_db.graph_db.query(query)
+                except Exception as e:
+                    logger.error(f"Failed to create chunk property index: {e}")
+
     async def apost_process(self):
         with TimeMeasure("GraphRAG/aprocess-doc/graph-create/postprocessing", "green"):
             logger.debug("Post process GRAG")
@@ -537,8 +599,43 @@ class GraphExtraction:
             await asyncio.to_thread(self.create_vector_fulltext_indexes)
             await self.create_entity_embedding()
             self.cleaned_graph_documents_list.clear()
+            self.graph_db.invalidate_schema_cache()
             logger.info("Graph created")
 
+    async def aconvert_chunk(self, chunk: Document) -> GraphDocument:
+        """Extract the graph of a single chunk, with cache and retries"""
+        key = chunk_cache_key(chunk.page_content, self._extractor_fingerprint)
+        if self.extraction_cache is not None:
+            cached = self.extraction_cache.get(key)
+            if cached is not None:
+                nodes, relationships = copy.deepcopy(cached)
+                return GraphDocument(
+                    nodes=nodes, relationships=relationships, source=chunk
+                )
+
+        for attempt in range(self.extraction_max_retries + 1):
+            try:
+                async with self._extraction_semaphore:
+                    graph_document = await self.transformer.aprocess_response(chunk)
+                break
+            except Exception as e:
+                if attempt == self.extraction_max_retries:
+                    raise
+                delay = DEFAULT_GRAPH_EXTRACTION_RETRY_BACKOFF_SEC * 2**attempt
+                delay *= random.uniform(0.5, 1.5)
+                logger.warning(
+                    f"Error converting chunk to graph document "
+                    f"(attempt {attempt + 1}), retrying in {delay:.1f}s: {e}"
+                )
+                await asyncio.sleep(delay)
+
+        if self.extraction_cache is not None:
+            self.extraction_cache.put(
+                key,
+                copy.deepcopy((graph_document.nodes, graph_document.relationships)),
+            )
+        return graph_document
+
     async def acreate_graph(self, batch: Batch):
         with TimeMeasure("GraphRAG/aprocess-doc/graph-create:", "yellow"):
             docs = [
@@ -547,20 +644,30 @@ class GraphExtraction:
             ]
             combined_chunk_document_list = self.get_combined_chunks(docs)
 
-            graph_documents = []
             with TimeMeasure("GraphRAG/aprocess-doc/graph-create/convert", "blue"):
-                attempts = 0
-                while attempts < 3:
-                    try:
-                        graph_documents = await self.transformer.aconvert_to_graph_documents(
-                            combined_chunk_document_list
-                        )
-                        break
-                    except Exception as e:
-                        logger.error(f"Error converting to graph documents: {e}")
-                        attempts += 1
-                        if attempts == 3:
-                            raise e
+                results = await asyncio.gather(
+                    *[
+                        self.aconvert_chunk(chunk)
+                        for chunk in combined_chunk_document_list
+                    ],
+                    return_exceptions=True,
+                )
+            graph_documents = []
+            failed_uuids = set()
+            for chunk, result in zip(combined_chunk_document_list, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error converting chunk to graph documents: {result}")
+                    failed_uuids.add(chunk.metadata.get("uuid"))
+                else:
+                    graph_documents.append(result)
+            if not graph_documents and combined_chunk_document_list:
+                raise results[0]
+            if failed_uuids:
+                logger.error(
+                    f"Graph extraction failed for {len(results) - len(graph_documents)}"
+                    f" of {len(results)} chunks, adding the rest"
+                )
+
             cleaned_graph_documents = self.handle_backticks_nodes_relationship_id_type(
                 graph_documents
             )
@@ -571,34 +678,24 @@ class GraphExtraction:
                 self.graph_db.graph_db.add_graph_documents(
                     cleaned_graph_documents, baseEntityLabel=True
                 )
+            self.graph_db.invalidate_schema_cache()
 
             # Update transcript status to processed after successful graph creation
-            await self._update_transcript_status(docs)
+            self._update_transcript_status(
+                [doc for doc in docs if doc.metadata.get("uuid") not in failed_uuids]
+            )
 
-    async def _update_transcript_status(self, docs):
-        """Update transcript status to processed via frontend API."""
-        frontend_uri = os.environ.get('CHAT_FRONTEND_ENDPOINT', None)
-        if not frontend_uri:
+    def _update_transcript_status(self, docs):
+        """Mark transcripts as processed via frontend API, in the background."""
+        frontend_client = get_frontend_client()
+        if frontend_client is None:
             logger.info("No CHAT_FRONTEND_ENDPOINT configured, skipping transcript status update")
             return
 
-        endpoint = f"{frontend_uri}/api/update-data-stream"
-        for doc in docs:
-            doc_uuid = doc.metadata.get('uuid')
-            if doc_uuid:
-                try:
-                    # Mark as processed
-                    data = {"uuid": doc_uuid, "pending": False}
-                    async with aiohttp.ClientSession() as session:
-                        async with session.patch(endpoint, json=data) as response:
-                            if response.status == 200:
-                                logger.info(f"Successfully updated transcript status for UUID: {doc_uuid}")
-                            else:
-                                logger.warning(f"Failed to update transcript status for UUID: {doc_uuid}, status: {response.status}")
-                except Exception as e:
-                    logger.error(f"Error updating transcript status for UUID {doc_uuid}: {e}")
-            else:
-                logger.debug("Document has no UUID, skipping status update")
+        uuids = [doc.metadata.get('uuid') for doc in docs if doc.metadata.get('uuid')]
+        if len(uuids) < len(docs):
+            logger.debug("Some documents have no UUID, skipping their status update")
+        frontend_client.submit(frontend_client.update_status(uuids, pending=False))
 
     def reset(self):
         """Reset the graph extraction state.
@@ -30,10 +30,14 @@ from vss_ctx_rag.tools.health.rag_health import GraphMetrics
 from vss_ctx_rag.utils.ctx_rag_logger import TimeMeasure, logger
 from vss_ctx_rag.functions.rag.graph_rag.graph_extraction import GraphExtraction
 from vss_ctx_rag.utils.ctx_rag_batcher import Batcher
+from vss_ctx_rag.utils.ctx_rag_cache import LRUCache
 from vss_ctx_rag.utils.globals import (
     DEFAULT_RAG_TOP_K,
     LLM_TOOL_NAME,
     DEFAULT_EMBEDDING_PARALLEL_COUNT,
+    DEFAULT_GRAPH_EXTRACTION_CONCURRENCY,
+    DEFAULT_GRAPH_EXTRACTION_MAX_RETRIES,
+    DEFAULT_GRAPH_EXTRACTION_CACHE_SIZE,
 )
 from vss_ctx_rag.functions.rag.graph_rag.constants import QUERY_TO_DELETE_UUID_GRAPH
 
@@ -71,12 +75,38 @@ class GraphExtractionFunc(Function):
             else DEFAULT_EMBEDDING_PARALLEL_COUNT
         )
         logger.info(f"Embedding parallel count: {self.embedding_parallel_count}")
+        extraction_concurrency = self.get_param(
+            "params", "extraction_concurrency", required=False
+        )
+        extraction_max_retries = self.get_param(
+            "params", "extraction_max_retries", required=False
+        )
+        extraction_cache_size = self.get_param(
+            "params", "extraction_cache_size", required=False
+        )
+        # Keep cached extractions across setup() calls, e.g. on config updates.
+        # Their keys include the LLM parameters, so a new model misses them
+        if getattr(self, "extraction_cache", None) is None:
+            self.extraction_cache = LRUCache(
+                extraction_cache_size
+                if extraction_cache_size is not None
+                else DEFAULT_GRAPH_EXTRACTION_CACHE_SIZE
+            )
         self.graph_extraction = GraphExtraction(
             batcher=self.batcher,
             uuid=uuid,
             llm=self.chat_llm,
             graph=self.graph_db,
             embedding_parallel_count=self.embedding_parallel_count,
+            extraction_concurrency=extraction_concurrency
+            or DEFAULT_GRAPH_EXTRACTION_CONCURRENCY,
+            extraction_max_retries=(
+                extraction_max_retries
+                if extraction_max_retries is not None
+                else DEFAULT_GRAPH_EXTRACTION_MAX_RETRIES
+            ),
+            extraction_cache=self.extraction_cache,
+            llm_params=self.get_param("llm", required=False),
         )
         self.graph_create_start = None
 
@@ -91,9 +121,10 @@ class GraphExtractionFunc(Function):
         # Dump Graph RAG Metrics after all the add_doc and create_graph calls
         # When acall happens, all the aprocess_docs are complete and we want to publish the
         # total time taken in aprocess_doc which we can't do in aprocess_doc itself.
+        self.metrics.batcher = self.batcher.memory_stats()
         if self.log_dir:
             log_path = Path(self.log_dir).joinpath("graph_rag_metrics.json")
-            self.metrics.dump_json(log_path.absolute())
+            self.metrics.dump_json(log_path.absolute(), force=True)
         return state
 
     async def aprocess_doc(self, doc: str, doc_i: int, doc_meta: Optional[dict] = None):
@@ -110,49 +141,66 @@ class GraphExtractionFunc(Function):
                         + doc
                     )
             batch = self.batcher.add_doc(doc, doc_i=doc_i, doc_meta=doc_meta)
-            if batch.is_full():
-                with TimeMeasure(
-                    "GraphRAG/aprocess-doc/graph-create: "
-                    + str(self.batcher.get_batch_index(doc_i)),
-                    "green",
-                ):
-                    try:
-                        with get_openai_callback() as cb:
-                            await self.graph_extraction.acreate_graph(batch)
-                        logger.info(
-                            "GraphRAG Creation for %d docs\n"
-                            "Total Tokens: %s, "
-                            "Prompt Tokens: %s, "
-                            "Completion Tokens: %s, "
-                            "Successful Requests: %s, "
-                            "Total Cost (USD): $%s"
-                            % (
-                                batch._batch_size,
-                                cb.total_tokens,
-                                cb.prompt_tokens,
-                                cb.completion_tokens,
-                                cb.successful_requests,
-                                cb.total_cost,
-                            ),
-                        )
-                        self.metrics.graph_create_tokens += cb.total_tokens
-                        self.metrics.graph_create_requests += cb.successful_requests
-                    except Exception as e:
-                        logger.error(traceback.format_exc())
-                        logger.error(
-                            "GraphRAG/aprocess-doc Failed with error %s\n Skipping...",
-                            e,
-                        )
-                        return "Failed"
+            if batch.is_full() and not await self._acreate_batch_graph(batch):
+                return "Failed"
         if self.graph_create_start is None:
             self.graph_create_start = tm.start_time
         self.metrics.graph_create_latency = tm.end_time - self.graph_create_start
         return "Success"
 
+    async def _acreate_batch_graph(self, batch) -> bool:
+        """Extract the graph of a full batch, returning whether it succeeded"""
+        if not len(batch):
+            # Every doc of the batch was dropped before ingestion
+            self.batcher.evict(batch._batch_index)
+            return True
+        with TimeMeasure(
+            "GraphRAG/aprocess-doc/graph-create: " + str(batch._batch_index),
+            "green",
+        ):
+            try:
+                with get_openai_callback() as cb:
+                    await self.graph_extraction.acreate_graph(batch)
+                logger.info(
+                    "GraphRAG Creation for %d docs\n"
+                    "Total Tokens: %s, "
+                    "Prompt Tokens: %s, "
+                    "Completion Tokens: %s, "
+                    "Successful Requests: %s, "
+                    "Total Cost (USD): $%s"
+                    % (
+                        batch._batch_size,
+                        cb.total_tokens,
+                        cb.prompt_tokens,
+                        cb.completion_tokens,
+                        cb.successful_requests,
+                        cb.total_cost,
+                    ),
+                )
+                self.metrics.graph_create_tokens += cb.total_tokens
+                self.metrics.graph_create_requests += cb.successful_requests
+            except Exception as e:
+                logger.error(traceback.format_exc())
+                logger.error(
+                    "GraphRAG/aprocess-doc Failed with error %s\n Skipping...",
+                    e,
+                )
+                return False
+            finally:
+                # Graph documents are in Neo4j, release the batch text
+                self.batcher.evict(batch._batch_index)
+        return True
+
+    async def askip_doc(self, doc: str, doc_i: int, doc_meta: Optional[dict] = None):
+        batch = self.batcher.skip_doc(doc_i, doc_meta)
+        if batch.is_full():
+            await self._acreate_batch_graph(batch)
+
     async def areset(self, state: dict):
         self.batcher.flush()
         self.graph_create_start = None
         self.graph_extraction.reset()
+        logger.info(f"Graph extraction cache stats: {self.extraction_cache.stats()}")
         self.metrics.reset()
         if "uuid" in state and state["uuid"] is not None:
             self.graph_db.run_cypher_query(
@@ -160,5 +208,6 @@ class GraphExtractionFunc(Function):
             )
         else:
             self.graph_db.run_cypher_query("MATCH (n) DETACH DELETE n")
+        self.graph_db.invalidate_schema_cache()
 
         await asyncio.sleep(0.01)
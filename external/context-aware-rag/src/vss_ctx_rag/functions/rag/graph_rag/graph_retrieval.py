@@ -13,9 +13,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import os
 import traceback
-import threading
 from functools import partial
 
 from langchain_community.vectorstores.neo4j_vector import Neo4jVector
@@ -30,6 +30,7 @@ from langchain.retrievers.document_compressors import (
     DocumentCompressorPipeline,
 )
 from langchain_community.chat_message_histories import ChatMessageHistory
+from langchain_core.messages import HumanMessage
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 from vss_ctx_rag.utils.ctx_rag_logger import TimeMeasure, logger
@@ -41,6 +42,7 @@ from vss_ctx_rag.functions.rag.graph_rag.constants import (
     VECTOR_GRAPH_SEARCH_QUERY,
     VECTOR_SEARCH_TOP_K,
     CHAT_EMBEDDING_FILTER_SCORE_THRESHOLD,
+    CHAT_FAST_PATH_SCORE_THRESHOLD,
 )
 from vss_ctx_rag.tools.storage.neo4j_db import Neo4jGraphDB
 
@@ -53,10 +55,14 @@ class GraphRetrieval:
         multi_channel=False,
         uuid="default",
         top_k=None,
+        fast_path=False,
     ):
         self.chat_llm = llm
+        self.fast_path = fast_path
         self.graph_db = graph
         self.chat_history = ChatMessageHistory()
+        self._chat_summary_task = None
+        self._chat_summary_requested = False
         self.top_k = top_k
         self.uuid = uuid
         self.multi_channel = multi_channel
@@ -125,7 +131,11 @@ class GraphRetrieval:
                     search_type="similarity_score_threshold",
                     search_kwargs={
                         "k": search_k,
-                        "score_threshold": CHAT_SEARCH_KWARG_SCORE_THRESHOLD,
+                        "score_threshold": (
+                            CHAT_FAST_PATH_SCORE_THRESHOLD
+                            if self.fast_path
+                            else CHAT_SEARCH_KWARG_SCORE_THRESHOLD
+                        ),
                         "filter": {"uuid": self.uuid}
                         if not self.multi_channel
                         else None,
@@ -157,24 +167,28 @@ class GraphRetrieval:
                 )
 
                 output_parser = StrOutputParser()
-                embeddings_dimension = int(
-                    os.environ.get("CA_RAG_EMBEDDINGS_DIMENSION", 1024)
-                )
-                splitter = RecursiveCharacterTextSplitter(
-                    chunk_size=embeddings_dimension,
-                    chunk_overlap=0,
-                    separators=["\n\n", "\n", "\n-", ".", ";", ",", " ", ""],
-                )
-                embeddings_filter = EmbeddingsFilter(
-                    embeddings=self.graph_db.embeddings,
-                    similarity_threshold=CHAT_EMBEDDING_FILTER_SCORE_THRESHOLD,
-                )
-                pipeline_compressor = DocumentCompressorPipeline(
-                    transformers=[splitter, embeddings_filter]
-                )
-                compression_retriever = ContextualCompressionRetriever(
-                    base_compressor=pipeline_compressor, base_retriever=neo_4j_retriever
-                )
+                if self.fast_path:
+                    compression_retriever = neo_4j_retriever
+                else:
+                    embeddings_dimension = int(
+                        os.environ.get("CA_RAG_EMBEDDINGS_DIMENSION", 1024)
+                    )
+                    splitter = RecursiveCharacterTextSplitter(
+                        chunk_size=embeddings_dimension,
+                        chunk_overlap=0,
+                        separators=["\n\n", "\n", "\n-", ".", ";", ",", " ", ""],
+                    )
+                    embeddings_filter = EmbeddingsFilter(
+                        embeddings=self.graph_db.embeddings,
+                        similarity_threshold=CHAT_EMBEDDING_FILTER_SCORE_THRESHOLD,
+                    )
+                    pipeline_compressor = DocumentCompressorPipeline(
+                        transformers=[splitter, embeddings_filter]
+                    )
+                    compression_retriever = ContextualCompressionRetriever(
+                        base_compressor=pipeline_compressor,
+                        base_retriever=neo_4j_retriever,
+                    )
                 query_transforming_retriever_chain = RunnableBranch(
                     (
                         lambda x: len(x.get("messages", [])) == 1,
@@ -211,10 +225,10 @@ class GraphRetrieval:
                 )
                 raise
 
-    def retrieve_documents(self):
+    async def aretrieve_documents(self):
         with TimeMeasure("Retrive documents", "green"):
             try:
-                docs = self.doc_retriever.invoke(
+                docs = await self.doc_retriever.ainvoke(
                     {"messages": self.chat_history.messages}
                 )
 
@@ -332,17 +346,32 @@ class GraphRetrieval:
         self.chat_history.add_message(message)
 
     def clear_chat_history(self):
+        self._chat_summary_requested = False
+        if self._chat_summary_task is not None and not self._chat_summary_task.done():
+            self._chat_summary_task.cancel()
         self.chat_history.clear()
 
     def summarize_chat_history(self):
-        summarization_thread = threading.Thread(
-            target=self.summarize_chat_history_and_log,
-            args=(self.chat_history.messages,),
-        )
-        summarization_thread.start()
+        """Request a compaction of the chat history.
 
-    def get_response(self, question, formatted_docs):
-        return self.question_answering_chain.invoke(
+        Compaction runs in a single background task. Requests made while it is
+        running are coalesced into one more pass over the latest history.
+        """
+        self._chat_summary_requested = True
+        if self._chat_summary_task is None or self._chat_summary_task.done():
+            self._chat_summary_task = asyncio.create_task(
+                self._chat_summary_worker()
+            )
+
+    async def _chat_summary_worker(self):
+        while self._chat_summary_requested:
+            self._chat_summary_requested = False
+            await self.asummarize_chat_history_and_log(
+                list(self.chat_history.messages)
+            )
+
+    async def aget_response(self, question, formatted_docs):
+        return await self.question_answering_chain.ainvoke(
             {
                 "messages": self.chat_history.messages[:-1],
                 "context": formatted_docs,
@@ -350,28 +379,53 @@ class GraphRetrieval:
             }
         )
 
-    def summarize_chat_history_and_log(self, stored_messages):
-        logger.info("Starting summarizing chat history in a separate thread.")
+    async def astream_response(self, question, formatted_docs):
+        """Stream the answer text as it is generated"""
+        async for chunk in self.question_answering_chain.astream(
+            {
+                "messages": self.chat_history.messages[:-1],
+                "context": formatted_docs,
+                "input": question,
+            }
+        ):
+            yield chunk.content
+
+    async def asummarize_chat_history_and_log(self, stored_messages):
+        logger.info("Starting summarizing chat history in the background.")
         if not stored_messages:
             logger.info("No messages to summarize.")
             return False
 
         try:
             with TimeMeasure("GraphRetrieval/SummarizeChat", "yellow"):
-                summary_message = self.chat_history_summarization_chain.invoke(
+                summary_message = await self.chat_history_summarization_chain.ainvoke(
                     {"chat_history": stored_messages}
                 )
                 summary_message.content = remove_think_tags(summary_message.content)
 
-                with threading.Lock():
-                    self.chat_history.clear()
-                    self.chat_history.add_user_message(
-                        "Our current conversation summary till now: "
-                        + summary_message.content
-                    )
-                    logger.debug(
-                        f"after summarization chat history: {self.chat_history.messages}"
-                    )
+                # Messages may have been added (or the history cleared) while the
+                # summary was generated. Only replace the summarized prefix.
+                messages = self.chat_history.messages
+                if len(messages) < len(stored_messages) or any(
+                    current is not stored
+                    for current, stored in zip(messages, stored_messages)
+                ):
+                    logger.debug("Chat history changed during summarization, skipping")
+                    return False
+                newer_messages = messages[len(stored_messages) :]
+                self.chat_history.clear()
+                self.chat_history.add_messages(
+                    [
+                        HumanMessage(
+                            content="Our current conversation summary till now: "
+                            + summary_message.content
+                        )
+                    ]
+                    + newer_messages
+                )
+                logger.debug(
+                    f"after summarization chat history: {self.chat_history.messages}"
+                )
                 return True
 
         except Exception as e:
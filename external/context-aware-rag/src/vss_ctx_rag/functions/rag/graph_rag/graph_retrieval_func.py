@@ -32,7 +32,7 @@ from vss_ctx_rag.utils.globals import (
     DEFAULT_CHAT_HISTORY,
 )
 from langchain_core.messages import HumanMessage, AIMessage
-from vss_ctx_rag.utils.utils import remove_think_tags
+from vss_ctx_rag.utils.utils import astream_text_filter, remove_think_tags
 
 
 class GraphRetrievalFunc(Function):
@@ -70,6 +70,7 @@ class GraphRetrievalFunc(Function):
                 multi_channel=self.multi_channel,
                 uuid=uuid,
                 top_k=self.top_k,
+                fast_path=bool(self.get_param("params", "fast_path", required=False)),
             )
         except Exception as e:
             logger.error(f"Error initializing GraphRetrieval: {e}")
@@ -92,24 +93,15 @@ class GraphRetrievalFunc(Function):
                 user_message = HumanMessage(content=question)
                 self.graph_retrieval.add_message(user_message)
 
-            docs = self.graph_retrieval.retrieve_documents()
+            docs = await self.graph_retrieval.aretrieve_documents()
 
             if docs:
                 formatted_docs = self.graph_retrieval.process_documents(docs)
-                ai_response = self.graph_retrieval.get_response(
+                ai_response = await self.graph_retrieval.aget_response(
                     question, formatted_docs
                 )
                 answer = remove_think_tags(ai_response.content)
-                if self.chat_history:
-                    with TimeMeasure("GraphRetrieval/AIMsg", "red"):
-                        ai_message = AIMessage(content=answer)
-                        self.graph_retrieval.add_message(ai_message)
-
-                    self.graph_retrieval.summarize_chat_history()
-
-                    logger.debug("Summarizing chat history thread started.")
-                else:
-                    self.graph_retrieval.clear_chat_history()
+                self._complete_turn(answer)
             else:
                 formatted_docs = "No documents retrieved."
                 answer = "Sorry, I don't see that in the video."
@@ -117,11 +109,7 @@ class GraphRetrievalFunc(Function):
 
             state["response"] = answer
             state["response"] = self.regex_object.sub(r"\g<1>", state["response"])
-
-            if "formatted_docs" in state:
-                state["formatted_docs"].append(formatted_docs)
-            else:
-                state["formatted_docs"] = [formatted_docs]
+            self._add_formatted_docs(state, formatted_docs)
 
         except Exception as e:
             logger.error(traceback.format_exc())
@@ -130,6 +118,78 @@ class GraphRetrievalFunc(Function):
 
         return state
 
+    async def astream(self, state: dict):
+        try:
+            question = state.get("question", "").strip()
+            if not question:
+                raise ValueError("No input provided in state.")
+
+            if question.lower() == "/clear":
+                logger.debug("Clearing chat history...")
+                self.graph_retrieval.clear_chat_history()
+                state["response"] = "Cleared chat history"
+                yield {"event": "done", "data": state["response"]}
+                return
+
+            with TimeMeasure("GraphRetrieval/HumanMessage", "blue"):
+                user_message = HumanMessage(content=question)
+                self.graph_retrieval.add_message(user_message)
+
+            docs = await self.graph_retrieval.aretrieve_documents()
+
+            if docs:
+                formatted_docs = self.graph_retrieval.process_documents(docs)
+                yield {"event": "context", "data": {"formatted_docs": formatted_docs}}
+                # The history keeps the answer without the timestamp substitution
+                answer = ""
+                response = ""
+                with TimeMeasure("GraphRetrieval/generation", "red"):
+                    async for text in astream_text_filter(
+                        self.graph_retrieval.astream_response(question, formatted_docs),
+                        remove_think_tags,
+                    ):
+                        answer += text
+                        text = self.regex_object.sub(r"\g<1>", text)
+                        response += text
+                        yield {"event": "token", "data": text}
+                self._complete_turn(answer)
+            else:
+                formatted_docs = "No documents retrieved."
+                response = "Sorry, I don't see that in the video."
+                self.graph_retrieval.chat_history.messages.pop()
+
+            self._add_formatted_docs(state, formatted_docs)
+
+        except Exception as e:
+            logger.error(traceback.format_exc())
+            logger.error("Error in QA %s", str(e))
+            response = "That didn't work. Try another question."
+
+        state["response"] = response
+        yield {"event": "done", "data": response}
+
+    def _complete_turn(self, answer: str):
+        if self.chat_history:
+            with TimeMeasure("GraphRetrieval/AIMsg", "red"):
+                ai_message = AIMessage(content=answer)
+                self.graph_retrieval.add_message(ai_message)
+
+            self.graph_retrieval.summarize_chat_history()
+
+            logger.debug("Summarizing chat history task scheduled.")
+        else:
+            self.graph_retrieval.clear_chat_history()
+
+    def has_chat_history(self) -> bool:
+        return bool(self.graph_retrieval.chat_history.messages)
+
+    @staticmethod
+    def _add_formatted_docs(state: dict, formatted_docs: str):
+        if "formatted_docs" in state:
+            state["formatted_docs"].append(formatted_docs)
+        else:
+            state["formatted_docs"] = [formatted_docs]
+
     async def aprocess_doc(self, doc: str, doc_i: int, doc_meta: dict):
         pass
 
@@ -0,0 +1,202 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""hybrid_retriever.py: File contains BM25Index and HybridRetriever classes"""
+
+import asyncio
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import PrivateAttr
+
+from vss_ctx_rag.utils.ctx_rag_logger import TimeMeasure, logger
+
+# Keeps call signs, unit numbers and addresses such as "ke7abc", "12-34" or "4.5" whole
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-./][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """
+    Incremental in-memory BM25 index.
+
+    Documents can be added and removed at any time, statistics are kept up to
+    date so that no rebuild is needed.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[Hashable, int]] = defaultdict(dict)
+        self._doc_len: Dict[Hashable, int] = {}
+        self._docs: Dict[Hashable, Document] = {}
+        self._total_len = 0
+
+    def add(self, doc_id: Hashable, doc: Document):
+        if doc_id in self._docs:
+            self.remove(doc_id)
+        terms = Counter(tokenize(doc.page_content))
+        for term, tf in terms.items():
+            self._postings[term][doc_id] = tf
+        length = sum(terms.values())
+        self._doc_len[doc_id] = length
+        self._total_len += length
+        self._docs[doc_id] = doc
+
+    def remove(self, doc_id: Hashable):
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return
+        for term in set(tokenize(doc.page_content)):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_len -= self._doc_len.pop(doc_id)
+
+    def search(self, query: str, k: int) -> List[Tuple[Document, float]]:
+        n_docs = len(self._docs)
+        if not n_docs:
+            return []
+        avg_len = self._total_len / n_docs
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._doc_len[doc_id] / avg_len)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(self._docs[doc_id], score) for doc_id, score in best]
+
+    def clear(self):
+        self._postings.clear()
+        self._doc_len.clear()
+        self._docs.clear()
+        self._total_len = 0
+
+    def __len__(self):
+        return len(self._docs)
+
+
+def reciprocal_rank_fusion(
+    rankings: List[List[Document]], k: int = 60
+) -> List[Tuple[Document, float]]:
+    """Fuse ranked document lists, scoring each document with sum(1 / (k + rank))"""
+    scores = defaultdict(float)
+    docs = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            key = doc.page_content
+            scores[key] += 1.0 / (k + rank)
+            docs.setdefault(key, doc)
+    fused = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    return [(docs[key], score) for key, score in fused]
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Dense + BM25 retriever over the Milvus caption documents.
+
+    The BM25 index is kept in memory and synced incrementally from Milvus with
+    the documents whose primary key is above the last one indexed. Results of the
+    dense retriever and of BM25 are fused with reciprocal rank fusion. The index
+    is rebuilt when documents were deleted from Milvus, e.g. by retention.
+    """
+
+    vector_db: Any
+    dense_retriever: BaseRetriever
+    k: int
+    top_n: int
+    expr: Optional[str] = None
+    rrf_k: int = 60
+
+    _index: BM25Index = PrivateAttr(default_factory=BM25Index)
+    _last_pk: int = PrivateAttr(default=-1)
+    _data_version: int = PrivateAttr(default=0)
+    _sync_lock: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
+
+    def _add_to_index(self, docs):
+        for pk, doc in docs:
+            self._index.add(pk, doc)
+            self._last_pk = max(self._last_pk, pk)
+        if docs:
+            logger.debug(f"BM25 index synced, {len(self._index)} documents")
+
+    def _check_data_version(self):
+        data_version = getattr(self.vector_db, "data_version", 0)
+        if data_version != self._data_version:
+            self.reset()
+            self._data_version = data_version
+
+    def sync_index(self):
+        self._check_data_version()
+        self._add_to_index(self.vector_db.get_docs_after(self._last_pk, self.expr))
+
+    async def async_index(self):
+        async with self._sync_lock:
+            self._check_data_version()
+            with TimeMeasure("HybridRetriever/sync_index", "yellow"):
+                self._add_to_index(
+                    await self.vector_db.aget_docs_after(self._last_pk, self.expr)
+                )
+
+    def reset(self):
+        self._index.clear()
+        self._last_pk = -1
+
+    def _fuse(self, dense_docs: List[Document], query: str) -> List[Document]:
+        sparse_docs = [doc for doc, _ in self._index.search(query, self.k)]
+        fused = reciprocal_rank_fusion([dense_docs, sparse_docs], k=self.rrf_k)
+        docs = []
+        for doc, score in fused[: self.top_n]:
+            doc.metadata["rrf_score"] = score
+            docs.append(doc)
+        return docs
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        self.sync_index()
+        dense_docs = self.dense_retriever.invoke(
+            query, config={"callbacks": run_manager.get_child()}
+        )
+        return self._fuse(dense_docs, query)
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        _, dense_docs = await asyncio.gather(
+            self.async_index(),
+            self.dense_retriever.ainvoke(
+                query, config={"callbacks": run_manager.get_child()}
+            ),
+        )
+        return self._fuse(dense_docs, query)
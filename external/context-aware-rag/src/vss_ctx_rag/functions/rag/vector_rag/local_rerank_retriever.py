@@ -0,0 +1,105 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""local_rerank_retriever.py: File contains LocalRerankRetriever class"""
+
+import asyncio
+import time
+from typing import Any, List, Optional
+
+import numpy as np
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from vss_ctx_rag.utils.ctx_rag_logger import TimeMeasure
+
+
+class LocalRerankRetriever(BaseRetriever):
+    """
+    Milvus retriever that ranks candidates locally.
+
+    Candidates come back from Milvus with their stored vectors and are ranked by
+    cosine similarity to the query embedding. Nothing is re-embedded. The remote
+    reranker is only called when more than `rerank_min_candidates` candidates
+    are returned. Otherwise the `top_n` best local matches are kept.
+
+    With `search_window_days`, only the Milvus partitions of the last
+    `search_window_days` days are searched when the collection is partitioned
+    by stream and day.
+    """
+
+    vector_db: Any
+    k: int
+    top_n: int
+    expr: Optional[str] = None
+    rerank_min_candidates: Optional[int] = None
+    search_window_days: Optional[float] = None
+
+    def _partition_names(self) -> Optional[List[str]]:
+        if self.search_window_days is None:
+            return None
+        return self.vector_db.partitions_for_window(
+            start=time.time() - self.search_window_days * 86400
+        )
+
+    def _rank(self, query_vector, hits) -> List[Document]:
+        if not hits:
+            return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        vectors = np.asarray([vector for _, vector in hits], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+        scores = (vectors @ query) / np.where(norms > 0, norms, 1.0)
+        docs = []
+        for i in np.argsort(-scores):
+            doc = hits[i][0]
+            doc.metadata["relevance_score"] = float(scores[i])
+            docs.append(doc)
+        return docs
+
+    def _needs_remote_rerank(self, docs: List[Document]) -> bool:
+        return (
+            self.rerank_min_candidates is not None
+            and len(docs) > self.rerank_min_candidates
+        )
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        query_vector, hits = self.vector_db.search_with_vectors(
+            query, self.k, self.expr, self._partition_names()
+        )
+        docs = self._rank(query_vector, hits)
+        if self._needs_remote_rerank(docs):
+            with TimeMeasure("LocalRerankRetriever/remote_rerank", "yellow"):
+                return list(self.vector_db.reranker.compress_documents(docs, query))
+        return docs[: self.top_n]
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        query_vector, hits = await self.vector_db.asearch_with_vectors(
+            query, self.k, self.expr, await asyncio.to_thread(self._partition_names)
+        )
+        docs = self._rank(query_vector, hits)
+        if self._needs_remote_rerank(docs):
+            with TimeMeasure("LocalRerankRetriever/remote_rerank", "yellow"):
+                return list(
+                    await self.vector_db.reranker.acompress_documents(docs, query)
+                )
+        return docs[: self.top_n]
@@ -22,16 +22,29 @@ import traceback
 from typing import Optional, List, Dict
 import asyncio
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import format_document
 from langchain.retrievers import ContextualCompressionRetriever
 from langchain.chains import RetrievalQA
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain.retrievers.document_compressors import DocumentCompressorPipeline
 
 from vss_ctx_rag.base import Function
-from vss_ctx_rag.tools.storage.milvus_db import MilvusDBTool
+from vss_ctx_rag.tools.storage import StorageTool
 from vss_ctx_rag.tools.health.rag_health import GraphMetrics
 from vss_ctx_rag.utils.ctx_rag_logger import TimeMeasure, logger
-from vss_ctx_rag.utils.globals import DEFAULT_RAG_TOP_K, LLM_TOOL_NAME
+from vss_ctx_rag.functions.rag.vector_rag.hybrid_retriever import HybridRetriever
+from vss_ctx_rag.functions.rag.vector_rag.local_rerank_retriever import (
+    LocalRerankRetriever,
+)
+from vss_ctx_rag.utils.globals import (
+    DEFAULT_HYBRID_SEARCH,
+    DEFAULT_RAG_TOP_K,
+    DEFAULT_RRF_K,
+    DEFAULT_RERANK_MIN_CANDIDATES,
+    DEFAULT_RETRIEVAL_FAST_PATH,
+    LLM_TOOL_NAME,
+)
+from vss_ctx_rag.utils.utils import astream_text_filter
 
 
 class VectorRetrievalFunc(Function):
@@ -39,7 +52,7 @@ class VectorRetrievalFunc(Function):
 
     config: dict
     output_parser = StrOutputParser()
-    vector_db: MilvusDBTool
+    vector_db: StorageTool
     metrics = GraphMetrics()
 
     def setup(self):
@@ -76,23 +89,65 @@ class VectorRetrievalFunc(Function):
         logger.info(f"Show snippets: {self.show_snippets}")
 
         self.log_dir = os.environ.get("VIA_LOG_DIR", None)
-        embeddings_dimension = int(os.environ.get("CA_RAG_EMBEDDINGS_DIMENSION", 1024))
-        splitter = RecursiveCharacterTextSplitter(
-            chunk_size=embeddings_dimension,
-            chunk_overlap=0,
-            separators=["\n\n", "\n", "\n-", ".", ";", ",", " ", ""],
+        fast_path = self.get_param("params", "fast_path", required=False)
+        self.fast_path = fast_path if fast_path is not None else DEFAULT_RETRIEVAL_FAST_PATH
+        search_window_days = self.get_param(
+            "params", "search_window_days", required=False
         )
-        pipeline_compressor = DocumentCompressorPipeline(
-            transformers=[splitter, self.vector_db.reranker]
-        )
-        self.compression_retriever = ContextualCompressionRetriever(
-            base_compressor=pipeline_compressor,
-            base_retriever=self.vector_db.vector_db.as_retriever(
-                search_kwargs={"filter": {"doc_type": "caption"}, "k": self.top_k}
-            ),
+        if search_window_days is not None and not self.fast_path:
+            logger.warning("search_window_days is only applied with fast_path")
+        if self.fast_path:
+            rerank_min_candidates = self.get_param(
+                "params", "rerank_min_candidates", required=False
+            )
+            self.retriever = LocalRerankRetriever(
+                vector_db=self.vector_db,
+                k=self.top_k,
+                top_n=self.vector_db.reranker.top_n,
+                expr='doc_type == "caption"',
+                rerank_min_candidates=(
+                    rerank_min_candidates
+                    if rerank_min_candidates is not None
+                    else DEFAULT_RERANK_MIN_CANDIDATES
+                ),
+                search_window_days=search_window_days,
+            )
+        else:
+            embeddings_dimension = int(
+                os.environ.get("CA_RAG_EMBEDDINGS_DIMENSION", 1024)
+            )
+            splitter = RecursiveCharacterTextSplitter(
+                chunk_size=embeddings_dimension,
+                chunk_overlap=0,
+                separators=["\n\n", "\n", "\n-", ".", ";", ",", " ", ""],
+            )
+            pipeline_compressor = DocumentCompressorPipeline(
+                transformers=[splitter, self.vector_db.reranker]
+            )
+            self.retriever = ContextualCompressionRetriever(
+                base_compressor=pipeline_compressor,
+                base_retriever=self.vector_db.vector_db.as_retriever(
+                    search_kwargs={"filter": {"doc_type": "caption"}, "k": self.top_k}
+                ),
+            )
+        logger.info(f"Retrieval fast path: {self.fast_path}")
+        hybrid_search = self.get_param("params", "hybrid_search", required=False)
+        self.hybrid_search = (
+            hybrid_search if hybrid_search is not None else DEFAULT_HYBRID_SEARCH
         )
+        if self.hybrid_search:
+            rrf_k = self.get_param("params", "rrf_k", required=False)
+            self.retriever = HybridRetriever(
+                vector_db=self.vector_db,
+                dense_retriever=self.retriever,
+                k=self.top_k,
+                top_n=self.vector_db.reranker.top_n,
+                expr='doc_type == "caption"',
+                rrf_k=rrf_k if rrf_k is not None else DEFAULT_RRF_K,
+            )
+        logger.info(f"Hybrid BM25 search: {self.hybrid_search}")
         self.g_semantic_sim_chain = RetrievalQA.from_chain_type(
-            llm=self.chat_llm, retriever=self.compression_retriever, return_source_documents=True
+            llm=self.chat_llm, retriever=self.retriever, return_source_documents=True
         )
 
     def format_citation(self, doc_metadata: Dict, citation_id: int) -> str:
@@ -174,12 +229,30 @@ class VectorRetrievalFunc(Function):
         logger.info(f"Extracted {len(citations)} citations total")
         return citations
 
-    async def acall(self, state: dict):
-        """QnA function call"""
+    def add_citations(self, state: dict, retrieved_docs) -> str:
+        """Store citations of the retrieved documents in state and return their display text."""
+        logger.info(f"Found {len(retrieved_docs)} source documents")
+
+        citations = self.extract_citations_from_docs(retrieved_docs)
+        citation_display = self.format_citations_display(citations, retrieved_docs)
+        if not citation_display:
+            logger.warning("Citation display is empty")
+
+        # Store citations in state for potential UI use
+        state["citations"] = citations
+        state["retrieved_docs"] = len(retrieved_docs)
+        logger.info(f"Stored {len(citations)} citations in state")
+        return citation_display
+
+    def dump_metrics(self):
         if self.log_dir:
             with TimeMeasure("VectorRAG/aprocess-doc/metrics_dump", "yellow"):
                 log_path = Path(self.log_dir).joinpath("vector_rag_metrics.json")
                 self.metrics.dump_json(log_path.absolute())
+
+    async def acall(self, state: dict):
+        """QnA function call"""
+        self.dump_metrics()
         try:
             logger.debug("Running qna with question: %s", state["question"])
             with TimeMeasure("VectorRAG/retrieval", "red"):
@@ -197,22 +270,12 @@ class VectorRetrievalFunc(Function):
                 # Add citations if enabled
                 logger.info(f"Checking for citations. Enabled: {self.citations_enabled}")
                 if self.citations_enabled and "source_documents" in semantic_search_answer:
-                    retrieved_docs = semantic_search_answer["source_documents"]
-                    logger.info(f"Found {len(retrieved_docs)} source documents")
-
-                    citations = self.extract_citations_from_docs(retrieved_docs)
-                    citation_display = self.format_citations_display(citations, retrieved_docs)
-
+                    citation_display = self.add_citations(
+                        state, semantic_search_answer["source_documents"]
+                    )
                     if citation_display:
                         logger.info("Adding citations to response")
                         response = citation_display + response
-                    else:
-                        logger.warning("Citation display is empty")
-
-                    # Store citations in state for potential UI use
-                    state["citations"] = citations
-                    state["retrieved_docs"] = len(retrieved_docs)
-                    logger.info(f"Stored {len(citations)} citations in state")
                 else:
                     if not self.citations_enabled:
                         logger.info("Citations are disabled")
@@ -228,10 +291,63 @@ class VectorRetrievalFunc(Function):
             state["response"] = "That didn't work. Try another question."
         return state
 
+    async def astream(self, state: dict):
+        """Streaming QnA: citations are sent once retrieval is done, then the answer tokens"""
+        self.dump_metrics()
+        try:
+            question = state["question"]
+            logger.debug("Streaming qna with question: %s", question)
+            with TimeMeasure("VectorRAG/retrieval", "red"):
+                retrieved_docs = await self.retriever.ainvoke(question)
+
+            citation_display = ""
+            if self.citations_enabled:
+                citation_display = self.add_citations(state, retrieved_docs)
+            yield {
+                "event": "context",
+                "data": {
+                    "citations": state.get("citations", []),
+                    "retrieved_docs": len(retrieved_docs),
+                    "sources": citation_display,
+                },
+            }
+
+            # Same prompt as the "stuff" chain used by acall
+            combine_chain = self.g_semantic_sim_chain.combine_documents_chain
+            context = combine_chain.document_separator.join(
+                format_document(doc, combine_chain.document_prompt)
+                for doc in retrieved_docs
+            )
+            prompt = await combine_chain.llm_chain.prompt.ainvoke(
+                {combine_chain.document_variable_name: context, "question": question}
+            )
+
+            async def tokens():
+                async for chunk in self.chat_llm.astream(prompt):
+                    yield chunk.content
+
+            response = ""
+            with TimeMeasure("VectorRAG/generation", "red"):
+                async for text in astream_text_filter(
+                    tokens(), lambda t: self.regex_object.sub(r"\g<1>", t)
+                ):
+                    response += text
+                    yield {"event": "token", "data": text}
+            response = citation_display + response
+            logger.info(f"Final response length: {len(response)}")
+        except Exception as e:
+            logger.error(traceback.format_exc())
+            logger.error("Error in QA %s", str(e))
+            response = "That didn't work. Try another question."
+        state["response"] = response
+        yield {"event": "done", "data": response}
+
     async def aprocess_doc(self, doc: str, doc_i: int, doc_meta: Optional[dict] = None):
         pass
 
     async def areset(self, expr):
         self.metrics.reset()
         self.vector_db.drop_data("pk > 0")
+        if self.hybrid_search:
+            self.retriever.reset()
         await asyncio.sleep(0.01)
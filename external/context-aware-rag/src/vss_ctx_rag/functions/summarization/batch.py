@@ -28,11 +28,19 @@ from vss_ctx_rag.tools.storage import StorageTool
 from vss_ctx_rag.tools.health.rag_health import SummaryMetrics
 from vss_ctx_rag.utils.ctx_rag_logger import logger, TimeMeasure
 from vss_ctx_rag.utils.ctx_rag_batcher import Batcher
-from vss_ctx_rag.utils.globals import DEFAULT_SUMM_RECURSION_LIMIT, LLM_TOOL_NAME
+from vss_ctx_rag.utils.globals import (
+    DEFAULT_SUMM_RECURSION_LIMIT,
+    DEFAULT_SUMM_BATCH_MAX_CONCURRENCY,
+    DEFAULT_SUMM_WAIT_RECHECK_SEC,
+    DEFAULT_SUMM_TREE_FANOUT,
+    DEFAULT_SUMM_MAX_INPUT_TOKENS,
+    LLM_TOOL_NAME,
+)
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables.base import RunnableSequence
 from vss_ctx_rag.utils.utils import call_token_safe
+from .summary_tree import SummaryTree
 
 
 class BatchSummarization(Function):
@@ -93,18 +101,94 @@ class BatchSummarization(Function):
         # working params
         self.curr_batch_i = 0
         self.batcher = Batcher(self.batch_size)
+        # Streams and earliest doc time of each batch, locating the partitions
+        # of the vector_db that hold their summaries
+        self._streams = set()
+        self._batch_start_times = {}
         self.recursion_limit = (
             self.get_param("summ_rec_lim", required=False)
             if self.get_param("summ_rec_lim", required=False)
             else DEFAULT_SUMM_RECURSION_LIMIT
         )
 
+        self.batch_max_concurrency = (
+            self.get_param("params", "batch_max_concurrency", required=False)
+            if self.get_param("params", "batch_max_concurrency", required=False)
+            else DEFAULT_SUMM_BATCH_MAX_CONCURRENCY
+        )
+        # Full batches are summarized as independent tasks. The semaphore bounds
+        # the number of in-flight LLM calls; waiters are served in FIFO order.
+        self._summ_semaphore = asyncio.Semaphore(self.batch_max_concurrency)
+        self._pending_batches = {}
+        self._batch_done = asyncio.Condition()
+        self._batches_completed = 0
+
+        self.summary_tree = SummaryTree(
+            vector_db=self.vector_db,
+            aggregation_pipeline=self.aggregation_pipeline,
+            fanout=(
+                self.get_param("params", "summary_tree_fanout", required=False)
+                if self.get_param("params", "summary_tree_fanout", required=False)
+                is not None
+                else DEFAULT_SUMM_TREE_FANOUT
+            ),
+            max_input_tokens=(
+                self.get_param("params", "max_input_tokens", required=False)
+                if self.get_param("params", "max_input_tokens", required=False)
+                else DEFAULT_SUMM_MAX_INPUT_TOKENS
+            ),
+            recursion_limit=self.recursion_limit,
+        )
+
         self.log_dir = os.environ.get("VIA_LOG_DIR", None)
         self.summary_start_time = None
         self.enable_summary = True
 
+    def _schedule_batch(self, batch):
+        """Queue a full batch for summarization without waiting for it"""
+        batch_i = batch._batch_index
+        task = asyncio.create_task(self._process_full_batch(batch))
+        self._pending_batches[batch_i] = task
+
+        def _on_done(t, batch_i=batch_i):
+            if self._pending_batches.get(batch_i) is t:
+                del self._pending_batches[batch_i]
+            if not t.cancelled() and t.exception() is not None:
+                logger.error(f"Batch {batch_i} summarization failed: {t.exception()}")
+
+        task.add_done_callback(_on_done)
+
+    async def _notify_batch_done(self):
+        async with self._batch_done:
+            self._batches_completed += 1
+            self._batch_done.notify_all()
+
+    async def _wait_for_batch_done(self, seen: int, timeout: float):
+        """Wait until a batch completes after `seen` completions or timeout"""
+        try:
+            async with self._batch_done:
+                await asyncio.wait_for(
+                    self._batch_done.wait_for(
+                        lambda: self._batches_completed != seen
+                    ),
+                    timeout=timeout,
+                )
+        except asyncio.TimeoutError:
+            pass
+
     async def _process_full_batch(self, batch):
-        """Process a full batch immediately"""
+        """Summarize a full batch and store the summary keyed by its batch_i"""
+        try:
+            async with self._summ_semaphore:
+                await self._summarize_and_store(batch)
+        finally:
+            # The summary is persisted, the batch documents are no longer needed
+            self.batcher.evict(batch._batch_index)
+            await self._notify_batch_done()
+        if self.summary_start_time is not None:
+            self.metrics.summary_latency = time.time() - self.summary_start_time
+
+    async def _summarize_and_store(self, batch):
         with TimeMeasure(
             "Batch "
             + str(batch._batch_index)
@@ -117,37 +201,46 @@ class BatchSummarization(Function):
             "pink",
         ):
             logger.info("Batch %d is full. Processing ...", batch._batch_index)
-            try:
-                with get_openai_callback() as cb:
-                    batch_summary = await call_token_safe(
-                        " ".join([doc for doc, _, _ in batch.as_list()]),
-                        self.batch_pipeline,
-                        self.recursion_limit,
-                    )
-            except Exception as e:
-                logger.error(f"Error summarizing batch {batch._batch_index}: {e}")
+            if not len(batch):
+                # Every doc of the batch was dropped before ingestion, keep a
+                # placeholder so the summary tree still covers the batch
+                logger.info(
+                    "Batch %d has no docs left, skipping its summary",
+                    batch._batch_index,
+                )
                 batch_summary = "."
-            self.metrics.summary_tokens += cb.total_tokens
-            self.metrics.summary_requests += cb.successful_requests
-            logger.info("Batch %d summary: %s", batch._batch_index, batch_summary)
-            logger.info(
-                "Total Tokens: %s, "
-                "Prompt Tokens: %s, "
-                "Completion Tokens: %s, "
-                "Successful Requests: %s, "
-                "Total Cost (USD): $%s"
-                % (
-                    cb.total_tokens,
-                    cb.prompt_tokens,
-                    cb.completion_tokens,
-                    cb.successful_requests,
-                    cb.total_cost,
-                ),
-            )
+            else:
+                try:
+                    with get_openai_callback() as cb:
+                        batch_summary = await call_token_safe(
+                            " ".join([doc for doc, _, _ in batch.as_list()]),
+                            self.batch_pipeline,
+                            self.recursion_limit,
+                        )
+                except Exception as e:
+                    logger.error(f"Error summarizing batch {batch._batch_index}: {e}")
+                    batch_summary = "."
+                self.metrics.summary_tokens += cb.total_tokens
+                self.metrics.summary_requests += cb.successful_requests
+                logger.info("Batch %d summary: %s", batch._batch_index, batch_summary)
+                logger.info(
+                    "Total Tokens: %s, "
+                    "Prompt Tokens: %s, "
+                    "Completion Tokens: %s, "
+                    "Successful Requests: %s, "
+                    "Total Cost (USD): $%s"
+                    % (
+                        cb.total_tokens,
+                        cb.prompt_tokens,
+                        cb.completion_tokens,
+                        cb.successful_requests,
+                        cb.total_cost,
+                    ),
+                )
         try:
             # Get metadata from the last document in the batch
             batch_list = batch.as_list()
-            last_doc_meta = batch_list[-1][2] if batch_list else {}
+            last_doc_meta = batch_list[-1][2] if batch_list else batch.last_meta()
             batch_meta = {
                 **last_doc_meta,
                 "batch_i": batch._batch_index,
@@ -155,9 +248,16 @@ class BatchSummarization(Function):
             }
             # TODO: Use the async method once https://github.com/langchain-ai/langchain-milvus/pull/29 is released
             # await self.vector_db.aadd_summary(summary=batch_summary, metadata=batch_meta)
-            self.vector_db.add_summary(summary=batch_summary, metadata=batch_meta)
+            # Insert off the event loop so other batches keep making progress
+            await asyncio.to_thread(
+                self.vector_db.add_summary, summary=batch_summary, metadata=batch_meta
+            )
         except Exception as e:
             logger.error(e)
+            return
+        await self.summary_tree.add_batch(
+            batch._batch_index, batch_summary, batch_meta
+        )
 
     async def acall(self, state: dict):
         """batch summarization function call
@@ -174,7 +274,6 @@ class BatchSummarization(Function):
             }
         """
         with TimeMeasure("OffBatchSumm/Acall", "blue"):
-            batches = []
             self.call_schema.validate(state)
             stop_time = time.time() + self.timeout
             target_start_batch_index = self.batcher.get_batch_index(
@@ -187,51 +286,36 @@ class BatchSummarization(Function):
                 logger.info(f"Current batch index: {self.curr_batch_i}")
                 target_end_batch_index = self.curr_batch_i
 
-            # Track fetched batch indices
-            fetched_batch_indices = set()
-            while time.time() < stop_time:
-                # Only query for unfetched batches
-                unfetched_indices = [
-                    i
-                    for i in range(target_start_batch_index, target_end_batch_index + 1)
-                    if i not in fetched_batch_indices
-                ]
-                if not unfetched_indices:
-                    break
-
-                # Query only for new batches
-                batch_filter = f"doc_type == 'caption_summary' and batch_i in [{','.join(map(str, unfetched_indices))}]"
-                new_batches = await self.vector_db.aget_text_data(
-                    fields=["text", "batch_i"], filter=batch_filter
+            # The range is covered by the largest precomputed summary tree nodes.
+            # Summaries are only looked up again when a batch completes in this
+            # process; the periodic recheck covers summaries written elsewhere.
+            found = {}
+            missing = self.summary_tree.decompose(
+                target_start_batch_index, target_end_batch_index
+            )
+            while missing:
+                seen = self._batches_completed
+                new_found, missing = await self.summary_tree.afetch(
+                    missing, self._summary_partitions(target_start_batch_index)
                 )
-
-                # Update fetched indices and add to results
-                for batch in new_batches:
-                    fetched_batch_indices.add(batch["batch_i"])
-                batches.extend(new_batches)
-
-                # If we have all required batches, break
-                if len(fetched_batch_indices) == (
-                    target_end_batch_index - target_start_batch_index + 1
-                ):
-                    logger.info(
-                        f"All {len(fetched_batch_indices)} batches fetched. Moving forward."
-                    )
+                found.update(new_found)
+                if not missing:
+                    logger.info(f"All {len(found)} summary nodes fetched. Moving forward.")
                     break
-                else:
-                    remaining = (
-                        target_end_batch_index
-                        - target_start_batch_index
-                        + 1
-                        - len(fetched_batch_indices)
-                    )
-                    logger.info(f"Need {remaining} more batches. Waiting...")
-                    await asyncio.sleep(1)
-                    continue
+                time_left = stop_time - time.time()
+                if time_left <= 0:
+                    break
+                logger.info(f"Need {len(missing)} more batches. Waiting...")
+                await self._wait_for_batch_done(
+                    seen, min(time_left, DEFAULT_SUMM_WAIT_RECHECK_SEC)
+                )
 
-            # Sort batches by batch_i field
-            batches.sort(key=lambda x: x["batch_i"])
-            logger.info(f"Number of Batches Fetched: {len(batches)}")
+            # Order nodes by the first batch they cover
+            batches = [
+                found[node]
+                for node in sorted(found, key=lambda n: self.summary_tree.span(*n)[0])
+            ]
+            logger.info(f"Number of Summary Nodes Fetched: {len(batches)}")
 
             if len(batches) == 0:
                 state["result"] = ""
@@ -240,11 +324,7 @@ class BatchSummarization(Function):
             elif len(batches) > 0:
                 with TimeMeasure("summ/acall/batch-aggregation-summary", "pink") as bas:
                     with get_openai_callback() as cb:
-                        result = await call_token_safe(
-                            batches,
-                            self.aggregation_pipeline,
-                            self.recursion_limit,
-                        )
+                        result = await self.summary_tree.aggregate(batches)
                         state["result"] = result
                     logger.info("Summary Aggregation Done")
                     self.metrics.aggregation_tokens = cb.total_tokens
@@ -263,16 +343,39 @@ class BatchSummarization(Function):
                         ),
                     )
                 self.metrics.aggregation_latency = bas.execution_time
+        self.metrics.batcher = self.batcher.memory_stats()
         if self.log_dir:
             log_path = Path(self.log_dir).joinpath("summary_metrics.json")
-            self.metrics.dump_json(log_path.absolute())
+            # The end-of-call values must reach the file whatever the throttling
+            self.metrics.dump_json(log_path.absolute(), force=True)
         return state
 
+    def _summary_partitions(self, start_batch_i: int):
+        """Partitions that may hold the summaries from batch start_batch_i on.
+
+        Summaries are stored with the metadata of the last doc of their batch,
+        so they are never in a day partition before the first doc of the range.
+        """
+        return self.vector_db.partitions_for_window(
+            start=self._batch_start_times.get(start_batch_i),
+            stream_ids=sorted(self._streams) or None,
+        )
+
+    def _track_partition(self, doc_i: int, doc_meta: dict):
+        self._streams.add(doc_meta.get("streamId", "default"))
+        start_time = doc_meta.get("start_ntp_float")
+        batch_i = doc_i // self.batch_size
+        if start_time is not None:
+            self._batch_start_times[batch_i] = min(
+                start_time, self._batch_start_times.get(batch_i, start_time)
+            )
+
     async def aprocess_doc(self, doc: str, doc_i: int, doc_meta: dict):
         try:
             logger.info("Adding doc %d", doc_i)
             doc_meta.setdefault("is_first", False)
             doc_meta.setdefault("is_last", False)
+            self._track_partition(doc_i, doc_meta)
 
             self.vector_db.add_summary(
                 summary=doc,
@@ -306,20 +409,40 @@ class BatchSummarization(Function):
                                 "No timestamp will be added."
                             )
                 doc_meta["batch_i"] = doc_i // self.batch_size
+                self.curr_batch_i = max(self.curr_batch_i, doc_meta["batch_i"])
                 batch = self.batcher.add_doc(doc, doc_i, doc_meta)
                 if batch.is_full():
-                    # Process the batch immediately when full
-                    await asyncio.create_task(self._process_full_batch(batch))
+                    # Summarize in the background; batches may finish out of order
+                    self._schedule_batch(batch)
             if self.summary_start_time is None:
                 self.summary_start_time = bs.start_time
-            self.metrics.summary_latency = bs.end_time - self.summary_start_time
+        except Exception as e:
+            logger.error(e)
+
+    async def askip_doc(self, doc: str, doc_i: int, doc_meta: dict):
+        try:
+            logger.info("Skipping doc %d", doc_i)
+            self._track_partition(doc_i, doc_meta)
+            self.curr_batch_i = max(self.curr_batch_i, doc_i // self.batch_size)
+            batch = self.batcher.skip_doc(doc_i, doc_meta)
+            if batch.is_full():
+                self._schedule_batch(batch)
         except Exception as e:
             logger.error(e)
 
     async def areset(self, state: dict):
+        pending = list(self._pending_batches.values())
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._pending_batches.clear()
         # TODO: use async method for drop data
         self.vector_db.drop_data(state["expr"])
         self.summary_start_time = None
+        self.curr_batch_i = 0
+        self._streams.clear()
+        self._batch_start_times.clear()
+        self.summary_tree.reset()
         self.batcher.flush()
         self.metrics.reset()
         await asyncio.sleep(0.001)
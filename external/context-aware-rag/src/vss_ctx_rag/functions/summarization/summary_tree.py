@@ -0,0 +1,204 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""summary_tree.py: File contains SummaryTree class"""
+
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from vss_ctx_rag.tools.storage import StorageTool
+from vss_ctx_rag.utils.ctx_rag_logger import logger, TimeMeasure
+from vss_ctx_rag.utils.utils import call_token_safe, estimate_tokens
+
+BATCH_SUMMARY_DOC_TYPE = "caption_summary"
+ROLLUP_DOC_TYPE_PREFIX = "summary_rollup_l"
+
+
+class SummaryTree:
+    """
+    Persistent rollups of batch summaries, maintained as batches complete.
+
+    Level 0 nodes are the batch summaries themselves. Node j of level k > 0
+    aggregates the `fanout` nodes j * fanout ... (j + 1) * fanout - 1 of level
+    k - 1, so it covers batches j * fanout**k ... (j + 1) * fanout**k - 1. Rollup
+    nodes are stored next to the batch summaries with doc_type
+    "summary_rollup_l<k>" and batch_i set to the node index, reusing the metadata
+    of their last child so the collection schema is unchanged.
+
+    A range of batches is covered by O(fanout * log(n)) precomputed nodes, which
+    are then packed under a token budget and aggregated. A fanout below 2
+    disables rollups and ranges are aggregated from batch summaries only.
+    """
+
+    def __init__(
+        self,
+        vector_db: StorageTool,
+        aggregation_pipeline,
+        fanout: int,
+        max_input_tokens: int,
+        recursion_limit: int,
+    ):
+        self.vector_db = vector_db
+        self.aggregation_pipeline = aggregation_pipeline
+        self.fanout = fanout
+        self.max_input_tokens = max_input_tokens
+        self.recursion_limit = recursion_limit
+        # (level, node_i) -> {child_i: (text, metadata)} for parents still filling
+        self._open_nodes: Dict[Tuple[int, int], Dict[int, Tuple[str, dict]]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.fanout is not None and self.fanout >= 2
+
+    @staticmethod
+    def doc_type(level: int) -> str:
+        return BATCH_SUMMARY_DOC_TYPE if level == 0 else f"{ROLLUP_DOC_TYPE_PREFIX}{level}"
+
+    def span(self, level: int, node_i: int) -> Tuple[int, int]:
+        """First and last batch index covered by a node"""
+        width = self.fanout**level if self.enabled else 1
+        return node_i * width, (node_i + 1) * width - 1
+
+    async def add_batch(self, batch_i: int, summary: str, metadata: dict):
+        """Record a completed batch summary and build any rollups it completes"""
+        if not self.enabled:
+            return
+        level, node_i, text, meta = 0, batch_i, summary, metadata
+        while True:
+            parent = (level + 1, node_i // self.fanout)
+            children = self._open_nodes.setdefault(parent, {})
+            children[node_i] = (text, meta)
+            if len(children) < self.fanout:
+                return
+            # Claim the parent before awaiting so that no other batch builds it
+            del self._open_nodes[parent]
+            ordered = [children[i] for i in sorted(children)]
+            with TimeMeasure(
+                f"summ/rollup/level-{parent[0]}/node-{parent[1]}", "pink"
+            ):
+                try:
+                    text = await self.aggregate([t for t, _ in ordered])
+                except Exception as e:
+                    logger.error(f"Error building summary rollup {parent}: {e}")
+                    return
+                meta = {
+                    **ordered[-1][1],
+                    "batch_i": parent[1],
+                    "doc_type": self.doc_type(parent[0]),
+                }
+                try:
+                    await asyncio.to_thread(
+                        self.vector_db.add_summary, summary=text, metadata=meta
+                    )
+                except Exception as e:
+                    logger.error(f"Error storing summary rollup {parent}: {e}")
+                    return
+            level, node_i = parent
+
+    def decompose(self, start_batch: int, end_batch: int) -> List[Tuple[int, int]]:
+        """Cover [start_batch, end_batch] with the fewest, largest tree nodes"""
+        nodes = []
+        pos = start_batch
+        while pos <= end_batch:
+            level = 0
+            if self.enabled:
+                while (
+                    pos % self.fanout ** (level + 1) == 0
+                    and pos + self.fanout ** (level + 1) - 1 <= end_batch
+                ):
+                    level += 1
+            nodes.append((level, pos // (self.fanout**level if self.enabled else 1)))
+            pos = self.span(*nodes[-1])[1] + 1
+        return nodes
+
+    async def afetch(
+        self,
+        nodes: List[Tuple[int, int]],
+        partition_names: Optional[List[str]] = None,
+    ) -> Tuple[Dict[Tuple[int, int], str], List[Tuple[int, int]]]:
+        """
+        Fetch node summaries, replacing missing rollups by their children.
+        Only `partition_names` are read when given.
+
+        Returns:
+            Tuple: The summaries found keyed by (level, node_i) and the batch
+                   summaries (level 0 nodes) that do not exist yet.
+        """
+        found = {}
+        missing_leaves = []
+        pending = list(nodes)
+        while pending:
+            by_level = {}
+            for level, node_i in pending:
+                by_level.setdefault(level, []).append(node_i)
+            pending = []
+            for level, indices in by_level.items():
+                node_filter = (
+                    f"doc_type == '{self.doc_type(level)}' and "
+                    f"batch_i in [{','.join(map(str, indices))}]"
+                )
+                rows = await self.vector_db.aget_text_data(
+                    fields=["text", "batch_i"],
+                    filter=node_filter,
+                    partition_names=partition_names,
+                )
+                for row in rows:
+                    found[(level, row["batch_i"])] = row["text"]
+                for node_i in indices:
+                    if (level, node_i) in found:
+                        continue
+                    if level == 0:
+                        missing_leaves.append((0, node_i))
+                    else:
+                        first = node_i * self.fanout
+                        pending.extend(
+                            (level - 1, i) for i in range(first, first + self.fanout)
+                        )
+        return found, missing_leaves
+
+    def _pack(self, texts: List[str]) -> List[List[str]]:
+        """Group consecutive texts so that each group fits the token budget"""
+        groups = [[]]
+        group_tokens = 0
+        for text in texts:
+            tokens = estimate_tokens(text)
+            if groups[-1] and group_tokens + tokens > self.max_input_tokens:
+                groups.append([])
+                group_tokens = 0
+            groups[-1].append(text)
+            group_tokens += tokens
+        return groups
+
+    async def aggregate(self, texts: List[str]) -> str:
+        """Aggregate ordered summaries, reducing level by level under the token budget"""
+        groups = self._pack(texts)
+        while len(groups) > 1:
+            if len(groups) == len(texts):
+                # Every summary exceeds half the budget; pair them up to make progress
+                groups = [texts[i : i + 2] for i in range(0, len(texts), 2)]
+            logger.info(f"Aggregating {len(texts)} summaries in {len(groups)} groups")
+            texts = await asyncio.gather(
+                *[
+                    call_token_safe(group, self.aggregation_pipeline, self.recursion_limit)
+                    for group in groups
+                ]
+            )
+            groups = self._pack(texts)
+        return await call_token_safe(
+            groups[0], self.aggregation_pipeline, self.recursion_limit
+        )
+
+    def reset(self):
+        self._open_nodes.clear()
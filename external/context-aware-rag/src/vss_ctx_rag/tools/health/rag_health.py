@@ -14,66 +14,92 @@
 # limitations under the License.
 
 import json
+import time
 
+from vss_ctx_rag.utils.globals import DEFAULT_METRICS_DUMP_INTERVAL_SEC
 
-class GraphMetrics:
-    def __init__(self):
-        self.graph_create_tokens = 0
-        self.graph_create_requests = 0
-        self.graph_create_latency = 0
-        self.graph_post_process_latency = 0
 
-    def dump_json(self, file_name: str):
+class _ThrottledJSONDump:
+    """Rewrites the metrics file at most every DEFAULT_METRICS_DUMP_INTERVAL_SEC"""
+
+    _last_dump_time = 0.0
+    _last_file_name = None
+
+    def _data(self) -> dict:
+        raise NotImplementedError
+
+    def dump_json(self, file_name: str, force: bool = False):
         """
         Dumps the object's attributes to a JSON file.
 
         Args:
             file_name (str, optional): The file name to write to.
+            force (bool): Write even if the file was written recently.
         """
-        data = {
+        self._last_file_name = file_name
+        now = time.time()
+        if not force and now - self._last_dump_time < DEFAULT_METRICS_DUMP_INTERVAL_SEC:
+            return
+        self._last_dump_time = now
+        with open(file_name, "w") as f:
+            json.dump(self._data(), f, indent=4)
+
+    def flush(self):
+        """Write the pending values before they are reset"""
+        if self._last_file_name is not None:
+            self.dump_json(self._last_file_name, force=True)
+
+
+class GraphMetrics(_ThrottledJSONDump):
+    def __init__(self):
+        self.graph_create_tokens = 0
+        self.graph_create_requests = 0
+        self.graph_create_latency = 0
+        self.graph_post_process_latency = 0
+        self.batcher = {}
+
+    def _data(self) -> dict:
+        return {
             "graph_create_tokens": self.graph_create_tokens,
             "graph_create_requests": self.graph_create_requests,
             "graph_create_latency": self.graph_create_latency,
             "graph_post_process_latency": self.graph_post_process_latency,
+            "batcher": self.batcher,
         }
-        with open(file_name, "w") as f:
-            json.dump(data, f, indent=4)
 
     def reset(self):
+        self.flush()
         self.graph_create_tokens = 0
         self.graph_create_requests = 0
         self.graph_create_latency = 0
         self.graph_post_process_latency = 0
+        self.batcher = {}
 
 
-class SummaryMetrics:
+class SummaryMetrics(_ThrottledJSONDump):
     def __init__(self):
         self.summary_tokens = 0
         self.aggregation_tokens = 0
         self.summary_requests = 0
         self.summary_latency = 0
         self.aggregation_latency = 0
+        self.batcher = {}
 
-    def dump_json(self, file_name: str):
-        """
-        Dumps the object's attributes to a JSON file.
-
-        Args:
-            file_name (str, optional): The file name to write to.
-        """
-        data = {
+    def _data(self) -> dict:
+        return {
             "summary_tokens": self.summary_tokens,
             "aggregation_tokens": self.aggregation_tokens,
             "summary_requests": self.summary_requests,
             "summary_latency": self.summary_latency,
             "aggregation_latency": self.aggregation_latency,
+            "batcher": self.batcher,
         }
-        with open(file_name, "w") as f:
-            json.dump(data, f, indent=4)
 
     def reset(self):
+        self.flush()
         self.summary_tokens = 0
         self.aggregation_tokens = 0
         self.summary_requests = 0
         self.summary_latency = 0
         self.aggregation_latency = 0
+        self.batcher = {}
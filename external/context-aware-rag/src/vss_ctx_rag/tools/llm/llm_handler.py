@@ -54,7 +54,8 @@ class LLMTool(Tool, Runnable):
         return await self.llm.ainvoke(*args, **kwargs)
 
     async def astream(self, *args, **kwargs):
-        return await self.llm.astream(*args, **kwargs)
+        async for chunk in self.llm.astream(*args, **kwargs):
+            yield chunk
 
     async def abatch(self, *args, **kwargs):
         return await self.llm.abatch(*args, **kwargs)
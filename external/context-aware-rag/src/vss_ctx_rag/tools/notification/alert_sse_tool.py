@@ -13,19 +13,55 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+
 import aiohttp
 from vss_ctx_rag.tools.notification import NotificationTool
 from vss_ctx_rag.utils.ctx_rag_logger import logger
+from vss_ctx_rag.utils.globals import (
+    DEFAULT_ALERT_MAX_CONCURRENCY,
+    DEFAULT_ALERT_TIMEOUT_SEC,
+)
 
 
 class AlertSSETool(NotificationTool):
     """Tool for sending an alert as a post request to the endpoint.
     Implements NotificationTool class
+
+    Alerts are posted over a single pooled session, at most
+    `max_concurrency` at a time.
     """
 
-    def __init__(self, endpoint: str, name="alert_sse_notifier") -> None:
+    def __init__(
+        self,
+        endpoint: str,
+        name="alert_sse_notifier",
+        max_concurrency: int = DEFAULT_ALERT_MAX_CONCURRENCY,
+        timeout: float = DEFAULT_ALERT_TIMEOUT_SEC,
+    ) -> None:
         super().__init__(name)
         self.alert_endpoint = endpoint
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._session: aiohttp.ClientSession = None
+        self._semaphore: asyncio.Semaphore = None
+        self._loop: asyncio.AbstractEventLoop = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Sessions are bound to the event loop that created them
+        loop = asyncio.get_running_loop()
+        if (
+            self._session is None
+            or self._session.closed
+            or self._loop is not loop
+        ):
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._session
 
     async def notify(self, title: str, message: str, metadata: dict):
         try:
@@ -35,11 +71,12 @@ class AlertSSETool(NotificationTool):
                 "message": message,
                 "metadata": metadata,
             }
-            async with aiohttp.ClientSession() as session:
-                response = await session.post(
+            session = self._get_session()
+            async with self._semaphore:
+                async with session.post(
                     self.alert_endpoint, json=body, headers=headers
-                )
-                response.raise_for_status()
+                ) as response:
+                    response.raise_for_status()
         except Exception as ex:
             events_detected = metadata.get("events_detected", [])
             logger.error(
@@ -47,3 +84,8 @@ class AlertSSETool(NotificationTool):
                 ", ".join(events_detected),
                 str(ex),
             )
+
+    async def aclose(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -15,6 +15,8 @@
 
 """notification_tool.py:"""
 
+import asyncio
+
 from vss_ctx_rag.base import Tool
 
 
@@ -24,3 +26,7 @@ class NotificationTool(Tool):
 
     async def notify(self, title: str, message: str, metadata: dict):
         pass
+
+    async def notify_batch(self, alerts: list[dict]):
+        """Send several alerts, each a dict with title, message and metadata"""
+        return await asyncio.gather(*[self.notify(**alert) for alert in alerts])
@@ -13,6 +13,25 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import importlib
+
 from .storage_tool import *
-from .milvus_db import *
-from .neo4j_db import *
+
+# The backends import their client libraries (pymilvus, neo4j, the NVIDIA
+# endpoints) and are only loaded on first use, see __getattr__
+_BACKENDS = {
+    "MilvusDBTool": ".milvus_db",
+    "Neo4jGraphDB": ".neo4j_db",
+    "InMemoryDBTool": ".memory_db",
+    "compile_filter": ".memory_db",
+}
+
+
+def __getattr__(name):
+    if name not in _BACKENDS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_BACKENDS[name], __name__), name)
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_BACKENDS))
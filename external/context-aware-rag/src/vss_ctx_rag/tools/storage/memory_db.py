@@ -0,0 +1,279 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import os
+import re
+import threading
+import numpy as np
+from langchain.docstore.document import Document
+from langchain_nvidia_ai_endpoints import NVIDIAEmbeddings, NVIDIARerank
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from vss_ctx_rag.tools.storage import StorageTool
+from vss_ctx_rag.utils.ctx_rag_logger import TimeMeasure
+
+_FILTER_TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<number>-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)
+        |(?P<string>"[^"]*"|'[^']*')
+        |(?P<op>==|!=|>=|<=|>|<|&&|\|\||[()\[\],])
+        |(?P<name>[A-Za-z_][A-Za-z0-9_]*)
+    )""",
+    re.VERBOSE,
+)
+_FILTER_KEYWORDS = {
+    "and": "and",
+    "or": "or",
+    "not": "not",
+    "in": "in",
+    "true": "True",
+    "false": "False",
+}
+
+
+def compile_filter(expr):
+    """Compile a Milvus boolean expression into a predicate over row dicts.
+
+    Supports comparisons, `in` lists, `and`/`or`/`not` and parentheses, which
+    covers the filters used by the functions. Comparisons with a missing field
+    are false.
+    """
+    if not expr or not expr.strip():
+        return lambda row: True
+    source = []
+    pos = 0
+    expr = expr.strip()
+    while pos < len(expr):
+        match = _FILTER_TOKEN.match(expr, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"Unsupported filter expression: {expr}")
+        pos = match.end()
+        if match.group("number") is not None:
+            source.append(match.group("number"))
+        elif match.group("string") is not None:
+            source.append(repr(match.group("string")[1:-1]))
+        elif match.group("op") is not None:
+            op = match.group("op")
+            source.append({"&&": "and", "||": "or"}.get(op, op))
+        else:
+            name = match.group("name")
+            keyword = _FILTER_KEYWORDS.get(name.lower())
+            source.append(keyword if keyword else f"row.get({name!r})")
+    try:
+        code = compile(" ".join(source), "<filter>", "eval")
+    except SyntaxError:
+        raise ValueError(f"Unsupported filter expression: {expr}")
+
+    def predicate(row):
+        try:
+            return bool(eval(code, {"__builtins__": {}}, {"row": row}))
+        except TypeError:
+            return False
+
+    return predicate
+
+
+class InMemoryDBTool(StorageTool):
+    """Vector store kept in process memory, with the interface of MilvusDBTool.
+
+    Meant for load tests and development without a Milvus server. Documents
+    are lost when the process exits and are only visible to the process that
+    added them, so ingestion and retrieval must run in the same service.
+    Searches are exact, by cosine similarity over all matching documents.
+    Only the retrieval fast path is supported.
+    """
+
+    def __init__(
+        self,
+        collection_name,
+        embedding_model_name="nvidia/llama-3.2-nv-embedqa-1b-v2",
+        embedding_base_url="https://integrate.api.nvidia.com/v1",
+        reranker_model_name="nvidia/llama-3.2-nv-rerankqa-1b-v2",
+        reranker_base_url="https://ai.api.nvidia.com/v1/retrieval/nvidia/llama-3_2-nv-rerankqa-1b-v2/reranking",
+        name="memory_db",
+        embedding=None,
+        reranker=None,
+    ) -> None:
+        super().__init__(name)
+        self.collection_name = collection_name
+        self.data_version = 0
+        self._rows = []
+        self._next_pk = 1
+        self._lock = threading.Lock()
+
+        if bool(os.getenv("NVIDIA_API_KEY")) is True:
+            api_key = os.getenv("NVIDIA_API_KEY")
+        else:
+            api_key = "NOAPIKEYSET"
+        self.embedding = embedding or NVIDIAEmbeddings(
+            model=embedding_model_name,
+            truncate="END",
+            api_key=api_key,
+            base_url=embedding_base_url,
+        )
+        self.reranker = reranker or NVIDIARerank(
+            model=reranker_model_name, api_key=api_key, base_url=reranker_base_url
+        )
+        self.text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=500,
+            chunk_overlap=100,
+            separators=["\n\n", "\n", ".", ";", ",", " ", ""],
+        )
+
+    @property
+    def vector_db(self):
+        raise NotImplementedError(
+            "The in-memory vector DB only supports the retrieval fast path, "
+            "set fast_path: true in the chat params"
+        )
+
+    def _add_documents(self, docs):
+        vectors = self.embedding.embed_documents([doc.page_content for doc in docs])
+        pks = []
+        with self._lock:
+            for doc, vector in zip(docs, vectors):
+                row = dict(doc.metadata)
+                row["pk"] = self._next_pk
+                row["text"] = doc.page_content
+                row["vector"] = vector
+                self._rows.append(row)
+                pks.append(self._next_pk)
+                self._next_pk += 1
+        return pks
+
+    def _select(self, expr):
+        predicate = compile_filter(expr)
+        with self._lock:
+            rows = list(self._rows)
+        return [row for row in rows if predicate(row)]
+
+    @staticmethod
+    def _document(row):
+        metadata = {
+            k: v for k, v in row.items() if k not in ("pk", "text", "vector")
+        }
+        return Document(page_content=row["text"], metadata=metadata)
+
+    def add_summary(self, summary: str, metadata: dict):
+        with TimeMeasure("memorydb/add caption", "blue"):
+            return self._add_documents(
+                [Document(page_content=summary, metadata=metadata)]
+            )
+
+    async def aadd_summary(self, summary: str, metadata: dict):
+        return await asyncio.to_thread(self.add_summary, summary, metadata)
+
+    def add_summaries(self, batch_summary: list[str], batch_metadata: list[dict]):
+        with TimeMeasure("memorydb/AddSummaries", "yellow"):
+            if len(batch_summary) != len(batch_metadata):
+                raise ValueError(
+                    "Incorrect param. The length of batch_summary batch and\
+                    metadata batch should match."
+                )
+            docs = [
+                Document(page_content=summary, metadata=metadata)
+                for summary, metadata in zip(batch_summary, batch_metadata)
+            ]
+            self._add_documents(self.text_splitter.split_documents(docs))
+
+    async def aadd_summaries(self, batch_summary, batch_metadata):
+        return await asyncio.to_thread(
+            self.add_summaries, batch_summary, batch_metadata
+        )
+
+    def get_text_data(self, fields=["*"], filter="pk > 0", partition_names=None):
+        rows = self._select(filter)
+        if "*" in fields:
+            return [
+                {k: v for k, v in row.items() if k not in ("pk", "vector")}
+                for row in rows
+            ]
+        return [{k: row[k] for k in fields if k in row and k != "pk"} for row in rows]
+
+    async def aget_text_data(self, fields=["*"], filter="pk > 0", partition_names=None):
+        return await asyncio.to_thread(
+            self.get_text_data, fields, filter, partition_names
+        )
+
+    def partitions_for_window(self, start=None, end=None, stream_ids=None):
+        """The in-memory collection is not partitioned"""
+        return None
+
+    def _search_with_vectors(self, query_vector, top_k, expr=None, partition_names=None):
+        rows = self._select(expr)
+        if not rows:
+            return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        vectors = np.asarray([row["vector"] for row in rows], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+        scores = (vectors @ query) / np.where(norms > 0, norms, 1.0)
+        order = np.argsort(-scores)[:top_k]
+        return [(self._document(rows[i]), rows[i]["vector"]) for i in order]
+
+    def search_with_vectors(self, search_query, top_k, expr=None, partition_names=None):
+        """Similarity search that also returns the stored vector of each hit.
+
+        Returns:
+            Tuple: The query embedding and a list of (Document, vector) hits.
+        """
+        query_vector = self.embedding.embed_query(search_query)
+        return query_vector, self._search_with_vectors(query_vector, top_k, expr)
+
+    async def asearch_with_vectors(
+        self, search_query, top_k, expr=None, partition_names=None
+    ):
+        query_vector = await self.embedding.aembed_query(search_query)
+        hits = await asyncio.to_thread(
+            self._search_with_vectors, query_vector, top_k, expr
+        )
+        return query_vector, hits
+
+    def get_docs_after(self, last_pk, expr=None, batch_size=1000):
+        """Documents with a primary key above last_pk.
+
+        Returns:
+            List: (pk, Document) tuples.
+        """
+        query_expr = f"pk > {last_pk}"
+        if expr:
+            query_expr += f" and ({expr})"
+        return [(row["pk"], self._document(row)) for row in self._select(query_expr)]
+
+    async def aget_docs_after(self, last_pk, expr=None, batch_size=1000):
+        return await asyncio.to_thread(self.get_docs_after, last_pk, expr, batch_size)
+
+    def search(self, search_query, top_k=1):
+        _, hits = self.search_with_vectors(search_query, top_k)
+        return [doc.metadata for doc, _ in hits]
+
+    def query(self, search_query, top_k=1):
+        return self.get_text_data(filter=search_query)
+
+    def drop_data(self, expr="pk > 0"):
+        self.drop_data_filtered(expr)
+
+    def drop_data_filtered(self, filter):
+        predicate = compile_filter(filter)
+        with self._lock:
+            kept = [row for row in self._rows if not predicate(row)]
+            dropped = len(self._rows) - len(kept)
+            self._rows = kept
+            self.data_version += 1
+        return dropped
+
+    def drop_collection(self):
+        with self._lock:
+            self._rows = []
+            self.data_version += 1
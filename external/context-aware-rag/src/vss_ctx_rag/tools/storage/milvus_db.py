@@ -15,12 +15,17 @@
 
 import asyncio
 import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
 from langchain_milvus import Milvus
 from langchain.docstore.document import Document
 from langchain_nvidia_ai_endpoints import NVIDIAEmbeddings, NVIDIARerank
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from vss_ctx_rag.tools.storage import StorageTool
 from vss_ctx_rag.utils.ctx_rag_logger import TimeMeasure, logger
+from vss_ctx_rag.utils.globals import DEFAULT_MILVUS_MAX_PARTITIONS
 from pymilvus import MilvusException
 
 
@@ -29,6 +34,15 @@ class MilvusDBTool(StorageTool):
     the summary text embeddings which can be used for retrieval.
 
     Implements StorageHandler class
+
+    With `partition_by_stream_day`, documents are stored in one Milvus
+    partition per stream and UTC day, named p_<stream>_<YYYYMMDD>. Day
+    partitions older than `rollup_after_days` keep their summaries but lose
+    their raw captions, those older than `retention_days` are dropped. Both are
+    applied at most every `maintenance_interval` seconds, in the background.
+    Retrieval can restrict searches to the partitions of a time window.
+    Documents go to the default partition once the collection has
+    `max_partitions` partitions, or when a partition cannot be created.
     """
 
     def __init__(
@@ -41,8 +55,28 @@ class MilvusDBTool(StorageTool):
         reranker_model_name="nvidia/llama-3.2-nv-rerankqa-1b-v2",
         reranker_base_url="https://ai.api.nvidia.com/v1/retrieval/nvidia/llama-3_2-nv-rerankqa-1b-v2/reranking",
         name="milvus_db",
+        partition_by_stream_day=False,
+        retention_days=None,
+        rollup_after_days=None,
+        maintenance_interval=3600,
+        max_partitions=DEFAULT_MILVUS_MAX_PARTITIONS,
     ) -> None:
         super().__init__(name)
+        self.partition_by_stream_day = partition_by_stream_day
+        self.retention_days = retention_days
+        self.rollup_after_days = rollup_after_days
+        self.maintenance_interval = maintenance_interval
+        self.max_partitions = max_partitions
+        self._partitions = set()
+        # Partitions not created, whose documents go to the default partition
+        self._unpartitioned = set()
+        self._rolled_up_partitions = set()
+        self._partition_lock = threading.Lock()
+        self._maintenance_lock = threading.Lock()
+        self._last_maintenance = time.time()
+        # Bumped whenever documents are deleted, so that readers holding local
+        # copies of the collection (e.g. a BM25 index) know to rebuild them.
+        self.data_version = 0
 
         if bool(os.getenv("NVIDIA_API_KEY")) is True:
             api_key = os.getenv("NVIDIA_API_KEY")
@@ -74,21 +108,79 @@ class MilvusDBTool(StorageTool):
             separators=["\n\n", "\n", ".", ";", ",", " ", ""],
         )
 
+    @staticmethod
+    def partition_name(stream_id, day: str) -> str:
+        """Partition of a stream and UTC day (YYYYMMDD)"""
+        return f"p_{re.sub(r'[^0-9A-Za-z_]', '_', str(stream_id))}_{day}"
+
+    @staticmethod
+    def _day(timestamp) -> str:
+        return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y%m%d")
+
+    @staticmethod
+    def _partition_day(partition: str):
+        match = re.fullmatch(r"p_.*_(\d{8})", partition)
+        return match.group(1) if match else None
+
+    def _partition_for(self, metadata: dict):
+        """Partition to insert a document into, None for the default partition"""
+        col = self.vector_db.col
+        if not self.partition_by_stream_day or col is None:
+            # The collection only exists after the first insert, which goes
+            # to the default partition
+            return None
+        timestamp = metadata.get("start_ntp_float") or time.time()
+        partition = self.partition_name(
+            metadata.get("streamId", "default"), self._day(timestamp)
+        )
+        with self._partition_lock:
+            if partition in self._partitions:
+                return partition
+            if partition in self._unpartitioned:
+                return None
+            try:
+                if not col.has_partition(partition):
+                    # The default partition counts towards the Milvus limit
+                    if len(col.partitions) > self.max_partitions:
+                        logger.warning(
+                            f"Milvus collection {self.collection_name} has "
+                            f"{self.max_partitions} partitions, storing {partition} "
+                            f"in the default partition. Set retention_days to drop "
+                            f"old partitions"
+                        )
+                        self._unpartitioned.add(partition)
+                        return None
+                    col.create_partition(partition)
+            except Exception as e:
+                logger.warning(
+                    f"Failed to create Milvus partition {partition}, storing its "
+                    f"documents in the default partition: {e}"
+                )
+                self._unpartitioned.add(partition)
+                return None
+            self._partitions.add(partition)
+        return partition
+
+    def _add_documents(self, docs, partition):
+        kwargs = {"partition_name": partition} if partition else {}
+        return self.vector_db.add_documents(docs, **kwargs)
+
     def add_summary(self, summary: str, metadata: dict):
         with TimeMeasure("milvusdb/add caption", "blue"):
             doc = Document(page_content=summary, metadata=metadata)
         try:
-            return self.vector_db.add_documents([doc])
+            return self._add_documents([doc], self._partition_for(metadata))
         except MilvusException as e:
             logger.error(
                 f"Invalid metadata while adding documents to Milvus: {metadata}"
             )
             raise e
+        finally:
+            self.maybe_run_maintenance()
 
     async def aadd_summary(self, summary: str, metadata: dict):
         with TimeMeasure("milvusdb/add caption", "blue"):
-            doc = Document(page_content=summary, metadata=metadata)
-            return await self.vector_db.aadd_documents([doc])
+            return await asyncio.to_thread(self.add_summary, summary, metadata)
 
     def add_summaries(self, batch_summary: list[str], batch_metadata: list[dict]):
         with TimeMeasure("Milvus/AddSummries", "yellow"):
@@ -103,13 +195,22 @@ class MilvusDBTool(StorageTool):
                     Document(page_content=batch_summary[i], metadata=batch_metadata[i])
                 )
             document_chunks = self.text_splitter.split_documents(docs)
-            self.vector_db.add_documents(document_chunks)
+            by_partition = {}
+            for chunk in document_chunks:
+                by_partition.setdefault(
+                    self._partition_for(chunk.metadata), []
+                ).append(chunk)
+            for partition, chunks in by_partition.items():
+                self._add_documents(chunks, partition)
+        self.maybe_run_maintenance()
 
-    async def aget_text_data(self, fields=["*"], filter="pk > 0"):
+    async def aget_text_data(self, fields=["*"], filter="pk > 0", partition_names=None):
         # TODO(sl): make this truly async
         if self.vector_db.col:
             await asyncio.sleep(0.001)
-            results = self.vector_db.col.query(expr=filter, output_fields=fields)
+            results = self.vector_db.col.query(
+                expr=filter, output_fields=fields, partition_names=partition_names
+            )
             # pks = self.vector_db.get_pks(expr=filter)
             # results = self.vector_db.get_by_ids(pks)
             return [
@@ -118,6 +219,203 @@ class MilvusDBTool(StorageTool):
         else:
             return []
 
+    def partitions_for_window(self, start=None, end=None, stream_ids=None):
+        """Partitions that may hold documents of the time window and streams.
+
+        Args:
+            start: Window start in epoch seconds, None for unbounded.
+            end: Window end in epoch seconds, None for unbounded.
+            stream_ids: Streams to keep, None for all streams.
+
+        Returns:
+            List: Partition names, None when the collection is not partitioned.
+        """
+        col = self.vector_db.col
+        if not self.partition_by_stream_day or col is None:
+            return None
+        first_day = self._day(start) if start is not None else None
+        last_day = self._day(end) if end is not None else None
+        streams = (
+            {self.partition_name(s, "") for s in stream_ids} if stream_ids else None
+        )
+        partitions = ["_default"]
+        for partition in self._list_partitions():
+            day = self._partition_day(partition)
+            if day is None:
+                continue
+            if first_day is not None and day < first_day:
+                continue
+            if last_day is not None and day > last_day:
+                continue
+            if streams is not None and partition[: -len(day)] not in streams:
+                continue
+            partitions.append(partition)
+        return partitions
+
+    def _list_partitions(self):
+        with self._partition_lock:
+            self._partitions = {
+                p.name for p in self.vector_db.col.partitions if p.name != "_default"
+            }
+            return set(self._partitions)
+
+    def maybe_run_maintenance(self):
+        """Start retention and roll-up in the background if they are due"""
+        if not self.partition_by_stream_day or (
+            self.retention_days is None and self.rollup_after_days is None
+        ):
+            return
+        if time.time() - self._last_maintenance < self.maintenance_interval:
+            return
+        if not self._maintenance_lock.acquire(blocking=False):
+            return
+        self._last_maintenance = time.time()
+
+        def _run():
+            try:
+                self.run_maintenance()
+            except Exception as e:
+                logger.error(f"Milvus partition maintenance failed: {e}")
+            finally:
+                self._maintenance_lock.release()
+
+        threading.Thread(target=_run, name="milvus-maintenance", daemon=True).start()
+
+    def run_maintenance(self, now=None):
+        """Drop expired day partitions and roll up old ones to their summaries.
+
+        Returns:
+            Tuple: Partitions dropped and partitions rolled up.
+        """
+        col = self.vector_db.col
+        if not self.partition_by_stream_day or col is None:
+            return [], []
+        now = now if now is not None else time.time()
+        with TimeMeasure("milvusdb/maintenance", "blue"):
+            dropped, rolled_up = [], []
+            retention_day = (
+                self._day(now - self.retention_days * 86400)
+                if self.retention_days is not None
+                else None
+            )
+            rollup_day = (
+                self._day(now - self.rollup_after_days * 86400)
+                if self.rollup_after_days is not None
+                else None
+            )
+            for partition in sorted(self._list_partitions()):
+                day = self._partition_day(partition)
+                if day is None:
+                    continue
+                if retention_day is not None and day < retention_day:
+                    col.partition(partition).release()
+                    col.drop_partition(partition)
+                    dropped.append(partition)
+                elif (
+                    rollup_day is not None
+                    and day < rollup_day
+                    and partition not in self._rolled_up_partitions
+                ):
+                    col.delete(expr='doc_type == "caption"', partition_name=partition)
+                    rolled_up.append(partition)
+            with self._partition_lock:
+                self._partitions.difference_update(dropped)
+                if dropped:
+                    # Room for new partitions again
+                    self._unpartitioned.clear()
+                self._rolled_up_partitions.update(rolled_up)
+                self._rolled_up_partitions.difference_update(dropped)
+            if dropped or rolled_up:
+                col.flush()
+                col.compact()
+                self.data_version += 1
+                logger.info(
+                    f"Milvus maintenance dropped {len(dropped)} and rolled up "
+                    f"{len(rolled_up)} partitions"
+                )
+        return dropped, rolled_up
+
+    def _search_with_vectors(self, query_vector, top_k, expr=None, partition_names=None):
+        col = self.vector_db.col
+        if col is None:
+            return []
+        output_fields = [
+            f for f in self.vector_db.fields if f != self.vector_db._primary_field
+        ]
+        results = col.search(
+            data=[query_vector],
+            anns_field=self.vector_db._vector_field,
+            param=self.vector_db.search_params,
+            limit=top_k,
+            expr=expr,
+            output_fields=output_fields,
+            partition_names=partition_names,
+        )
+        hits = []
+        for hit in results[0]:
+            data = {f: hit.entity.get(f) for f in output_fields}
+            text = data.pop(self.vector_db._text_field)
+            vector = data.pop(self.vector_db._vector_field)
+            hits.append((Document(page_content=text, metadata=data), vector))
+        return hits
+
+    def search_with_vectors(self, search_query, top_k, expr=None, partition_names=None):
+        """Similarity search that also returns the stored vector of each hit.
+
+        Returns:
+            Tuple: The query embedding and a list of (Document, vector) hits.
+        """
+        query_vector = self.embedding.embed_query(search_query)
+        return query_vector, self._search_with_vectors(
+            query_vector, top_k, expr, partition_names
+        )
+
+    async def asearch_with_vectors(
+        self, search_query, top_k, expr=None, partition_names=None
+    ):
+        query_vector = await self.embedding.aembed_query(search_query)
+        hits = await asyncio.to_thread(
+            self._search_with_vectors, query_vector, top_k, expr, partition_names
+        )
+        return query_vector, hits
+
+    def get_docs_after(self, last_pk, expr=None, batch_size=1000):
+        """Documents with a primary key above last_pk, e.g. to sync a local index.
+
+        Returns:
+            List: (pk, Document) tuples.
+        """
+        col = self.vector_db.col
+        if col is None:
+            return []
+        pk_field = self.vector_db._primary_field
+        output_fields = [
+            f for f in self.vector_db.fields if f != self.vector_db._vector_field
+        ]
+        query_expr = f"{pk_field} > {last_pk}"
+        if expr:
+            query_expr += f" and ({expr})"
+        iterator = col.query_iterator(
+            batch_size=batch_size, expr=query_expr, output_fields=output_fields
+        )
+        docs = []
+        try:
+            while True:
+                rows = iterator.next()
+                if not rows:
+                    break
+                for row in rows:
+                    row = dict(row)
+                    pk = row.pop(pk_field)
+                    text = row.pop(self.vector_db._text_field)
+                    docs.append((pk, Document(page_content=text, metadata=row)))
+        finally:
+            iterator.close()
+        return docs
+
+    async def aget_docs_after(self, last_pk, expr=None, batch_size=1000):
+        return await asyncio.to_thread(self.get_docs_after, last_pk, expr, batch_size)
+
     def search(self, search_query, top_k=1):
         search_results = self.vector_db.similarity_search(search_query, k=top_k)
         return [result.metadata for result in search_results]
@@ -130,11 +428,13 @@ class MilvusDBTool(StorageTool):
         if self.vector_db.col:
             self.vector_db.col.delete(expr=expr)
             self.vector_db.col.flush()
+            self.data_version += 1
 
     def drop_data_filtered(self, filter):
         if self.vector_db.col:
             result = self.vector_db.col.delete(expr=filter)
             self.vector_db.col.flush()
+            self.data_version += 1
             return result.delete_count
         return 0
 
@@ -146,6 +446,10 @@ class MilvusDBTool(StorageTool):
             auto_id=True,
             drop_old=True,
         )
+        with self._partition_lock:
+            self._partitions.clear()
+            self._rolled_up_partitions.clear()
+        self.data_version += 1
 
 
 if __name__ == "__main__":
@@ -33,6 +33,7 @@ class Neo4jGraphDB(StorageTool):
         name="neo4j_db",
         embedding_model_name="nvidia/nv-embedqa-e5-v5",
         embedding_base_url="https://integrate.api.nvidia.com/v1",
+        embeddings=None,
     ) -> None:
         super().__init__(name)
 
@@ -48,7 +49,7 @@ class Neo4jGraphDB(StorageTool):
             sanitize=True,
             refresh_schema=False,
         )
-        self.embeddings = NVIDIAEmbeddings(
+        self.embeddings = embeddings or NVIDIAEmbeddings(
             model=embedding_model_name,
             truncate="NONE",
             api_key=api_key,
@@ -59,6 +60,13 @@ class Neo4jGraphDB(StorageTool):
             chunk_overlap=100,
             separators=["\n\n", "\n", "\n-", ".", ";", ",", " ", ""],
         )
+        # Bumped whenever ingestion may have added node labels or stream ids,
+        # so that readers holding cached schema lookups know to refresh them.
+        self.schema_version = 0
+
+    def invalidate_schema_cache(self):
+        """Signal that the graph schema (labels, stream ids) may have changed."""
+        self.schema_version += 1
 
     def extract_cypher(self, text: str) -> str:
         """Extract Cypher code from a text.
@@ -119,6 +127,6 @@ class Neo4jGraphDB(StorageTool):
             return obj.to_native().isoformat()
         raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
 
-    async def arun_cypher_query(self, query: str) -> List[Dict]:
+    async def arun_cypher_query(self, query: str, params: dict = None) -> List[Dict]:
         """Async wrapper around run_cypher_query"""
-        return await asyncio.to_thread(self.run_cypher_query, query)
+        return await asyncio.to_thread(self.run_cypher_query, query, params or {})
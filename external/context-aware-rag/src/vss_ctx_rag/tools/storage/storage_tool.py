@@ -37,8 +37,13 @@ class StorageTool(Tool):
     def get_text_data(self, fields, filter):
         pass
 
-    async def aget_text_data(self, fields, filter):
+    async def aget_text_data(self, fields, filter, partition_names=None):
         pass
 
+    def partitions_for_window(self, start=None, end=None, stream_ids=None):
+        """Partitions that may hold documents of the time window and streams,
+        None when the storage is not partitioned"""
+        return None
+
     def search(self, search_query):
         pass
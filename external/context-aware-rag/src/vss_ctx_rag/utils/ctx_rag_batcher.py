@@ -14,9 +14,14 @@
 # limitations under the License.
 
 from typing import Optional
-from collections import defaultdict
+from bisect import insort
+from collections import OrderedDict
 import threading
 from vss_ctx_rag.utils.ctx_rag_logger import logger, TimeMeasure
+from vss_ctx_rag.utils.globals import (
+    DEFAULT_BATCHER_MAX_OPEN_BATCHES,
+    DEFAULT_BATCHER_EVICTED_HISTORY,
+)
 
 
 class Batch:
@@ -32,6 +37,10 @@ class Batch:
         self._batch_size = batch_size
         self._batch_index = None
         self._batch = {}
+        # doc indices kept sorted on insertion so reads never re-sort, skipped ones included
+        self._doc_indices = []
+        self._skipped = {}
+        self._text_bytes = 0
         self._is_full = False
         self._is_last = False
 
@@ -48,6 +57,30 @@ class Batch:
         Returns:
             int: The index of the batch.
         """
+        self._add_slot(doc_i, doc_meta)
+        self._batch[doc_i] = (doc, doc_i, doc_meta)
+        self._text_bytes += len(doc)
+        self._update_full(doc_meta)
+        return self._batch_index
+
+    def skip_doc(self, doc_i: int, doc_meta: Optional[dict] = None):
+        """
+        Counts a document index as an empty slot of the batch, for documents
+        dropped before ingestion. Skipped documents are not returned by as_list.
+        Args:
+            doc_i (int): The index of the document.
+            doc_meta (Optional[dict], optional): Metadata of the dropped document.
+        Raises:
+            RuntimeError: If the document index already exists in the batch or if the batch is full.
+        Returns:
+            int: The index of the batch.
+        """
+        self._add_slot(doc_i, doc_meta)
+        self._skipped[doc_i] = doc_meta
+        self._update_full(doc_meta)
+        return self._batch_index
+
+    def _add_slot(self, doc_i, doc_meta):
         if self._batch_index is None:
             self._batch_index = doc_i // self._batch_size
         else:
@@ -56,30 +89,40 @@ class Batch:
                     f"Document index {doc_i} is being added to incorrect batch: {self._batch_index}."
                 )
 
-        if doc_i in self._batch:
+        if doc_i in self._batch or doc_i in self._skipped:
             raise RuntimeError(f"Duplicate doc_i: {doc_i}")
 
         if self.is_full():
             raise RuntimeError(f"Batch is already full: {doc_i} insertion failed.")
 
-        self._batch[doc_i] = (doc, doc_i, doc_meta)
+        insort(self._doc_indices, doc_i)
 
+    def _update_full(self, doc_meta):
         if doc_meta and doc_meta.get("is_last", False):
             self._is_last = True
 
-        if len(self._batch) == self._batch_size:
+        if len(self._doc_indices) == self._batch_size:
             self._is_full = True
 
-        return self._batch_index
-
     def is_full(self):
         if self._is_last:
-            # Check explicitly for last batch
-            batch = self.as_list()
-            return len(batch) == batch[-1][1] - batch[0][1] + 1
+            # Check explicitly for last batch: all indices up to the last one are present
+            return (
+                len(self._doc_indices)
+                == self._doc_indices[-1] - self._doc_indices[0] + 1
+            )
         else:
             return self._is_full
 
+    def last_meta(self):
+        """Metadata of the highest doc index, skipped docs included"""
+        if not self._doc_indices:
+            return {}
+        doc_i = self._doc_indices[-1]
+        if doc_i in self._batch:
+            return self._batch[doc_i][2] or {}
+        return self._skipped[doc_i] or {}
+
     def has(self, doc_i):
         return doc_i in self._batch
 
@@ -92,25 +135,53 @@ class Batch:
         Returns:
             None
         """
-        if self._batch:
+        if self._doc_indices:
             self._batch = {}
+            self._doc_indices = []
+            self._skipped = {}
+            self._text_bytes = 0
             self._is_full = False
 
     def as_list(self, sort=True):
         if sort:
-            # Will this remain sorted a dict is created?
-            return [value for _, value in sorted(self._batch.items())]
+            return [
+                self._batch[doc_i] for doc_i in self._doc_indices if doc_i in self._batch
+            ]
         return list(self._batch.values())
 
+    @property
+    def text_bytes(self):
+        return self._text_bytes
+
+    def __len__(self):
+        return len(self._batch)
+
     def __str__(self):
         return str(self.as_list(sort=False))
 
 
 class Batcher:
-    def __init__(self, batch_size):
+    """
+    Groups documents into batches of batch_size consecutive doc indices.
+
+    Only open batches are held. Callers evict a batch once it has been processed
+    and persisted; documents that arrive later for an evicted batch are rejected.
+    If more than max_open_batches stay open (for example because doc indices are
+    skipped and a batch never fills), the oldest open batches are dropped.
+    """
+
+    def __init__(
+        self,
+        batch_size,
+        max_open_batches=DEFAULT_BATCHER_MAX_OPEN_BATCHES,
+    ):
         logger.info("Setting up Batcher with batch size %d", batch_size)
         self.batch_size = batch_size
-        self.batches = defaultdict(lambda: Batch(self.batch_size))
+        self.max_open_batches = max_open_batches
+        self.batches = {}
+        self._evicted = OrderedDict()
+        self._evicted_count = 0
+        self._dropped_count = 0
         self._lock = threading.Lock()
 
     def add_doc(self, doc: str, doc_i: int, doc_meta: Optional[dict] = None):
@@ -121,16 +192,78 @@ class Batcher:
             doc_i (int): The index of the document.
             doc_meta (Optional[dict], optional): Additional metadata for the document.
                                                 Defaults to None.
+        Raises:
+            RuntimeError: If the batch of the document was already processed and evicted.
         Returns:
             Batch: The batch that the document was added to
         """
         with TimeMeasure("Add Doc", "green"):
             logger.info(f"adding {doc_i} to batch")
             with self._lock:
-                batch = self.batches[doc_i // self.batch_size]
+                batch_i = doc_i // self.batch_size
+                if batch_i in self._evicted:
+                    raise RuntimeError(
+                        f"Document index {doc_i} arrived after batch {batch_i} was processed."
+                    )
+                batch = self.batches.get(batch_i)
+                if batch is None:
+                    batch = self.batches[batch_i] = Batch(self.batch_size)
+                    self._enforce_bound()
                 batch.add_doc(doc, doc_i, doc_meta)
                 return batch
 
+    def skip_doc(self, doc_i: int, doc_meta: Optional[dict] = None):
+        """
+        Counts a document dropped before ingestion as an empty slot of its
+        batch, so the batch still fills up and keeps its doc index range.
+        Args:
+            doc_i (int): The index of the dropped document.
+            doc_meta (Optional[dict], optional): Metadata of the dropped document.
+        Raises:
+            RuntimeError: If the batch of the document was already processed and evicted.
+        Returns:
+            Batch: The batch that the slot was added to
+        """
+        with self._lock:
+            batch_i = doc_i // self.batch_size
+            if batch_i in self._evicted:
+                raise RuntimeError(
+                    f"Document index {doc_i} arrived after batch {batch_i} was processed."
+                )
+            batch = self.batches.get(batch_i)
+            if batch is None:
+                batch = self.batches[batch_i] = Batch(self.batch_size)
+                self._enforce_bound()
+            batch.skip_doc(doc_i, doc_meta)
+            return batch
+
+    def _enforce_bound(self):
+        while len(self.batches) > self.max_open_batches:
+            oldest = min(self.batches)
+            dropped = self.batches.pop(oldest)
+            self._remember_evicted(oldest)
+            self._dropped_count += 1
+            logger.warning(
+                f"Batcher holds more than {self.max_open_batches} open batches, "
+                f"dropping incomplete batch {oldest} with {len(dropped)} docs"
+            )
+
+    def _remember_evicted(self, batch_i):
+        self._evicted[batch_i] = None
+        while len(self._evicted) > DEFAULT_BATCHER_EVICTED_HISTORY:
+            self._evicted.popitem(last=False)
+
+    def evict(self, batch_i: int):
+        """
+        Releases a batch once it has been processed and persisted.
+        Args:
+            batch_i (int): The index of the batch.
+        """
+        with self._lock:
+            if self.batches.pop(batch_i, None) is not None:
+                self._evicted_count += 1
+            self._remember_evicted(batch_i)
+
     def get_batch(self, doc_i: Optional[int] = None, batch_i: Optional[int] = None):
         """
         Retrieves a batch of documents based on the provided document or batch index.
@@ -138,38 +271,50 @@ class Batcher:
             doc_i (Optional[int], optional): The index of the document. Defaults to None.
             batch_i (Optional[int], optional): The index of the batch. Defaults to None.
         Returns:
-            Batch or None: The batch of documents if the document index is present in the batch,
-                           otherwise None.
+            Batch or None: The batch of documents if it is open and, when doc_i is
+                           given, contains that document, otherwise None.
         """
         with self._lock:
             if batch_i is None:
                 batch_i = doc_i // self.batch_size
-            batch = self.batches[batch_i]
-            if doc_i is not None:
-                if batch.has(doc_i):
-                    return batch
+            batch = self.batches.get(batch_i)
+            if batch is not None and doc_i is not None and not batch.has(doc_i):
                 return None
-            else:
-                return batch
+            return batch
 
     def get_all_batches(self):
         with self._lock:
             batches = []
-            for i, batch in self.batches.items():
-                batches.extend(batch.as_list())
+            for i in sorted(self.batches):
+                batches.extend(self.batches[i].as_list())
             return batches
 
     def get_batch_index(self, doc_i):
         return doc_i // self.batch_size
 
+    def memory_stats(self) -> dict:
+        """Returns the size of the data held by open batches"""
+        with self._lock:
+            return {
+                "open_batches": len(self.batches),
+                "open_docs": sum(len(b) for b in self.batches.values()),
+                "open_text_bytes": sum(b.text_bytes for b in self.batches.values()),
+                "evicted_batches": self._evicted_count,
+                "dropped_batches": self._dropped_count,
+            }
+
     def __str__(self):
         with self._lock:
             print_val = ""
-            for i, batch in self.batches.items():
-                print_val += "batch " + str(i) + ": " + str(batch.as_list()) + "\n"
+            for i in sorted(self.batches):
+                print_val += (
+                    "batch " + str(i) + ": " + str(self.batches[i].as_list()) + "\n"
+                )
             return print_val
 
     def flush(self):
         with self._lock:
-            for batch in self.batches.values():
-                batch.flush()
+            self.batches.clear()
+            self._evicted.clear()
+            self._evicted_count = 0
+            self._dropped_count = 0
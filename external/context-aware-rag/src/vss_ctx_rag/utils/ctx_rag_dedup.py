@@ -0,0 +1,119 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""ctx_rag_dedup.py: Near-duplicate detection of ingested documents"""
+
+import hashlib
+import json
+import re
+from collections import Counter, deque
+from typing import Dict, Hashable, List
+
+SIMHASH_BITS = 64
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+def shingles(text: str, size: int) -> List[str]:
+    """Overlapping word n-grams of the normalized text"""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) <= size:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i : i + size]) for i in range(len(words) - size + 1)]
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """64-bit SimHash of the text's word shingles, stable across processes"""
+    weights = [0] * SIMHASH_BITS
+    for shingle, count in Counter(shingles(text, shingle_size)).items():
+        h = int.from_bytes(
+            hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big"
+        )
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += count if (h >> bit) & 1 else -count
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+class NearDuplicateFilter:
+    """
+    Per-stream near-duplicate filter over a bounded window of recent documents.
+
+    A document is a near duplicate when the Hamming distance between its SimHash
+    and the SimHash of one of the last `window_size` documents kept for the same
+    stream is at most `hamming_threshold`. Repeats are counted on the matched
+    entry instead of being added to the window, so a jingle aired every few
+    minutes stays in the window as long as it keeps repeating.
+    """
+
+    def __init__(
+        self, window_size: int, hamming_threshold: int, shingle_size: int = 3
+    ):
+        self.window_size = window_size
+        self.hamming_threshold = hamming_threshold
+        self.shingle_size = shingle_size
+        # stream id -> deque of [simhash, repeat count], most recent last
+        self._windows: Dict[Hashable, deque] = {}
+        self._seen = Counter()
+        self._suppressed = Counter()
+        self._suppressed_chars = 0
+
+    def is_duplicate(self, stream_id: Hashable, text: str) -> bool:
+        """Check a document against its stream's window, recording it if new"""
+        self._seen[stream_id] += 1
+        if not text or not text.strip():
+            return False
+        fingerprint = simhash(text, self.shingle_size)
+        window = self._windows.setdefault(stream_id, deque(maxlen=self.window_size))
+        for i, entry in enumerate(window):
+            if (entry[0] ^ fingerprint).bit_count() <= self.hamming_threshold:
+                entry[1] += 1
+                # Keep repeating content in the window
+                del window[i]
+                window.append(entry)
+                self._suppressed[stream_id] += 1
+                self._suppressed_chars += len(text)
+                return True
+        window.append([fingerprint, 1])
+        return False
+
+    def reset(self):
+        self._windows.clear()
+        self._seen.clear()
+        self._suppressed.clear()
+        self._suppressed_chars = 0
+
+    def stats(self) -> dict:
+        seen = sum(self._seen.values())
+        suppressed = sum(self._suppressed.values())
+        return {
+            "seen": seen,
+            "suppressed": suppressed,
+            "suppression_rate": suppressed / seen if seen else 0.0,
+            "suppressed_chars": self._suppressed_chars,
+            "streams": {
+                str(stream_id): {
+                    "seen": self._seen[stream_id],
+                    "suppressed": self._suppressed[stream_id],
+                }
+                for stream_id in self._seen
+            },
+        }
+
+    def dump_json(self, file_name: str):
+        with open(file_name, "w") as f:
+            json.dump(self.stats(), f, indent=4)
+
+    def __len__(self):
+        return sum(len(window) for window in self._windows.values())
+
@@ -14,11 +14,14 @@
 # limitations under the License.
 
 import logging
+import random
 import time
 import nvtx
 import os
 from opentelemetry import trace
 
+from vss_ctx_rag.utils.ctx_rag_metrics import normalize_stage, stage_duration
+
 LOG_COLORS = {
     "RESET": "\033[0m",
     "CRITICAL": "\033[1m",
@@ -82,32 +85,49 @@ logger.addHandler(term_out)
 logger.addHandler(file_logger)
 
 
+# Fraction of TimeMeasure PERF log lines written. Durations are always recorded
+# in the stage histograms, and stages slower than the threshold are always logged.
+PERF_LOG_SAMPLE_RATE = float(os.environ.get("VSS_PERF_LOG_SAMPLE_RATE", "0.01"))
+PERF_LOG_SLOW_MS = float(os.environ.get("VSS_PERF_LOG_SLOW_MS", "1000"))
+
+_tracer = trace.get_tracer(__name__)
+
+
 class TimeMeasure:
     def __init__(self, string, nvtx_color="grey", print=True) -> None:
         self._string = string
         self._print = print
         self._nvtx_color = nvtx_color
         self._nvtx_trace = None
-        self._tracer = trace.get_tracer(__name__)
 
     def __enter__(self):
         self._start_time = time.time()
+        self._perf_start = time.perf_counter()
         self._nvtx_trace = nvtx.start_range(
             message=self._string, color=self._nvtx_color
         )
-        self._span = self._tracer.start_span(self._string)
+        self._span = _tracer.start_span(self._string)
         return self
 
     def __exit__(self, type, value, traceback):
-        self._end_time = time.time()
+        self._execution_time = time.perf_counter() - self._perf_start
+        self._end_time = self._start_time + self._execution_time
         nvtx.end_range(self._nvtx_trace)
-        self._execution_time = self._end_time - self._start_time
 
-        self._span.set_attribute("span name", self._string)
-        self._span.set_attribute("execution_time_ms", self._execution_time * 1000.0)
+        stage_duration.observe(self._execution_time, normalize_stage(self._string))
+
+        if self._span.is_recording():
+            self._span.set_attribute("span name", self._string)
+            self._span.set_attribute(
+                "execution_time_ms", self._execution_time * 1000.0
+            )
         self._span.end()
 
-        if self._print:
+        if self._print and (
+            self._execution_time * 1000.0 >= PERF_LOG_SLOW_MS
+            or PERF_LOG_SAMPLE_RATE >= 1.0
+            or random.random() < PERF_LOG_SAMPLE_RATE
+        ):
             logger.log(
                 LOG_PERF_LEVEL,
                 "{:s} time = {:.2f} ms".format(
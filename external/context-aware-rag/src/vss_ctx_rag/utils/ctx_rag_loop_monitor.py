@@ -0,0 +1,311 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""ctx_rag_loop_monitor.py: Event loop lag and stall measurement"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Iterable, Optional
+
+from vss_ctx_rag.utils.ctx_rag_logger import logger
+from vss_ctx_rag.utils.ctx_rag_metrics import Histogram, normalize_stage, registry
+from vss_ctx_rag.utils.globals import (
+    DEFAULT_LOOP_MONITOR_INTERVAL_SEC,
+    DEFAULT_LOOP_MONITOR_MAX_SITES,
+    DEFAULT_LOOP_MONITOR_RECENT_STALLS,
+    DEFAULT_LOOP_STALL_THRESHOLD_SEC,
+)
+
+# Seconds, from scheduling jitter up to multi-second stalls
+LOOP_LAG_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+STACK_LIMIT = 32
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+loop_lag = registry.histogram(
+    "ca_rag_event_loop_lag_seconds",
+    "Delay of the event loop in running a periodic callback",
+    ("loop",),
+    buckets=LOOP_LAG_BUCKETS,
+)
+loop_stalls = registry.counter(
+    "ca_rag_event_loop_stalls_total",
+    "Event loop stalls, by the task and code site blocking the loop",
+    ("loop", "task", "site"),
+)
+loop_stall_seconds = registry.counter(
+    "ca_rag_event_loop_stall_seconds_total",
+    "Time the event loop was stalled, by the task and code site blocking the loop",
+    ("loop", "task", "site"),
+)
+
+
+class EventLoopMonitor:
+    """
+    Measures how late the event loop wakes up a task sleeping for `interval`.
+
+    The lag of every wake-up is the time the loop was busy running other
+    callbacks past the deadline. Lags of at least `stall_threshold` count as
+    stalls: code that blocked the loop, e.g. synchronous I/O or CPU-bound
+    work inside a coroutine.
+
+    With `capture_stacks`, a watchdog thread takes the stack of the loop
+    thread while a wake-up is overdue. The stall is attributed to the task
+    that was running, and to the innermost function of the code under
+    `attribute_paths` (the vss_ctx_rag package by default), e.g.
+    `vss_ctx_rag/tools/storage/milvus_db.py:add_summary`.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.01,
+        stall_threshold: float = 0.05,
+        name: str = "default",
+        capture_stacks: bool = False,
+        attribute_paths: Iterable[str] = (PACKAGE_DIR,),
+        max_sites: int = DEFAULT_LOOP_MONITOR_MAX_SITES,
+        max_recent: int = DEFAULT_LOOP_MONITOR_RECENT_STALLS,
+    ):
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.name = name
+        self.capture_stacks = capture_stacks
+        self.attribute_paths = tuple(os.path.abspath(p) for p in attribute_paths)
+        self.max_sites = max_sites
+        self._lag = Histogram("event_loop_lag_seconds", "", buckets=LOOP_LAG_BUCKETS)
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=max_recent)
+        self._task = None
+        self._loop = None
+        self._loop_thread_id = None
+        self._watchdog_stop = threading.Event()
+        # Deadline of the pending wake-up, and the stack captured while it is overdue
+        self._deadline = None
+        self._capture = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._lag.reset()
+            self.max_lag = 0.0
+            self.stalls = 0
+            self.stall_sec = 0.0
+            self._sites = {}
+            self._recent.clear()
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Start monitoring `loop`, from any thread, or the running event loop"""
+        if self._task is not None:
+            return
+        if loop is None:
+            self._task = asyncio.get_running_loop().create_task(
+                self._run(), name="event_loop_monitor"
+            )
+        else:
+            self._task = asyncio.run_coroutine_threadsafe(self._run(), loop)
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        if isinstance(self._task, asyncio.Task):
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        self._loop_thread_id = threading.get_ident()
+        if self.capture_stacks:
+            self._watchdog_stop.clear()
+            threading.Thread(
+                target=self._watch, name=f"loop-watchdog-{self.name}", daemon=True
+            ).start()
+        try:
+            while True:
+                self._deadline = loop.time() + self.interval
+                await asyncio.sleep(self.interval)
+                lag = max(loop.time() - self._deadline, 0.0)
+                with self._lock:
+                    capture, self._capture = self._capture, None
+                self.record(lag, capture)
+        finally:
+            self._deadline = None
+            self._watchdog_stop.set()
+
+    def _watch(self):
+        """Capture the loop thread stack once per overdue wake-up.
+
+        The loop clock is assumed to be time.monotonic, the asyncio default.
+        """
+        poll = min(self.interval, self.stall_threshold) / 2
+        while not self._watchdog_stop.wait(poll):
+            deadline = self._deadline
+            if deadline is None or time.monotonic() - deadline < self.stall_threshold / 2:
+                continue
+            with self._lock:
+                if self._capture is not None:
+                    continue
+            capture = self._capture_stack()
+            with self._lock:
+                if self._deadline == deadline:
+                    self._capture = capture
+
+    def _capture_stack(self):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return None
+        stack = traceback.extract_stack(frame, limit=STACK_LIMIT)
+        del frame
+        task = asyncio.current_task(self._loop)
+        task_name = normalize_stage(task.get_name()) if task else "callback"
+        return task_name, self._site(stack), [
+            f"{entry.filename}:{entry.lineno} in {entry.name}" for entry in stack
+        ]
+
+    def _site(self, stack) -> str:
+        """Innermost function of the attributed code, else the innermost function"""
+        for entry in reversed(stack):
+            filename = os.path.abspath(entry.filename)
+            if filename == os.path.abspath(__file__):
+                continue
+            for path in self.attribute_paths:
+                if filename.startswith(path + os.sep):
+                    relative = os.path.relpath(filename, os.path.dirname(path))
+                    return f"{relative}:{entry.name}"
+        if not stack:
+            return "unknown"
+        return f"{os.path.basename(stack[-1].filename)}:{stack[-1].name}"
+
+    def record(self, lag: float, capture=None):
+        self._lag.observe(lag)
+        loop_lag.observe(lag, self.name)
+        self.max_lag = max(self.max_lag, lag)
+        if lag < self.stall_threshold:
+            return
+        task_name, site, stack = capture or ("unknown", "unknown", None)
+        with self._lock:
+            self.stalls += 1
+            self.stall_sec += lag
+            key = (task_name, site)
+            if key not in self._sites and len(self._sites) >= self.max_sites:
+                key = ("other", "other")
+            entry = self._sites.get(key)
+            new_site = entry is None
+            if new_site:
+                entry = self._sites[key] = {
+                    "task": key[0],
+                    "site": key[1],
+                    "stalls": 0,
+                    "total_sec": 0.0,
+                    "max_sec": 0.0,
+                    "stack": stack,
+                }
+            entry["stalls"] += 1
+            entry["total_sec"] += lag
+            if lag >= entry["max_sec"]:
+                entry["max_sec"] = lag
+                entry["stack"] = stack or entry["stack"]
+            entry["last_time"] = time.time()
+            self._recent.append(
+                {"time": time.time(), "lag_sec": lag, "task": key[0], "site": key[1]}
+            )
+        loop_stalls.inc(self.name, *key)
+        loop_stall_seconds.inc(self.name, *key, amount=lag)
+        if new_site and stack:
+            logger.warning(
+                f"Event loop {self.name} blocked for {lag * 1e3:.0f} ms by {site} "
+                f"in task {task_name}:\n  " + "\n  ".join(stack[-8:])
+            )
+
+    def stats(self) -> dict:
+        """Lag quantiles, and the number and total duration of stalls, since the last reset"""
+        cell = self._lag.collect().get(())
+        count = cell[-1] if cell else 0
+
+        def quantile(q):
+            # Bucket interpolation can overshoot the largest lag seen
+            return min(self._lag.quantile(q, cell), self.max_lag) if count else None
+
+        return {
+            "samples": count,
+            "mean_lag_sec": cell[-2] / count if count else None,
+            "p50_lag_sec": quantile(0.5),
+            "p99_lag_sec": quantile(0.99),
+            "max_lag_sec": self.max_lag,
+            "stalls": self.stalls,
+            "stall_sec": self.stall_sec,
+        }
+
+    def report(self, max_sites: Optional[int] = None) -> dict:
+        """Stats, the stall sites with the most stalled time first, and the latest stalls"""
+        with self._lock:
+            sites = sorted(
+                (dict(entry) for entry in self._sites.values()),
+                key=lambda entry: -entry["total_sec"],
+            )
+            recent = list(self._recent)
+        return {
+            "loop": self.name,
+            "interval_sec": self.interval,
+            "stall_threshold_sec": self.stall_threshold,
+            "capture_stacks": self.capture_stacks,
+            **self.stats(),
+            "sites": sites[:max_sites] if max_sites else sites,
+            "recent": recent,
+        }
+
+
+def loop_monitor_from_env(
+    name: str, attribute_paths: Iterable[str] = (PACKAGE_DIR,)
+) -> Optional[EventLoopMonitor]:
+    """Stack-capturing monitor configured by VIA_CTX_RAG_ENABLE_LOOP_MONITOR and
+    VIA_CTX_RAG_LOOP_STALL_THRESHOLD_MS, None when disabled"""
+    enabled = os.environ.get("VIA_CTX_RAG_ENABLE_LOOP_MONITOR", "false").lower()
+    if enabled not in ["true", "1", "yes", "on"]:
+        return None
+    stall_threshold = (
+        float(os.environ["VIA_CTX_RAG_LOOP_STALL_THRESHOLD_MS"]) / 1e3
+        if os.environ.get("VIA_CTX_RAG_LOOP_STALL_THRESHOLD_MS")
+        else DEFAULT_LOOP_STALL_THRESHOLD_SEC
+    )
+    return EventLoopMonitor(
+        interval=DEFAULT_LOOP_MONITOR_INTERVAL_SEC,
+        stall_threshold=stall_threshold,
+        name=name,
+        capture_stacks=True,
+        attribute_paths=attribute_paths,
+    )
@@ -0,0 +1,291 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""ctx_rag_metrics.py: In-process counters and histograms with Prometheus export"""
+
+import re
+import threading
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Seconds, from sub-millisecond bookkeeping up to long LLM calls
+DEFAULT_DURATION_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+
+STAGE_DURATION_METRIC = "ca_rag_stage_duration_seconds"
+
+_NUMBER_PATTERN = re.compile(r"\d+")
+_LABEL_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n"})
+
+
+@lru_cache(maxsize=1024)
+def normalize_stage(name: str) -> str:
+    """Stage label of a TimeMeasure name, with indices folded to keep cardinality bounded"""
+    return _NUMBER_PATTERN.sub("N", name).strip(" :")
+
+
+class _Metric:
+    """
+    Base of the metric primitives.
+
+    Every thread updates its own cells without locking. A lock is only taken
+    the first time a thread touches a label set, and when collecting, which
+    sums the cells of all threads.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, help: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self._local = threading.local()
+        # (thread cells) for every thread that ever recorded a value
+        self._all_cells: List[Dict[Tuple[str, ...], list]] = []
+        self._lock = threading.Lock()
+
+    def _new_cell(self) -> list:
+        raise NotImplementedError
+
+    def _cell(self, labels: Tuple[str, ...]) -> list:
+        cells = getattr(self._local, "cells", None)
+        if cells is None:
+            cells = self._local.cells = {}
+            with self._lock:
+                self._all_cells.append(cells)
+        cell = cells.get(labels)
+        if cell is None:
+            with self._lock:
+                cell = cells[labels] = self._new_cell()
+        return cell
+
+    def collect(self) -> Dict[Tuple[str, ...], list]:
+        """Sum of the cells of all threads, per label values"""
+        merged = {}
+        with self._lock:
+            thread_cells = [dict(cells) for cells in self._all_cells]
+        for cells in thread_cells:
+            for labels, cell in cells.items():
+                total = merged.get(labels)
+                if total is None:
+                    merged[labels] = list(cell)
+                else:
+                    for i, value in enumerate(cell):
+                        total[i] += value
+        return merged
+
+    def reset(self):
+        with self._lock:
+            for cells in self._all_cells:
+                for cell in cells.values():
+                    cell[:] = self._new_cell()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_cell(self) -> list:
+        return [0.0]
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        self._cell(labels)[0] += amount
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram. Cells hold the bucket counts, then sum and count"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label_names: Tuple[str, ...] = (),
+        buckets: Iterable[float] = DEFAULT_DURATION_BUCKETS,
+    ):
+        super().__init__(name, help, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_cell(self) -> list:
+        return [0] * (len(self.buckets) + 1) + [0.0, 0]
+
+    def observe(self, value: float, *labels: str):
+        cell = self._cell(labels)
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-2] += value
+        cell[-1] += 1
+
+    def quantile(self, q: float, cell: list) -> Optional[float]:
+        """Estimate a quantile from bucket counts, like Prometheus' histogram_quantile"""
+        count = cell[-1]
+        if not count:
+            return None
+        rank = q * count
+        cumulative = 0
+        for i, bucket_count in enumerate(cell[: len(self.buckets) + 1]):
+            if cumulative + bucket_count >= rank and bucket_count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                if i == len(self.buckets):
+                    return lower
+                upper = self.buckets[i]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help, label_names, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = cls(
+                        name, help, tuple(label_names), **kwargs
+                    )
+        return metric
+
+    def counter(self, name: str, help: str = "", label_names=()) -> Counter:
+        return self._get_or_create(Counter, name, help, label_names)
+
+    def histogram(
+        self,
+        name: str,
+        help: str = "",
+        label_names=(),
+        buckets: Iterable[float] = DEFAULT_DURATION_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(
+            Histogram, name, help, label_names, buckets=buckets
+        )
+
+    def snapshot(self) -> dict:
+        """Picklable state of all metrics, to merge across processes"""
+        return {
+            name: {
+                "kind": metric.kind,
+                "help": metric.help,
+                "label_names": metric.label_names,
+                "buckets": getattr(metric, "buckets", None),
+                "values": metric.collect(),
+            }
+            for name, metric in list(self._metrics.items())
+        }
+
+    def summary(self, quantiles=(0.5, 0.99)) -> dict:
+        """Count, mean and estimated quantiles of every histogram series"""
+        result = {}
+        for name, metric in list(self._metrics.items()):
+            if not isinstance(metric, Histogram):
+                continue
+            for labels, cell in metric.collect().items():
+                if not cell[-1]:
+                    continue
+                entry = {"count": cell[-1], "mean": cell[-2] / cell[-1]}
+                for q in quantiles:
+                    entry[f"p{round(q * 100)}"] = metric.quantile(q, cell)
+                result[f"{name}{{{','.join(labels)}}}"] = entry
+        return result
+
+    def reset(self):
+        for metric in list(self._metrics.values()):
+            metric.reset()
+
+
+def merge_snapshots(snapshots: Iterable[dict]) -> dict:
+    merged = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, {**metric, "values": {}})
+            for labels, cell in metric["values"].items():
+                total = target["values"].get(labels)
+                if total is None:
+                    target["values"][labels] = list(cell)
+                else:
+                    for i, value in enumerate(cell):
+                        total[i] += value
+    return merged
+
+
+def _format_labels(label_names, labels, extra: Tuple[Tuple[str, str], ...] = ()):
+    pairs = list(zip(label_names, labels)) + list(extra)
+    if not pairs:
+        return ""
+    return (
+        "{"
+        + ",".join(f'{k}="{str(v).translate(_LABEL_ESCAPES)}"' for k, v in pairs)
+        + "}"
+    )
+
+
+def render_prometheus(snapshot: dict) -> str:
+    """Render a snapshot in the Prometheus text exposition format"""
+    lines = []
+    for name in sorted(snapshot):
+        metric = snapshot[name]
+        if metric["help"]:
+            lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['kind']}")
+        label_names = metric["label_names"]
+        for labels, cell in sorted(metric["values"].items()):
+            if metric["kind"] == "counter":
+                lines.append(f"{name}{_format_labels(label_names, labels)} {cell[0]}")
+                continue
+            cumulative = 0
+            for bound, bucket_count in zip(
+                list(metric["buckets"]) + ["+Inf"], cell[:-2]
+            ):
+                cumulative += bucket_count
+                le = bound if bound == "+Inf" else repr(float(bound))
+                lines.append(
+                    f"{name}_bucket"
+                    f"{_format_labels(label_names, labels, (('le', le),))} {cumulative}"
+                )
+            lines.append(f"{name}_sum{_format_labels(label_names, labels)} {cell[-2]}")
+            lines.append(
+                f"{name}_count{_format_labels(label_names, labels)} {cell[-1]}"
+            )
+    return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+stage_duration = registry.histogram(
+    STAGE_DURATION_METRIC,
+    "Duration of instrumented CA-RAG stages in seconds",
+    ("stage",),
+)
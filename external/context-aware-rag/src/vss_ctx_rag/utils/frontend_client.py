@@ -0,0 +1,197 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""frontend_client.py: Client for the chat frontend transcript API"""
+
+import asyncio
+import os
+from typing import Coroutine, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from vss_ctx_rag.utils.ctx_rag_logger import logger
+from vss_ctx_rag.utils.globals import (
+    DEFAULT_FRONTEND_MAX_CONCURRENCY,
+    DEFAULT_FRONTEND_STATUS_RETRIES,
+    DEFAULT_FRONTEND_STATUS_RETRY_SEC,
+    DEFAULT_FRONTEND_TIMEOUT_SEC,
+)
+
+
+class FrontendClient:
+    """
+    Client for the transcript endpoint of the chat frontend.
+
+    Requests share one pooled session per event loop, at most `max_concurrency`
+    at a time. Use `submit` to run a request in the background so that callers
+    never wait on the frontend. Status updates wait for the exports of their
+    transcripts started with `submit_export`, so a transcript is never marked
+    processed before it exists.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        max_concurrency: int = DEFAULT_FRONTEND_MAX_CONCURRENCY,
+        timeout: float = DEFAULT_FRONTEND_TIMEOUT_SEC,
+    ):
+        self.endpoint = f"{endpoint}/api/update-data-stream"
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks = set()
+        # uuid -> export still in flight
+        self._exports: Dict[str, asyncio.Task] = {}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Sessions are bound to the event loop that created them
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._session
+
+    async def _request(self, method: str, data: dict) -> Tuple[Optional[int], dict]:
+        """Status and JSON body of a request, (None, {}) if it failed"""
+        session = self._get_session()
+        try:
+            async with self._semaphore:
+                async with session.request(method, self.endpoint, json=data) as response:
+                    try:
+                        body = await response.json(content_type=None)
+                    except Exception:
+                        body = None
+                    return response.status, body if isinstance(body, dict) else {}
+        except aiohttp.ClientConnectionError:
+            logger.error(f"Failed to connect to frontend at {self.endpoint}")
+        except Exception as e:
+            logger.error(f"Error calling frontend {method} {self.endpoint}: {e}")
+        return None, {}
+
+    async def export_transcript(self, transcript, stream_id, timestamp, uuid):
+        """Add a finalized transcript, pending until marked processed.
+
+        Args:
+            transcript: The transcript text to export
+            stream_id: Stream identifier
+            timestamp: UTC timestamp in %Y-%m-%d %H:%M:%S format
+            uuid: UUID for tracking
+        """
+        status, _ = await self._request(
+            "POST",
+            {
+                "text": transcript,
+                "stream_id": stream_id,
+                "timestamp": timestamp,
+                "finalized": True,
+                "uuid": uuid,
+            },
+        )
+        if status == 200:
+            logger.debug(f"Successfully exported to frontend: UUID {uuid}")
+        elif status is not None:
+            logger.warning(f"Failed to export to frontend: {status}")
+
+    def submit_export(self, transcript, stream_id, timestamp, uuid) -> asyncio.Task:
+        """Export a transcript in the background, tracked by its uuid"""
+        task = self.submit(
+            self.export_transcript(transcript, stream_id, timestamp, uuid)
+        )
+        if uuid:
+            self._exports[uuid] = task
+
+            def _on_done(t, uuid=uuid):
+                if self._exports.get(uuid) is t:
+                    del self._exports[uuid]
+
+            task.add_done_callback(_on_done)
+        return task
+
+    async def _patch_status(self, uuids: List[str], pending: bool) -> List[str]:
+        """One bulk status update, returning the uuids that were not updated"""
+        status, body = await self._request(
+            "PATCH", {"uuids": uuids, "pending": pending}
+        )
+        if status == 400:
+            # The frontend does not support bulk updates
+            statuses = await asyncio.gather(
+                *[
+                    self._request("PATCH", {"uuid": uuid, "pending": pending})
+                    for uuid in uuids
+                ]
+            )
+            return [u for u, (s, _) in zip(uuids, statuses) if s != 200]
+        if status == 404:
+            return body.get("missing") or uuids
+        return uuids if status != 200 else []
+
+    async def update_status(self, uuids: List[str], pending: bool = False):
+        """Set the pending status of transcripts with a single bulk request.
+
+        Waits for the exports of the transcripts still in flight first.
+        Transcripts the frontend reports missing are retried a few times, and
+        one request per transcript is sent when the frontend does not support
+        bulk updates.
+        """
+        uuids = [uuid for uuid in uuids if uuid]
+        if not uuids:
+            return
+        exports = [self._exports[uuid] for uuid in uuids if uuid in self._exports]
+        if exports:
+            await asyncio.gather(*exports, return_exceptions=True)
+        failed = await self._patch_status(uuids, pending)
+        for attempt in range(DEFAULT_FRONTEND_STATUS_RETRIES):
+            if not failed:
+                break
+            await asyncio.sleep(DEFAULT_FRONTEND_STATUS_RETRY_SEC * 2**attempt)
+            failed = await self._patch_status(failed, pending)
+        if failed:
+            logger.warning(f"Failed to update transcript status for UUIDs: {failed}")
+        else:
+            logger.info(f"Updated transcript status for {len(uuids)} transcripts")
+
+    def submit(self, coro: Coroutine) -> asyncio.Task:
+        """Run a request in the background of the current event loop"""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def aclose(self):
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+_frontend_client: Optional[FrontendClient] = None
+
+
+def get_frontend_client() -> Optional[FrontendClient]:
+    """Client shared by the process, None if CHAT_FRONTEND_ENDPOINT is not set"""
+    global _frontend_client
+    endpoint = os.environ.get("CHAT_FRONTEND_ENDPOINT", None)
+    if not endpoint:
+        return None
+    if _frontend_client is None:
+        _frontend_client = FrontendClient(endpoint)
+    return _frontend_client
@@ -30,8 +30,49 @@ DEFAULT_LLM_PARAMS = {
     "presence_penalty": 0,
 }
 DEFAULT_SUMM_RECURSION_LIMIT = 8
+DEFAULT_SUMM_BATCH_MAX_CONCURRENCY = 20
+DEFAULT_SUMM_WAIT_RECHECK_SEC = 5
+DEFAULT_SUMM_TREE_FANOUT = 4
+DEFAULT_SUMM_MAX_INPUT_TOKENS = 16384
 LLM_TOOL_NAME = "llm"
 DEFAULT_EMBEDDING_PARALLEL_COUNT = 1000
+DEFAULT_GRAPH_SCHEMA_CACHE_TTL = 30
+DEFAULT_QUESTION_ANALYSIS_CACHE_SIZE = 256
+DEFAULT_ANSWER_CACHE_SIMILARITY_THRESHOLD = 0.95
+DEFAULT_ANSWER_CACHE_TTL = 300
+DEFAULT_ANSWER_CACHE_MAX_ENTRIES = 256
+DEFAULT_RETRIEVAL_FAST_PATH = False
+DEFAULT_RERANK_MIN_CANDIDATES = 10
+DEFAULT_HYBRID_SEARCH = False
+DEFAULT_RRF_K = 60
+DEFAULT_MILVUS_PARTITION_BY_STREAM_DAY = False
+DEFAULT_MILVUS_MAINTENANCE_INTERVAL = 3600
+# Milvus allows 1024 partitions per collection by default, keep some headroom
+DEFAULT_MILVUS_MAX_PARTITIONS = 1000
+DEFAULT_VECTOR_DB_BACKEND = "milvus"
+DEFAULT_DEDUP_WINDOW_SIZE = 256
+DEFAULT_DEDUP_HAMMING_THRESHOLD = 6
+DEFAULT_DEDUP_SHINGLE_SIZE = 3
+DEFAULT_NOTIFICATION_BATCH_EVENTS = False
+DEFAULT_ALERT_MAX_CONCURRENCY = 16
+DEFAULT_ALERT_TIMEOUT_SEC = 10
+DEFAULT_FRONTEND_MAX_CONCURRENCY = 16
+DEFAULT_FRONTEND_TIMEOUT_SEC = 10
+# Retries of a status update for transcripts the frontend does not know yet
+DEFAULT_FRONTEND_STATUS_RETRIES = 3
+DEFAULT_FRONTEND_STATUS_RETRY_SEC = 1.0
+DEFAULT_GRAPH_EXTRACTION_CONCURRENCY = 8
+DEFAULT_GRAPH_EXTRACTION_MAX_RETRIES = 2
+DEFAULT_GRAPH_EXTRACTION_RETRY_BACKOFF_SEC = 1
+DEFAULT_GRAPH_EXTRACTION_CACHE_SIZE = 4096
+DEFAULT_METRICS_DUMP_INTERVAL_SEC = 5
+DEFAULT_LOOP_MONITOR_INTERVAL_SEC = 0.025
+DEFAULT_LOOP_STALL_THRESHOLD_SEC = 0.1
+DEFAULT_LOOP_MONITOR_MAX_SITES = 256
+DEFAULT_LOOP_MONITOR_RECENT_STALLS = 50
+
+DEFAULT_BATCHER_MAX_OPEN_BATCHES = 1000
+DEFAULT_BATCHER_EVICTED_HISTORY = 1000
 
 ## LOAD BALANCING
 DEFAULT_CONCURRENT_EMBEDDING_LIMIT = 250
@@ -19,12 +19,7 @@ import jsonschema
 import json
 import re
 from vss_ctx_rag.utils.ctx_rag_logger import logger
-from vss_ctx_rag.context_manager.context_manager_models import (
-    ContextManagerConfig,
-    AlertConfig,
-)
-from typing import Dict, Any, Optional
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from typing import Dict, Any, List, Optional, Tuple
 import asyncio
 from vss_ctx_rag.utils.ctx_rag_logger import TimeMeasure
 
@@ -45,6 +40,46 @@ def remove_think_tags(text_in):
     return text_out
 
 
+async def astream_text_filter(chunks, transform, max_hold: int = 64):
+    """
+    Apply a text transform to a stream of text chunks.
+
+    Text that may be the start of a tag (an unclosed "<think>" block, or a "<"
+    not yet followed by ">") is held back until it is complete, so that
+    `transform` always sees whole tags, e.g. remove_think_tags() or the
+    "<12.5>" timestamp substitution of the retrieval functions.
+
+    Args:
+        chunks: Async iterator of text chunks.
+        transform: Callable applied to each released piece of text.
+        max_hold: Longest partial tag (other than <think>) to hold back.
+    """
+    pending = ""
+    async for chunk in chunks:
+        pending += chunk
+        cut = len(pending)
+        think = pending.rfind("<think>")
+        if think != -1 and pending.find("</think>", think) == -1:
+            cut = think
+        else:
+            tag = pending.rfind("<")
+            if (
+                tag != -1
+                and ">" not in pending[tag:]
+                and len(pending) - tag <= max_hold
+            ):
+                cut = tag
+        if cut:
+            text = transform(pending[:cut])
+            pending = pending[cut:]
+            if text:
+                yield text
+    if pending:
+        text = transform(pending)
+        if text:
+            yield text
+
+
 def remove_lucene_chars(text: str) -> str:
     """
     Remove Lucene special characters from the given text.
@@ -129,6 +164,12 @@ class RequestInfo:
 
 
 def validate_config(config: Dict[str, Any]) -> None:
+    # Imported here, the context_manager package imports this module
+    from vss_ctx_rag.context_manager.context_manager_models import (
+        AlertConfig,
+        ContextManagerConfig,
+    )
+
     if config.get("summarization", {}).get("enable") is False:
         logger.warning(
             "Summarization disabling not supported, setting summarization enable to True"
@@ -156,6 +197,31 @@ def validate_config(config: Dict[str, Any]) -> None:
     raise ValueError(error_msg)
 
 
+_token_encoder = None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of LLM tokens in text.
+
+    Uses the tiktoken cl100k_base encoding when it is available and falls back to
+    a characters-per-token heuristic otherwise. The estimate is meant for packing
+    prompts below a budget ahead of time, not for exact accounting.
+    """
+    global _token_encoder
+    if _token_encoder is None:
+        try:
+            import tiktoken
+
+            _token_encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logger.info(f"tiktoken unavailable ({e}), estimating tokens from length")
+            _token_encoder = False
+    if _token_encoder:
+        return len(_token_encoder.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
 async def call_token_safe(input_data, pipeline, retries_left):
     """
     Unified function to handle token limit errors for both text and batch processing
@@ -166,6 +232,9 @@ async def call_token_safe(input_data, pipeline, retries_left):
     try:
         return await pipeline.ainvoke(input_data)
     except Exception as e:
+        # Only needed on the rare token limit errors, keep it off the import path
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+
         if (
             "exceeds maximum input length" not in str(e).lower()
             and "please reduce the length of the messages" not in str(e).lower()
@@ -283,3 +352,44 @@ async def call_token_safe(input_data, pipeline, retries_left):
                     )
         else:
             raise ValueError(f"Unsupported input_data type: {type(input_data)}")
+
+
+def load_dc_docs(file_path: str) -> List[Tuple[str, Optional[int], dict]]:
+    """
+    Read a dense caption JSONL file, one VLM chunk response per line.
+
+    Returns the (doc, doc_i, doc_meta) of every chunk, in file order, as passed
+    to add_doc. Lines that are not valid JSON are skipped.
+    """
+    docs = []
+    with open(file_path, "r") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.info(f"Skipping invalid JSON line: {line[:100]}... Error: {e}")
+                continue
+            chunk = data.get("chunk", {})
+            doc_meta = {
+                "streamId": chunk.get("streamId", ""),
+                "chunkIdx": chunk.get("chunkIdx", None),
+                "file": chunk.get("file", ""),
+                "pts_offset_ns": 0,
+                "start_pts": chunk.get("start_pts", None),
+                "end_pts": chunk.get("end_pts", None),
+                "start_ntp": chunk.get("start_ntp", ""),
+                "end_ntp": chunk.get("end_ntp", ""),
+                "start_ntp_float": chunk.get("start_ntp_float", None),
+                "end_ntp_float": chunk.get("end_ntp_float", None),
+                "is_first": chunk.get("is_first", False),
+                "is_last": chunk.get("is_last", False),
+                "uuid": "",
+                "cv_meta": "[]",
+            }
+            docs.append(
+                (data.get("vlm_response", ""), doc_meta["chunkIdx"], doc_meta)
+            )
+    return docs
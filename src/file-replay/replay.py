@@ -25,14 +25,38 @@ import librosa
 import argparse
 import struct
 import socket
+import urllib.error
+import urllib.request
 
-import cupy as cp
-import cupyx.scipy.signal as cusignal
+import numpy as np
+import scipy.signal
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 logger.addHandler(logging.StreamHandler())
 
+# Array and signal modules, CuPy on GPU or NumPy/SciPy on CPU (see `select_backend`)
+xp = np
+xsignal = scipy.signal
+
+def select_backend(name="auto"):
+    """ Use CuPy if requested or available, NumPy/SciPy otherwise
+    """
+    global xp, xsignal
+    if name in ("auto", "cupy"):
+        try:
+            import cupy as cp
+            import cupyx.scipy.signal as cusignal
+            cp.cuda.runtime.getDeviceCount()
+            xp, xsignal = cp, cusignal
+        except Exception as e:
+            if name == "cupy":
+                raise
+            logger.info(f"CuPy unavailable ({e}), modulating on CPU")
+    elif name != "numpy":
+        raise ValueError(f"Unknown backend {name}")
+    logger.info(f"Using {xp.__name__} backend")
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Replay audio file(s) as FM-modulated, baseband I/Q radio data via UDP"
@@ -77,15 +101,28 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--init-time",
         type=float,
-        default=30,
+        default=0,
         help="Sleep time prior to starting, allows other containers to spin up."
     )
+    parser.add_argument(
+        "--sdr-ready-url",
+        type=str,
+        default=os.environ.get("SDR_READY_URL", ""),
+        help="SDR readiness probe (its telemetry /ready endpoint) polled before replaying"
+    )
     parser.add_argument(
         "--total-time",
         type=float,
         default=0,
         help="Total runtime. If non-zero, loops until time is hit if .wav file is shorter."
     )
+    parser.add_argument(
+        "--backend",
+        type=str,
+        default=os.environ.get("REPLAY_BACKEND", "auto"),
+        choices=["auto", "cupy", "numpy"],
+        help="Array backend for FM modulation (default: cupy if a GPU is available)"
+    )
     parser.add_argument(
         "--max-file-size",
         type=float,
@@ -100,20 +137,45 @@ def parse_args() -> argparse.Namespace:
 
     return args
 
-def wait_for_dst(dst_ip, dst_port, wait_time=5, timeout=300):
+def backoff_delays(initial_sec=0.1, max_sec=5.0, factor=2.0):
+    """ Exponentially growing retry delays, capped at `max_sec`
+    """
+    delay = initial_sec
+    while True:
+        yield delay
+        delay = min(delay * factor, max_sec)
+
+def wait_for_ready(url, timeout=300):
+    """ Poll the SDR readiness probe until it answers 200
+    """
+    start_time = time.monotonic()
+    for wait_time in backoff_delays():
+        try:
+            with urllib.request.urlopen(url, timeout=5):
+                logger.info(f"SDR ready after {time.monotonic() - start_time:.1f}s")
+                return
+        except (urllib.error.URLError, OSError):
+            pass
+        if time.monotonic() - start_time > timeout:
+            logger.error(f"{url} not ready after {timeout}s, replaying anyway")
+            return
+        time.sleep(wait_time)
+
+def wait_for_dst(dst_ip, dst_port, timeout=300):
     """ Try to connect until successful
     """
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     sock.connect((dst_ip, dst_port))
     start_time = time.time()
-    curr_time = start_time
-    while curr_time - start_time < timeout:
+    for wait_time in backoff_delays():
+        if time.time() - start_time >= timeout:
+            break
         try:
             sock.sendto(struct.pack('Q', 0), (dst_ip, dst_port))
             logger.info(f"{dst_ip}:{dst_port} open, replaying")
             return
         except ConnectionRefusedError:
-            logger.info(f"Waiting {wait_time}s for {dst_ip}:{dst_port} to open")
+            logger.info(f"Waiting {wait_time:.1f}s for {dst_ip}:{dst_port} to open")
             time.sleep(wait_time)
     logger.error(f"{dst_ip}:{dst_port} never opened")
 
@@ -121,20 +183,20 @@ def fm_modulate(audio, fs_in, fs_out, deviation=100000, freq_shift=0):
     """ Given audio samples in floating point, FM modulate and frequency shift"""
     # Resample
     nsamples = int(audio.shape[0] * fs_out / fs_in)
-    chunk = cusignal.resample(audio, nsamples)
+    chunk = xsignal.resample(audio, nsamples)
 
     # Integrate and frequency modulate
-    integrated_audio = cp.cumsum(chunk) / fs_out
-    phase_deviation = 2 * cp.pi * deviation * integrated_audio
-    fm_samples = cp.cos(phase_deviation) + 1j*cp.sin(phase_deviation)
+    integrated_audio = xp.cumsum(chunk) / fs_out
+    phase_deviation = 2 * xp.pi * deviation * integrated_audio
+    fm_samples = xp.cos(phase_deviation) + 1j*xp.sin(phase_deviation)
 
     # Apply frequency shift if specified
     if freq_shift != 0:
-        t = cp.arange(len(fm_samples)) / fs_out
-        freq_shift_samples = cp.exp(1j * 2 * cp.pi * freq_shift * t)
+        t = xp.arange(len(fm_samples)) / fs_out
+        freq_shift_samples = xp.exp(1j * 2 * xp.pi * freq_shift * t)
         fm_samples = fm_samples * freq_shift_samples
 
-    return fm_samples.astype(cp.complex64)
+    return fm_samples.astype(xp.complex64)
 
 def send_packet(sock, data, dst_ip, dst_port):
     try:
@@ -297,7 +359,7 @@ def replay_multiple(file_names, fs_out, dst_ip, dst_port, pkt_size, freq_separat
 
                 if len(audio_chunk) > 0:
                     # FM modulate this chunk with frequency shift
-                    samples = fm_modulate(cp.array(audio_chunk), info['fs_in'], fs_out, freq_shift=freq_offsets[i])
+                    samples = fm_modulate(xp.asarray(audio_chunk), info['fs_in'], fs_out, freq_shift=freq_offsets[i])
                     modulated_chunks.append(samples)
 
                     if len(samples) > max_samples_out:
@@ -314,12 +376,12 @@ def replay_multiple(file_names, fs_out, dst_ip, dst_port, pkt_size, freq_separat
             break
 
         # Combine all modulated chunks
-        combined_signal = cp.zeros(max_samples_out, dtype=cp.complex64)
+        combined_signal = xp.zeros(max_samples_out, dtype=xp.complex64)
         for chunk in modulated_chunks:
             if chunk is not None:
                 if len(chunk) < max_samples_out:
                     # Zero pad shorter chunks
-                    padded_chunk = cp.zeros(max_samples_out, dtype=cp.complex64)
+                    padded_chunk = xp.zeros(max_samples_out, dtype=xp.complex64)
                     padded_chunk[:len(chunk)] = chunk
                     combined_signal += padded_chunk
                 else:
@@ -367,9 +429,15 @@ if __name__ == "__main__":
         logger.info("No files provided, exiting")
         exit()
 
+    select_backend(args.backend)
+
     # Wait for other apps
-    logger.info(f"Sleeping {args.init_time}s to allow time for SDR to spin up")
-    time.sleep(args.init_time)
+    if args.init_time > 0:
+        logger.info(f"Sleeping {args.init_time}s to allow time for SDR to spin up")
+        time.sleep(args.init_time)
+    if args.sdr_ready_url:
+        logger.info(f"Waiting for the SDR at {args.sdr_ready_url}")
+        wait_for_ready(args.sdr_ready_url)
     wait_for_dst(args.dst_ip, args.dst_port)
 
     # Use multi-file replay for both single and multiple files
@@ -0,0 +1,172 @@
+######################################################################################################
+# SPDX-FileCopyrightText: Copyright (c) 2024-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: LicenseRef-NvidiaProprietary
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+######################################################################################################
+
+"""
+Stand-in for the Riva ASR streaming gRPC service
+Transcribes PCM audio into deterministic text at a fixed number of words per second of
+audio, with partial results and a final result per utterance. Every transcript ends with
+a marker word carrying its emission time, so later stages can measure their lag.
+Per-stream audio throughput is written to a JSON stats file every second.
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+
+from concurrent import futures
+
+import grpc
+import riva.client.proto.riva_asr_pb2 as rasr
+import riva.client.proto.riva_asr_pb2_grpc as rasr_srv
+
+from stand_ins import marker
+
+VOCABULARY = (
+    "alpha bravo charlie delta echo foxtrot golf hotel india juliet kilo lima mike "
+    "november oscar papa quebec romeo sierra tango uniform victor whiskey xray yankee "
+    "zulu unit engine ladder medic dispatch copy roger affirmative negative standby "
+    "north south east west street avenue bridge station tower harbor airport highway "
+    "traffic weather wind rain clear heavy light report status arrival departure "
+    "vehicle truck patrol team sector zone checkpoint perimeter incident cleared "
+    "responding enroute onscene available returning hold proceed caution advise"
+).split()
+
+
+class StreamStats:
+    def __init__(self, stream_id):
+        self.stream_id = stream_id
+        self.opened = time.time()
+        self.first_audio = None
+        self.last_audio = None
+        self.audio_sec = 0.0
+        self.partials = 0
+        self.finals = 0
+        self.words = 0
+        self.closed = None
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+class FakeRivaASR(rasr_srv.RivaSpeechRecognitionServicer):
+    def __init__(self, words_per_sec, utterance_sec, partial_sec, seed=0):
+        self.words_per_sec = words_per_sec
+        self.utterance_sec = utterance_sec
+        self.partial_sec = partial_sec
+        self.seed = seed
+        self.streams = []
+        self._lock = threading.Lock()
+
+    def _open_stream(self):
+        with self._lock:
+            stream = StreamStats(len(self.streams))
+            self.streams.append(stream)
+        return stream
+
+    @staticmethod
+    def _response(words, is_final, audio_processed):
+        alternative = rasr.SpeechRecognitionAlternative(
+            transcript=" ".join(words + [marker()]), confidence=1.0
+        )
+        result = rasr.StreamingRecognitionResult(
+            alternatives=[alternative],
+            is_final=is_final,
+            stability=1.0 if is_final else 0.5,
+            channel_tag=1,
+            audio_processed=audio_processed,
+        )
+        return rasr.StreamingRecognizeResponse(results=[result])
+
+    def StreamingRecognize(self, request_iterator, context):
+        stream = self._open_stream()
+        rng = random.Random(self.seed * 100003 + stream.stream_id)
+        sample_rate = 16000
+        utterance_start = 0.0
+        next_partial = self.partial_sec
+        words = []
+        try:
+            for request in request_iterator:
+                if request.HasField("streaming_config"):
+                    sample_rate = request.streaming_config.config.sample_rate_hertz or sample_rate
+                    continue
+                now = time.time()
+                stream.first_audio = stream.first_audio or now
+                stream.last_audio = now
+                stream.audio_sec += len(request.audio_content) / 2 / sample_rate
+
+                # Words "spoken" so far in the current utterance
+                spoken = int((stream.audio_sec - utterance_start) * self.words_per_sec)
+                while len(words) < spoken:
+                    words.append(rng.choice(VOCABULARY))
+
+                if stream.audio_sec - utterance_start >= self.utterance_sec:
+                    stream.finals += 1
+                    stream.words += len(words)
+                    yield self._response(words, True, stream.audio_sec)
+                    words = []
+                    utterance_start = stream.audio_sec
+                    next_partial = utterance_start + self.partial_sec
+                elif words and stream.audio_sec >= next_partial:
+                    stream.partials += 1
+                    yield self._response(words, False, stream.audio_sec)
+                    next_partial = stream.audio_sec + self.partial_sec
+        finally:
+            stream.closed = time.time()
+
+    def stats(self):
+        with self._lock:
+            return {"time": time.time(), "streams": [s.as_dict() for s in self.streams]}
+
+
+def write_stats(asr, path, period=1.0):
+    """Atomically rewrite the stats file every `period` seconds"""
+    while True:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(asr.stats(), f)
+        os.replace(tmp_path, path)
+        time.sleep(period)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Stand-in Riva ASR streaming service")
+    parser.add_argument("--port", type=int, default=50051)
+    parser.add_argument(
+        "--words-per-sec", type=float, default=2.5,
+        help="Words transcribed per second of audio, sets the document rate of the SDR"
+    )
+    parser.add_argument(
+        "--utterance-sec", type=float, default=4.0,
+        help="Seconds of audio per final transcript"
+    )
+    parser.add_argument(
+        "--partial-sec", type=float, default=0.5,
+        help="Seconds of audio between partial transcripts"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stats-file", type=str, default="fake_riva_stats.json")
+    parser.add_argument("--workers", type=int, default=64)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    asr = FakeRivaASR(args.words_per_sec, args.utterance_sec, args.partial_sec, args.seed)
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=args.workers))
+    rasr_srv.add_RivaSpeechRecognitionServicer_to_server(asr, server)
+    server.add_insecure_port(f"0.0.0.0:{args.port}")
+    server.start()
+    threading.Thread(target=write_stats, args=(asr, args.stats_file), daemon=True).start()
+    print(f"Fake Riva ASR listening on port {args.port}", flush=True)
+    server.wait_for_termination()
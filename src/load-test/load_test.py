@@ -0,0 +1,582 @@
+######################################################################################################
+# SPDX-FileCopyrightText: Copyright (c) 2024-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: LicenseRef-NvidiaProprietary
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+######################################################################################################
+
+"""
+End-to-end load test of the radio pipeline on a single machine
+
+    file-replay -> SDR app -> fake Riva ASR -> context-aware RAG ingestion service
+
+The RAG service runs for real, with an in-memory vector DB and stand-ins for the LLM,
+embedding and reranker NIMs. The frontend is a stand-in too. For every step of a ramp
+of channel counts and transcript rates, all processes are started afresh, run for a
+warm-up period, then measured for a fixed window. Throughput, lag and latency
+percentiles are reported for each stage, with the stages that saturated.
+"""
+import argparse
+import array
+import copy
+import json
+import logging
+import math
+import os
+import re
+import signal
+import string
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+import wave
+
+import yaml
+
+import stand_ins
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+SDR_DIR = os.path.join(ROOT, "src", "software-defined-radio")
+REPLAY_DIR = os.path.join(ROOT, "src", "file-replay")
+RAG_DIR = os.path.join(ROOT, "external", "context-aware-rag")
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Ports relative to --port-base
+RIVA_PORT, LLM_PORT, FRONTEND_PORT, PROXY_PORT, RAG_PORT, TELEMETRY_PORT, UDP_PORT = range(7)
+
+AUDIO_RATE = 16000
+
+# Saturation thresholds
+MAX_UTILIZATION = 0.9
+MIN_REALTIME_FACTOR = 0.95
+MAX_PCM_QUEUE_DEPTH = 10
+MAX_ADD_DOC_P99_SEC = 1.0
+
+logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s: %(message)s")
+logger = logging.getLogger("load_test")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Ramp channels and transcript rates through the radio pipeline and "
+                    "report the throughput, lag and latency of every stage"
+    )
+    parser.add_argument("--channels", type=int, nargs="+", default=[1, 3, 5],
+                        help="Channel counts to ramp through, must be odd")
+    parser.add_argument("--words-per-sec", type=float, nargs="+", default=[2.5],
+                        help="Transcript rates per channel to ramp through")
+    parser.add_argument("--duration", type=float, default=120,
+                        help="Measurement window of each step in seconds")
+    parser.add_argument("--warmup", type=float, default=30,
+                        help="Seconds of streaming before the measurement window")
+    parser.add_argument("--utterance-sec", type=float, default=4.0,
+                        help="Seconds of audio per final transcript")
+    parser.add_argument("--min-db-export-chars", type=int, default=None,
+                        help="Override 'riva.min_db_export_chars' of the SDR parameters")
+    parser.add_argument("--llm-latency-ms", type=float, default=200,
+                        help="Time to first token of the LLM stand-in")
+    parser.add_argument("--llm-tokens-per-sec", type=float, default=0,
+                        help="Generation rate of the LLM stand-in, 0 for instantaneous")
+    parser.add_argument("--sdr-backend", type=str, default=None,
+                        choices=["auto", "cupy", "numpy"],
+                        help="Array backend of the SDR and the replay")
+    parser.add_argument("--sdr-python", default=sys.executable,
+                        help="Interpreter with the SDR dependencies (also runs the fake Riva)")
+    parser.add_argument("--replay-python", default=sys.executable,
+                        help="Interpreter with the file-replay dependencies")
+    parser.add_argument("--rag-python", default=sys.executable,
+                        help="Interpreter with the context-aware RAG dependencies")
+    parser.add_argument("--port-base", type=int, default=18000,
+                        help=f"First of the {UDP_PORT + 1} consecutive ports used by the test")
+    parser.add_argument("--log-dir", type=str, default=None,
+                        help="Directory of the process logs (default: a temporary directory)")
+    parser.add_argument("--output", type=str, default="load_test_results.json")
+    args = parser.parse_args()
+    if any(n % 2 == 0 for n in args.channels):
+        # The replay always puts a channel at 0 Hz, the channelizer only does so
+        # for odd channel counts
+        parser.error("--channels must be odd for the replay and channelizer to line up")
+    return args
+
+
+def write_tones(directory, num_channels, seconds):
+    """One WAV file of a distinct tone per channel, returns the file names"""
+    os.makedirs(directory, exist_ok=True)
+    names = []
+    for channel in range(num_channels):
+        frequency = 300 + 150 * channel
+        # One second holds a whole number of periods, so it can be repeated
+        second = array.array("h", (
+            int(16000 * math.sin(2 * math.pi * frequency * n / AUDIO_RATE))
+            for n in range(AUDIO_RATE)
+        ))
+        name = f"tone_ch{channel}.wav"
+        with wave.open(os.path.join(directory, name), "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(AUDIO_RATE)
+            data = second.tobytes()
+            for _ in range(int(math.ceil(seconds))):
+                f.writeframes(data)
+        names.append(name)
+    return names
+
+
+def fetch(url, timeout=5):
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return response.read().decode()
+
+
+def wait_for_http(url, timeout, process=None):
+    start = time.time()
+    while time.time() - start < timeout:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Process exited with {process.returncode} before {url} was up")
+        try:
+            fetch(url)
+            return
+        except OSError:
+            time.sleep(0.5)
+    raise TimeoutError(f"{url} not up after {timeout}s")
+
+
+def parse_prometheus(text):
+    """{(name, ((label, value), ...)): value} of a Prometheus text exposition"""
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        match = re.match(r"([A-Za-z_:][\w:]*)(?:\{(.*)\})?\s+(\S+)", line)
+        if not match:
+            continue
+        name, labels, value = match.groups()
+        pairs = tuple(sorted(re.findall(r'(\w+)="([^"]*)"', labels or "")))
+        samples[(name, pairs)] = float(value)
+    return samples
+
+
+def counter_delta(before, after, name, **labels):
+    total = 0.0
+    for (metric, pairs), value in after.items():
+        if metric == name and set(labels.items()) <= set(pairs):
+            total += value - before.get((metric, pairs), 0.0)
+    return total
+
+
+def histogram_window(before, after, name):
+    """Quantiles of a histogram over the window between two scrapes, per label set"""
+    buckets = {}
+    for (metric, pairs), value in after.items():
+        if metric != f"{name}_bucket":
+            continue
+        labels = tuple(p for p in pairs if p[0] != "le")
+        le = dict(pairs)["le"]
+        bound = math.inf if le == "+Inf" else float(le)
+        buckets.setdefault(labels, []).append(
+            (bound, value - before.get((metric, pairs), 0.0))
+        )
+    result = {}
+    for labels, cumulative in buckets.items():
+        cumulative.sort()
+        count = cumulative[-1][1]
+        if count <= 0:
+            continue
+        sum_key = (f"{name}_sum", labels)
+        total = after.get(sum_key, 0.0) - before.get(sum_key, 0.0)
+        result[labels] = {
+            "count": count,
+            "mean": total / count,
+            "p50": _bucket_quantile(cumulative, 0.50),
+            "p99": _bucket_quantile(cumulative, 0.99),
+        }
+    return result
+
+
+def _bucket_quantile(cumulative, q):
+    rank = q * cumulative[-1][1]
+    lower_bound, lower_count = 0.0, 0.0
+    for bound, count in cumulative:
+        if count >= rank:
+            if math.isinf(bound):
+                return lower_bound
+            if count == lower_count:
+                return bound
+            return lower_bound + (bound - lower_bound) * (rank - lower_count) / (count - lower_count)
+        lower_bound, lower_count = bound, count
+    return lower_bound
+
+
+class Processes:
+    """Child processes of a step, each in its own session so that its children stop too"""
+    def __init__(self, log_dir):
+        self.log_dir = log_dir
+        self.running = []
+
+    def start(self, name, command, cwd, env=None):
+        log = open(os.path.join(self.log_dir, f"{name}.log"), "w")
+        process = subprocess.Popen(
+            command, cwd=cwd, env={**os.environ, **(env or {})},
+            stdout=log, stderr=subprocess.STDOUT, start_new_session=True
+        )
+        logger.info(f"Started {name} (pid {process.pid})")
+        self.running.append((name, process, log))
+        return process
+
+    def stop(self):
+        for name, process, log in reversed(self.running):
+            if process.poll() is None:
+                os.killpg(process.pid, signal.SIGTERM)
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    logger.warning(f"Killing {name}")
+                    os.killpg(process.pid, signal.SIGKILL)
+                    process.wait()
+            log.close()
+        self.running = []
+
+    def check(self):
+        for name, process, _ in self.running:
+            if process.poll() is not None:
+                raise RuntimeError(
+                    f"{name} exited with {process.returncode}, see {self.log_dir}/{name}.log"
+                )
+
+
+class Step:
+    def __init__(self, args, channels, words_per_sec, log_dir):
+        self.args = args
+        self.channels = channels
+        self.words_per_sec = words_per_sec
+        self.log_dir = log_dir
+        self.ports = {i: args.port_base + i for i in range(UDP_PORT + 1)}
+        with open(os.path.join(SDR_DIR, "params.yaml")) as f:
+            self.sdr_params = yaml.safe_load(f)
+        # Lowest sample rate that passes the bandwidth check of the replay, which
+        # needs half a channel spacing of margin on either side of the band
+        self.channel_spacing = self.sdr_params["channelizer"]["channel_spacing"]
+        self.sample_rate = max(
+            self.sdr_params["sensor"]["sample_rate"], 2 * self.channel_spacing * channels
+        )
+        self.tracker = stand_ins.Tracker()
+        self.processes = Processes(log_dir)
+        self.servers = []
+        self.riva_stats_file = os.path.join(log_dir, "fake_riva_stats.json")
+
+    def _write_rag_config(self):
+        with open(os.path.join(HERE, "rag_config.yaml")) as f:
+            template = string.Template(f.read())
+        path = os.path.join(self.log_dir, "rag_config.yaml")
+        with open(path, "w") as f:
+            f.write(template.substitute(llm_url=f"http://127.0.0.1:{self.ports[LLM_PORT]}/v1"))
+        return path
+
+    def _write_sdr_params(self):
+        params = copy.deepcopy(self.sdr_params)
+        params["sensor"]["sample_rate"] = self.sample_rate
+        params["network_rx"]["dst_port"] = self.ports[UDP_PORT]
+        params["channelizer"]["num_channels"] = self.channels
+        params["telemetry"].update(enabled=True, port=self.ports[TELEMETRY_PORT])
+        if self.args.sdr_backend:
+            params["backend"]["name"] = self.args.sdr_backend
+        if self.args.min_db_export_chars is not None:
+            params["riva"]["min_db_export_chars"] = self.args.min_db_export_chars
+        path = os.path.join(self.log_dir, "sdr_params.yaml")
+        with open(path, "w") as f:
+            yaml.safe_dump(params, f)
+        return path
+
+    def start(self):
+        args = self.args
+        ports = self.ports
+
+        # Stand-ins in this process
+        self.servers = [
+            stand_ins.serve(
+                stand_ins.LLMHandler, ports[LLM_PORT], self.tracker,
+                llm_latency_sec=args.llm_latency_ms / 1000,
+                llm_tokens_per_sec=args.llm_tokens_per_sec,
+                models=["load-test/llm", "nvidia/llama-3.2-nv-embedqa-1b-v2",
+                        "nvidia/llama-3.2-nv-rerankqa-1b-v2"],
+            ),
+            stand_ins.serve(stand_ins.FrontendHandler, ports[FRONTEND_PORT], self.tracker),
+            stand_ins.serve(
+                stand_ins.IngestProxyHandler, ports[PROXY_PORT], self.tracker,
+                target=f"http://127.0.0.1:{ports[RAG_PORT]}", timeout=60,
+            ),
+        ]
+
+        self.processes.start("fake_riva", [
+            args.sdr_python, os.path.join(HERE, "fake_riva.py"),
+            "--port", str(ports[RIVA_PORT]),
+            "--words-per-sec", str(self.words_per_sec),
+            "--utterance-sec", str(args.utterance_sec),
+            "--stats-file", self.riva_stats_file,
+        ], cwd=HERE)
+
+        rag = self.processes.start("rag", [
+            args.rag_python, "-m", "uvicorn", "service.service:app",
+            "--host", "127.0.0.1", "--port", str(ports[RAG_PORT]),
+        ], cwd=RAG_DIR, env={
+            "PYTHONPATH": os.pathsep.join(
+                p for p in (os.path.join(RAG_DIR, "src"), os.environ.get("PYTHONPATH")) if p
+            ),
+            "CA_RAG_CONFIG": self._write_rag_config(),
+            "CHAT_FRONTEND_ENDPOINT": f"http://127.0.0.1:{ports[FRONTEND_PORT]}",
+            "MILVUS_HOST": "unused",
+            "MILVUS_PORT": "0",
+            "NVIDIA_API_KEY": os.environ.get("NVIDIA_API_KEY", "load-test"),
+            "VIA_CTX_RAG_ENABLE_RET": "false",
+        })
+        wait_for_http(f"http://127.0.0.1:{ports[RAG_PORT]}/health", 120, rag)
+
+        sdr_env = {
+            "SDR_PARAM_FILE": self._write_sdr_params(),
+            "ASR_URI": f"127.0.0.1:{ports[RIVA_PORT]}",
+            "FRONTEND_URI": f"127.0.0.1:{ports[FRONTEND_PORT]}",
+            "DATABASE_URI": f"127.0.0.1:{ports[PROXY_PORT]}",
+        }
+        if args.sdr_backend:
+            sdr_env["SDR_BACKEND"] = args.sdr_backend
+        sdr = self.processes.start(
+            "sdr", [args.sdr_python, os.path.join(SDR_DIR, "app.py")], cwd=SDR_DIR, env=sdr_env
+        )
+        wait_for_http(f"http://127.0.0.1:{ports[TELEMETRY_PORT]}/metrics", 120, sdr)
+        start = time.time()
+        while self.tracker.since("init") is None:
+            self.processes.check()
+            if time.time() - start > 120:
+                raise TimeoutError("The SDR did not initialize the RAG service")
+            time.sleep(0.5)
+
+        files_dir = os.path.join(self.log_dir, "files")
+        stream_sec = args.warmup + args.duration + 10
+        names = write_tones(files_dir, self.channels, stream_sec)
+        replay_env = {"REPLAY_BACKEND": args.sdr_backend} if args.sdr_backend else {}
+        self.processes.start("replay", [
+            args.replay_python, os.path.join(REPLAY_DIR, "replay.py"),
+            "--file-names", ",".join(names),
+            "--dst-ip", "127.0.0.1",
+            "--dst-port", str(ports[UDP_PORT]),
+            "--sample-rate", str(self.sample_rate),
+            "--freq-separation", str(self.channel_spacing),
+            "--init-time", "0",
+            "--total-time", str(stream_sec),
+        ], cwd=self.log_dir, env=replay_env)
+
+    def scrape(self):
+        ports = self.ports
+        sdr = parse_prometheus(fetch(f"http://127.0.0.1:{ports[TELEMETRY_PORT]}/metrics"))
+        rag = parse_prometheus(fetch(f"http://127.0.0.1:{ports[RAG_PORT]}/metrics"))
+        try:
+            with open(self.riva_stats_file) as f:
+                riva = json.load(f)
+        except (OSError, ValueError):
+            riva = {"time": time.time(), "streams": []}
+        return {"time": time.time(), "sdr": sdr, "rag": rag, "riva": riva}
+
+    def stop(self):
+        self.processes.stop()
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        self.servers = []
+
+    def run(self):
+        try:
+            self.start()
+            logger.info(f"Warming up for {self.args.warmup:g}s")
+            self._sleep(self.args.warmup)
+            before = self.scrape()
+            self.tracker.reset()
+            logger.info(f"Measuring for {self.args.duration:g}s")
+            self._sleep(self.args.duration)
+            after = self.scrape()
+            stand_in_stats = self.tracker.summary()
+            return self.report(before, after, stand_in_stats)
+        finally:
+            self.stop()
+
+    def _sleep(self, seconds):
+        end = time.time() + seconds
+        while time.time() < end:
+            self.processes.check()
+            time.sleep(min(1.0, max(0.0, end - time.time())))
+
+    def report(self, before, after, stand_in_stats):
+        window = after["time"] - before["time"]
+        sdr_before, sdr_after = before["sdr"], after["sdr"]
+
+        # SDR stages, over the window
+        latencies = histogram_window(sdr_before, sdr_after, "sdr_operator_compute_seconds")
+        stages = []
+        for labels, stats in latencies.items():
+            label_dict = dict(labels)
+            key = tuple(sorted(label_dict.items()))
+            stages.append({
+                **label_dict,
+                "calls": stats["count"],
+                "p50_ms": 1e3 * stats["p50"],
+                "p99_ms": 1e3 * stats["p99"],
+                "samples_per_second": counter_delta(
+                    sdr_before, sdr_after, "sdr_operator_samples_total", **label_dict
+                ) / window,
+                "utilization": sdr_after.get(("sdr_operator_utilization", key)),
+            })
+        stages.sort(key=lambda s: s["utilization"] or 0.0, reverse=True)
+        transcripts = histogram_window(sdr_before, sdr_after, "sdr_air_to_transcript_seconds")
+        sdr_channels = {}
+        for (name, pairs), value in sdr_after.items():
+            if name == "sdr_pcm_queue_depth":
+                sdr_channels.setdefault(dict(pairs)["channel"], {})["pcm_queue_depth"] = value
+        for labels, stats in transcripts.items():
+            sdr_channels.setdefault(dict(labels)["channel"], {}).update({
+                "air_to_transcript_p50_sec": stats["p50"],
+                "air_to_transcript_p99_sec": stats["p99"],
+            })
+
+        # ASR, from the audio each stream received over the window
+        streams_before = {s["stream_id"]: s for s in before["riva"]["streams"]}
+        asr_streams = []
+        for stream in after["riva"]["streams"]:
+            if stream["closed"] is not None and stream["closed"] < before["time"]:
+                continue
+            previous = streams_before.get(stream["stream_id"], {})
+            audio = stream["audio_sec"] - previous.get("audio_sec", 0.0)
+            asr_streams.append({
+                "stream": stream["stream_id"],
+                "realtime_factor": audio / window,
+                "finals": stream["finals"] - previous.get("finals", 0),
+                "words": stream["words"] - previous.get("words", 0),
+            })
+
+        # RAG ingestion stages, over the window
+        rag_stages = {
+            dict(labels).get("stage", ""): {k: stats[k] for k in ("count", "mean", "p50", "p99")}
+            for labels, stats in histogram_window(
+                before["rag"], after["rag"], "ca_rag_stage_duration_seconds"
+            ).items()
+        }
+
+        latencies = stand_in_stats["latencies"]
+        rates = stand_in_stats["rates"]
+        result = {
+            "channels": self.channels,
+            "words_per_sec": self.words_per_sec,
+            "sample_rate": self.sample_rate,
+            "window_sec": window,
+            "network_rx_mb_per_sec":
+                counter_delta(sdr_before, sdr_after, "sdr_network_rx_bytes_total") / window / 1e6,
+            "sdr_stages": stages,
+            "sdr_channels": sdr_channels,
+            "asr": {
+                "streams": asr_streams,
+                "min_realtime_factor": min(
+                    (s["realtime_factor"] for s in asr_streams), default=None
+                ),
+                "finals_per_sec": sum(s["finals"] for s in asr_streams) / window,
+                "asr_to_frontend_sec": latencies.get("asr_to_frontend_sec"),
+            },
+            "ingest": {
+                "add_doc_per_sec": rates.get("add_doc", 0.0),
+                "add_doc_errors": stand_in_stats["counts"].get("add_doc_errors", 0),
+                "add_doc_chars_per_sec": rates.get("add_doc_chars", 0.0),
+                "add_doc_sec": latencies.get("add_doc_sec"),
+                "transcript_to_add_doc_sec": latencies.get("transcript_to_add_doc_sec"),
+            },
+            "rag": {
+                "frontend_export_sec": latencies.get("rag_frontend_export_sec"),
+                "llm_requests_per_sec": rates.get("llm_requests", 0.0),
+                "embedded_texts_per_sec": rates.get("embedded_texts", 0.0),
+                "stages": rag_stages,
+            },
+        }
+        result["saturated"] = saturation(result)
+        return result
+
+
+def saturation(result):
+    """Reasons why a step is past the capacity of the pipeline"""
+    reasons = []
+    for stage in result["sdr_stages"]:
+        if (stage["utilization"] or 0.0) >= MAX_UTILIZATION:
+            reasons.append(
+                f"SDR {stage['operator']}[{stage['channel']}] utilization "
+                f"{stage['utilization']:.2f}"
+            )
+    for channel, stats in result["sdr_channels"].items():
+        if stats.get("pcm_queue_depth", 0) > MAX_PCM_QUEUE_DEPTH:
+            reasons.append(f"PCM queue of channel {channel} at {stats['pcm_queue_depth']:g}")
+    factor = result["asr"]["min_realtime_factor"]
+    if factor is None or factor < MIN_REALTIME_FACTOR:
+        reasons.append(f"ASR receives audio at {factor or 0:.2f}x real time")
+    if result["ingest"]["add_doc_errors"]:
+        reasons.append(f"{result['ingest']['add_doc_errors']:g} failed /add_doc requests")
+    add_doc = result["ingest"]["add_doc_sec"]
+    if add_doc and add_doc["p99"] > MAX_ADD_DOC_P99_SEC:
+        reasons.append(f"/add_doc p99 {add_doc['p99']:.2f}s")
+    return reasons
+
+
+def _fmt(value, spec=".2f"):
+    return "-" if value is None else format(value, spec)
+
+
+def print_summary(results):
+    header = (
+        f"{'ch':>3} {'w/s':>5} {'rx MB/s':>8} {'busiest SDR stage':>26} {'util':>5} "
+        f"{'ASR RTF':>7} {'air->tx p99':>11} {'docs/s':>7} {'add_doc p99':>11} "
+        f"{'export p99':>10}  saturated"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        if "error" in r:
+            print(f"{r['channels']:>3} {r['words_per_sec']:>5g}  failed: {r['error']}")
+            continue
+        busiest = r["sdr_stages"][0] if r["sdr_stages"] else {}
+        air = [c.get("air_to_transcript_p99_sec") for c in r["sdr_channels"].values()]
+        air = max((a for a in air if a is not None), default=None)
+        add_doc = r["ingest"]["add_doc_sec"] or {}
+        export = r["rag"]["frontend_export_sec"] or {}
+        stage = f"{busiest.get('operator', '-')}[{busiest.get('channel', '')}]"
+        print(
+            f"{r['channels']:>3} {r['words_per_sec']:>5g} {r['network_rx_mb_per_sec']:>8.2f} "
+            f"{stage:>26} {_fmt(busiest.get('utilization')):>5} "
+            f"{_fmt(r['asr']['min_realtime_factor']):>7} {_fmt(air):>11} "
+            f"{r['ingest']['add_doc_per_sec']:>7.2f} {_fmt(add_doc.get('p99'), '.3f'):>11} "
+            f"{_fmt(export.get('p99'), '.3f'):>10}  {'; '.join(r['saturated']) or 'no'}"
+        )
+
+
+def main():
+    args = parse_args()
+    log_root = args.log_dir or tempfile.mkdtemp(prefix="load-test-")
+    logger.info(f"Writing process logs to {log_root}")
+    results = []
+    for channels in args.channels:
+        for words_per_sec in args.words_per_sec:
+            logger.info(f"Step: {channels} channels, {words_per_sec:g} words/s per channel")
+            log_dir = os.path.join(log_root, f"ch{channels}_wps{words_per_sec:g}")
+            os.makedirs(log_dir, exist_ok=True)
+            try:
+                results.append(Step(args, channels, words_per_sec, log_dir).run())
+            except (RuntimeError, TimeoutError, OSError) as e:
+                logger.error(f"Step failed: {e}")
+                results.append({"channels": channels, "words_per_sec": words_per_sec,
+                                "error": str(e)})
+            with open(args.output, "w") as f:
+                json.dump({"args": vars(args), "results": results}, f, indent=2)
+    print_summary(results)
+    logger.info(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
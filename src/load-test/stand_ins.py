@@ -0,0 +1,358 @@
+######################################################################################################
+# SPDX-FileCopyrightText: Copyright (c) 2024-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: LicenseRef-NvidiaProprietary
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+######################################################################################################
+
+"""
+HTTP stand-ins of the load test
+- An OpenAI/NIM-compatible server for the chat LLM, embeddings and reranker of the RAG service
+- The chat frontend, which receives transcripts from the SDR and the RAG service
+- A proxy in front of the RAG ingestion service, which times /add_doc
+All of them record into a shared Tracker, read by load_test.py
+"""
+import json
+import math
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid as uuid_lib
+import zlib
+
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Wall-clock emission time, in ms, that fake_riva.py appends to every transcript
+MARKER_PATTERN = re.compile(r"\bt(\d{13})\b")
+EMBEDDING_DIM = 1024
+SUMMARY_WORDS = 40
+
+
+def marker(timestamp=None):
+    """Transcript word that carries its emission time"""
+    return f"t{int(1000 * (timestamp if timestamp is not None else time.time()))}"
+
+
+def marker_times(text):
+    return [int(ms) / 1000 for ms in MARKER_PATTERN.findall(text)]
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return None
+    return values[min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))]
+
+
+class LatencyStats:
+    def __init__(self):
+        self.values = []
+
+    def add(self, value):
+        self.values.append(value)
+
+    def summary(self, duration):
+        values = sorted(self.values)
+        return {
+            "count": len(values),
+            "per_second": len(values) / duration if duration else None,
+            "p50": percentile(values, 0.50),
+            "p90": percentile(values, 0.90),
+            "p99": percentile(values, 0.99),
+            "max": values[-1] if values else None,
+        }
+
+
+class Tracker:
+    """Counters and latencies of the stand-ins over a measurement window"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.events = {}
+        self.reset()
+
+    def reset(self):
+        """Start a new measurement window"""
+        with self._lock:
+            self.start = time.time()
+            self.counts = defaultdict(float)
+            self.latencies = defaultdict(LatencyStats)
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counts[name] += amount
+
+    def observe(self, name, value):
+        with self._lock:
+            self.latencies[name].add(value)
+
+    def mark(self, key, timestamp=None):
+        """Remember when an event happened, e.g. the arrival of a document"""
+        with self._lock:
+            self.events.setdefault(key, timestamp if timestamp is not None else time.time())
+
+    def since(self, key):
+        with self._lock:
+            start = self.events.get(key)
+        return time.time() - start if start is not None else None
+
+    def summary(self):
+        with self._lock:
+            duration = time.time() - self.start
+            return {
+                "duration_sec": duration,
+                "counts": dict(self.counts),
+                "rates": {name: value / duration for name, value in self.counts.items()},
+                "latencies": {
+                    name: stats.summary(duration) for name, stats in self.latencies.items()
+                },
+            }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def tracker(self):
+        return self.server.tracker
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _json(self):
+        body = self._body()
+        return json.loads(body) if body else {}
+
+    def _send(self, status, body, content_type="application/json"):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _words(text):
+    return re.findall(r"[A-Za-z0-9']+", text.lower())
+
+
+def embed(text, dim=EMBEDDING_DIM):
+    """Deterministic unit vector of hashed words, similar texts get similar vectors"""
+    vector = [0.0] * dim
+    for word in _words(text):
+        if MARKER_PATTERN.fullmatch(word):
+            continue
+        h = zlib.crc32(word.encode())
+        vector[h % dim] += 1.0 if (h >> 16) & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def _message_text(message):
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content
+
+
+class LLMHandler(_Handler):
+    """Chat completions, embeddings and reranking, with configurable generation time"""
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send(200, {
+                "object": "list",
+                "data": [{"id": model, "object": "model", "owned_by": "load-test"}
+                         for model in self.server.options["models"]],
+            })
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0].rstrip("/")
+        request = self._json()
+        if path.endswith("/chat/completions"):
+            self._chat(request)
+        elif path.endswith("/embeddings"):
+            self._embeddings(request)
+        elif path.endswith("/ranking") or path.endswith("/reranking"):
+            self._ranking(request)
+        else:
+            self._send(404, {"error": f"unknown endpoint {path}"})
+
+    def _chat(self, request):
+        messages = request.get("messages") or []
+        prompt = " ".join(_message_text(m) for m in messages)
+        user = [_message_text(m) for m in messages if m.get("role") == "user"]
+        words = (user[-1] if user else prompt).split()
+        content = "- " + " ".join(words[:SUMMARY_WORDS])
+        prompt_tokens = len(prompt.split())
+        completion_tokens = len(content.split())
+        self.tracker.count("llm_requests")
+        self.tracker.count("llm_prompt_tokens", prompt_tokens)
+        self.tracker.count("llm_completion_tokens", completion_tokens)
+
+        # Time to first token, then generation
+        options = self.server.options
+        delay = options["llm_latency_sec"]
+        if options["llm_tokens_per_sec"]:
+            delay += completion_tokens / options["llm_tokens_per_sec"]
+        time.sleep(delay)
+
+        completion_id = f"chatcmpl-{uuid_lib.uuid4().hex}"
+        created = int(time.time())
+        model = request.get("model", "load-test")
+        if not request.get("stream"):
+            self._send(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            })
+            return
+
+        def chunk(delta, finish_reason=None):
+            return "data: " + json.dumps({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }) + "\n\n"
+
+        events = [chunk({"role": "assistant", "content": ""})]
+        events += [chunk({"content": word + " "}) for word in content.split()]
+        events += [chunk({}, "stop"), "data: [DONE]\n\n"]
+        self._send(200, "".join(events).encode(), "text/event-stream")
+
+    def _embeddings(self, request):
+        texts = request.get("input") or []
+        if isinstance(texts, str):
+            texts = [texts]
+        self.tracker.count("embedding_requests")
+        self.tracker.count("embedded_texts", len(texts))
+        tokens = sum(len(text.split()) for text in texts)
+        self._send(200, {
+            "object": "list",
+            "model": request.get("model", "load-test"),
+            "data": [
+                {"object": "embedding", "index": i, "embedding": embed(text)}
+                for i, text in enumerate(texts)
+            ],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        })
+
+    def _ranking(self, request):
+        query = set(_words((request.get("query") or {}).get("text", "")))
+        passages = request.get("passages") or []
+        self.tracker.count("rerank_requests")
+        self.tracker.count("reranked_passages", len(passages))
+        rankings = [
+            {"index": i, "logit": float(len(query & set(_words(p.get("text", "")))))}
+            for i, p in enumerate(passages)
+        ]
+        rankings.sort(key=lambda r: r["logit"], reverse=True)
+        self._send(200, {"rankings": rankings})
+
+
+class FrontendHandler(_Handler):
+    """Transcript endpoint of the chat frontend"""
+    def do_POST(self):
+        if not self.path.startswith("/api/update-data-stream"):
+            self._send(404, {"error": "not found"})
+            return
+        now = time.time()
+        data = self._json()
+        if data.get("finalized"):
+            # Document exported by the RAG service after it was ingested
+            self.tracker.count("frontend_finals")
+            arrival = self.tracker.since(("add_doc", data.get("uuid")))
+            if arrival is not None:
+                self.tracker.observe("rag_frontend_export_sec", arrival)
+        else:
+            # Partial transcript streamed by the SDR
+            self.tracker.count("frontend_partials")
+            for emitted in marker_times(data.get("text", "")):
+                self.tracker.observe("asr_to_frontend_sec", now - emitted)
+        self._send(200, {"status": "success"})
+
+    def do_PATCH(self):
+        data = self._json()
+        uuids = data.get("uuids") or [data.get("uuid")]
+        self.tracker.count("frontend_status_updates", len(uuids))
+        self._send(200, {"status": "success"})
+
+
+class IngestProxyHandler(_Handler):
+    """Forward every request to the RAG service, timing /add_doc"""
+    def _forward(self, method):
+        body = self._body() if method in ("POST", "PATCH", "PUT") else None
+        path = self.path.split("?", 1)[0]
+        arrival = time.time()
+        if path == "/add_doc" and body:
+            doc = json.loads(body)
+            self.tracker.mark(("add_doc", doc.get("doc_metadata", {}).get("uuid")), arrival)
+            self.tracker.count("add_doc_chars", len(doc.get("document", "")))
+            for emitted in marker_times(doc.get("document", "")):
+                self.tracker.observe("transcript_to_add_doc_sec", arrival - emitted)
+
+        request = urllib.request.Request(
+            self.server.options["target"] + self.path, data=body, method=method
+        )
+        if self.headers.get("Content-Type"):
+            request.add_header("Content-Type", self.headers["Content-Type"])
+        content_type = "application/json"
+        try:
+            with urllib.request.urlopen(request, timeout=self.server.options["timeout"]) as r:
+                status, payload = r.status, r.read()
+                content_type = r.headers.get("Content-Type", content_type)
+        except urllib.error.HTTPError as e:
+            status, payload = e.code, e.read()
+        except (urllib.error.URLError, OSError) as e:
+            status, payload = 502, json.dumps({"detail": str(e)}).encode()
+
+        if path == "/add_doc":
+            self.tracker.count("add_doc")
+            self.tracker.observe("add_doc_sec", time.time() - arrival)
+            if status != 200:
+                self.tracker.count("add_doc_errors")
+        elif path == "/init" and status == 200:
+            self.tracker.mark("init")
+        self._send(status, payload, content_type)
+
+    def do_GET(self):
+        self._forward("GET")
+
+    def do_POST(self):
+        self._forward("POST")
+
+
+def serve(handler, port, tracker, host="127.0.0.1", **options):
+    """Serve a stand-in from a daemon thread"""
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.tracker = tracker
+    server.options = options
+    threading.Thread(target=server.serve_forever, name=handler.__name__, daemon=True).start()
+    return server
@@ -15,7 +15,9 @@ Entrypoint for running SDR Holoscan pipeline
 Ingests UDP packets with baseband I/Q data
 """
 import logging
+import time
 
+from concurrent.futures import ThreadPoolExecutor
 from holoscan.core import Application, MetadataPolicy
 from holoscan.schedulers import EventBasedScheduler
 from queue import Queue
@@ -25,11 +27,14 @@ from common import (
     FRONTEND_URI,
     DATABASE_URI,
     ASR_URI,
-    wait_for_uri,
+    wait_for_uris,
     setup_logging
 )
 from riva_asr import RivaThread
+import backend
 import operators as op
+import spectrum
+import telemetry
 
 class AsrStreamingApp(Application):
     def __init__(self):
@@ -122,10 +127,28 @@ class AsrStreamingApp(Application):
         for channel_idx in range(self.num_channels):
             self.pcm_buffers[channel_idx] = Queue()
 
-        # Wait for connections
-        wait_for_uri(ASR_URI)
-        wait_for_uri(FRONTEND_URI)
-        wait_for_uri(DATABASE_URI)
+        # Select the array backend of the operators
+        backend.configure(self.kwargs("backend"))
+
+        # Gate the per-channel decode chains on spectrum activity
+        spectrum.configure(self.kwargs("spectrum"), self.num_channels)
+
+        # Serve pipeline telemetry. /ready is served even when telemetry is
+        # disabled, file-replay waits for it
+        telemetry_params = self.kwargs("telemetry")
+        telemetry.configure(telemetry_params)
+        self.telemetry_server = telemetry.start_server(
+            telemetry_params["port"], metrics=telemetry_params.get("enabled", True)
+        )
+
+        # Wait for connections, probing all services while the kernels compile
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            services_ready = pool.submit(wait_for_uris, [ASR_URI, FRONTEND_URI, DATABASE_URI])
+            op.warmup_kernels(self)
+            telemetry.startup_seconds.set(time.monotonic() - start, "warmup")
+            services_ready.result()
+        telemetry.startup_seconds.set(time.monotonic() - start, "dependencies")
         self.logger.info("All required services are ready")
 
         # Start Riva threads for each channel
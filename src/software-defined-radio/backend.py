@@ -0,0 +1,126 @@
+######################################################################################################
+# SPDX-FileCopyrightText: Copyright (c) 2024-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: LicenseRef-NvidiaProprietary
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+######################################################################################################
+
+"""
+Array backend of the SDR pipeline
+CuPy on GPU nodes, NumPy/SciPy on CPU-only nodes, selected from the `backend` section
+of the parameter file or the SDR_BACKEND environment variable
+"""
+import os
+
+import numpy as np
+
+import dsp
+from common import setup_logging
+
+BACKEND_ENV = "SDR_BACKEND"
+BACKENDS = ("auto", "cupy", "numpy")
+KERNEL_CACHE_ENV = "CUPY_CACHE_DIR"
+
+logger = setup_logging(__name__)
+
+
+class Backend:
+    """Array namespace (`xp`) and signal namespace used by the operators"""
+    def __init__(self, name, xp):
+        self.name = name
+        self.xp = xp
+        self.signal = dsp.signal_module(xp)
+        self.on_device = xp is not np
+
+    def frombuffer(self, buffer, dtype):
+        """Array over a host buffer, copied to the device on GPU"""
+        return self.xp.frombuffer(buffer, dtype=dtype)
+
+    def asnumpy(self, x):
+        return dsp.to_numpy(x)
+
+    def synchronize(self):
+        if self.on_device:
+            self.xp.cuda.get_current_stream().synchronize()
+
+
+def _cupy_available():
+    try:
+        import cupy as cp
+        return cp.cuda.runtime.getDeviceCount() > 0
+    except Exception as e:
+        logger.info(f"CuPy backend unavailable: {e}")
+        return False
+
+
+def _configure_cpu(threads, fft):
+    """Multithreaded FFTs, optionally through pyFFTW"""
+    threads = int(threads) or os.cpu_count() or 1
+    dsp.set_fft_workers(threads)
+    if fft == "pyfftw":
+        try:
+            import pyfftw
+            import pyfftw.interfaces.scipy_fft
+            import scipy.fft
+            pyfftw.interfaces.cache.enable()
+            pyfftw.config.NUM_THREADS = threads
+            scipy.fft.set_global_backend(pyfftw.interfaces.scipy_fft)
+            logger.info("Using pyFFTW for FFTs")
+        except ImportError:
+            logger.warning("pyFFTW is not installed, using the SciPy FFT")
+    logger.info(f"Using {threads} FFT worker threads")
+
+
+def _configure_kernel_cache(cache_dir):
+    """Keep compiled CuPy kernels in `cache_dir`, so restarts skip their compilation
+
+    Relative paths are resolved from this directory. CUPY_CACHE_DIR takes precedence,
+    and an empty `cache_dir` leaves CuPy's default (~/.cupy/kernel_cache).
+    """
+    if not cache_dir or os.environ.get(KERNEL_CACHE_ENV):
+        return
+    if not os.path.isabs(cache_dir):
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    os.environ[KERNEL_CACHE_ENV] = cache_dir
+
+
+_backend = None
+
+
+def configure(params=None):
+    """Select the backend from the parameter file section, SDR_BACKEND overriding it"""
+    global _backend
+    params = params or {}
+    name = os.environ.get(BACKEND_ENV) or params.get("name", "auto")
+    name = name.lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown SDR backend '{name}', expected one of {BACKENDS}")
+
+    # The kernel cache directory must be set before CuPy is imported
+    if name != "numpy":
+        _configure_kernel_cache(params.get("kernel_cache_dir", ""))
+    if name == "auto":
+        name = "cupy" if _cupy_available() else "numpy"
+    if name == "cupy":
+        import cupy as cp
+        _backend = Backend("cupy", cp)
+        logger.info(f"CuPy kernel cache: {os.environ.get(KERNEL_CACHE_ENV, '~/.cupy/kernel_cache')}")
+    else:
+        _backend = Backend("numpy", np)
+        _configure_cpu(params.get("threads", 0), params.get("fft", "scipy"))
+
+    logger.info(f"Using {_backend.name} array backend")
+    return _backend
+
+
+def get_backend():
+    """Configured backend, auto-selected on first use if `configure` was not called"""
+    if _backend is None:
+        return configure()
+    return _backend
@@ -15,7 +15,9 @@ import time
 import socket
 import logging
 
-PARAM_FILE = os.path.join(os.path.dirname(__file__), 'params.yaml')
+from concurrent.futures import ThreadPoolExecutor
+
+PARAM_FILE = os.environ.get('SDR_PARAM_FILE', os.path.join(os.path.dirname(__file__), 'params.yaml'))
 FRONTEND_URI = os.environ.get('FRONTEND_URI', 'localhost:6001')
 DATABASE_URI = os.environ.get('DATABASE_URI', '0.0.0.0:8081')
 ASR_URI = os.environ.get('ASR_URI', '0.0.0.0:50051')
@@ -66,7 +68,15 @@ def setup_logging(name):
     logger.addHandler(console_handler)
     return logger
 
-def wait_for_uri(uri, timeout=300, wait_sec=5):
+def backoff_delays(initial_sec=0.1, max_sec=5.0, factor=2.0):
+    """Exponentially growing retry delays, capped at `max_sec`"""
+    delay = initial_sec
+    while True:
+        yield delay
+        delay = min(delay * factor, max_sec)
+
+def wait_for_uri(uri, timeout=300, initial_wait_sec=0.1, max_wait_sec=5):
+    """Block until a TCP connection to `uri` succeeds, retrying with exponential backoff"""
     try:
         host, port = uri.split(':')
         port = int(port)
@@ -74,11 +84,11 @@ def wait_for_uri(uri, timeout=300, wait_sec=5):
         logger.error(f"Invalid URI format. Expected format: 'host:port', got '{uri}'.")
         raise e
 
-    start_time = time.time()
-    while True:
-        elapsed_time = time.time() - start_time
+    start_time = time.monotonic()
+    for attempt, wait_sec in enumerate(backoff_delays(initial_wait_sec, max_wait_sec)):
+        elapsed_time = time.monotonic() - start_time
 
-        if elapsed_time > timeout:
+        if elapsed_time >= timeout:
             logger.error(
                 f"Timeout reached: {uri} is not open after {timeout} seconds."
                 f"Waited {elapsed_time} seconds"
@@ -86,10 +96,18 @@ def wait_for_uri(uri, timeout=300, wait_sec=5):
             raise TimeoutError
 
         try:
-            with socket.create_connection((host, port), timeout=timeout-elapsed_time):
-                logger.info(f"{uri} is now open!")
-                break
+            connect_timeout = min(timeout - elapsed_time, max_wait_sec)
+            with socket.create_connection((host, port), timeout=connect_timeout):
+                logger.info(f"{uri} is now open after {elapsed_time:.1f}s")
+                return
         except (ConnectionRefusedError, OSError, socket.timeout):
-            # Wait a short period before trying again
-            logger.warning(f"Waiting {wait_sec}s for application at {uri}")
-            time.sleep(wait_sec)
\ No newline at end of file
+            # Retry quickly at first, services that are already up answer right away
+            log = logger.warning if attempt == 0 or wait_sec >= max_wait_sec else logger.debug
+            log(f"Waiting {wait_sec:.1f}s for application at {uri}")
+            time.sleep(max(min(wait_sec, timeout - (time.monotonic() - start_time)), 0))
+
+def wait_for_uris(uris, timeout=300):
+    """Probe all URIs concurrently, returning once every one of them is open"""
+    with ThreadPoolExecutor(max_workers=len(uris)) as pool:
+        for future in [pool.submit(wait_for_uri, uri, timeout) for uri in uris]:
+            future.result()
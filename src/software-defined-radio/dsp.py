@@ -0,0 +1,193 @@
+######################################################################################################
+# SPDX-FileCopyrightText: Copyright (c) 2024-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: LicenseRef-NvidiaProprietary
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+######################################################################################################
+
+"""
+Signal processing math of the SDR operators
+Functions run on NumPy/SciPy or CuPy, following the array module of their input
+"""
+import numpy as np
+
+# Threads of the SciPy FFTs used on CPU
+_fft_workers = 1
+
+
+def set_fft_workers(workers):
+    global _fft_workers
+    _fft_workers = max(1, int(workers))
+
+
+def signal_module(xp):
+    """SciPy-compatible signal module of an array module"""
+    if xp is np:
+        import scipy.signal
+        return scipy.signal
+    import cupyx.scipy.signal
+    return cupyx.scipy.signal
+
+
+def get_array_module(x):
+    """Array and signal modules matching `x`: (numpy, scipy.signal) or (cupy, cupyx.scipy.signal)"""
+    if isinstance(x, np.ndarray):
+        return np, signal_module(np)
+    import cupy as cp
+    return cp, signal_module(cp)
+
+
+def to_numpy(x):
+    """Copy an array to host memory, if it is not there already"""
+    if isinstance(x, np.ndarray):
+        return x
+    return x.get()
+
+
+def fm_demod(x, axis=-1):
+    """ Demodulate Frequency Modulated Signal
+
+    The phase difference of consecutive samples is the angle of x[n] * conj(x[n-1]),
+    which equals the difference of the unwrapped phase without computing the unwrap.
+    """
+    xp, _ = get_array_module(x)
+    if xp.isrealobj(x):
+        raise AssertionError("Input signal must be complex-valued")
+    x = xp.moveaxis(x, axis, -1)
+    y = xp.angle(x[..., 1:] * xp.conj(x[..., :-1]))
+    return xp.moveaxis(y, -1, axis)
+
+
+def lowpass_taps(numtaps, cutoff, fs, xp=np):
+    """FIR lowpass filter taps using a Hamming window"""
+    return signal_module(xp).firwin(numtaps, cutoff=cutoff, window="hamming", fs=fs)
+
+
+def lowpass(taps, x):
+    """Apply FIR taps from a zero initial state, like lfilter(taps, [1], x)
+
+    On CPU the filter runs as an overlap-add FFT convolution, much faster than
+    the direct form for long filters.
+    """
+    xp, signal = get_array_module(x)
+    if xp is np:
+        import scipy.fft
+        with scipy.fft.set_workers(_fft_workers):
+            return signal.oaconvolve(x, taps.astype(np.float32))[:x.shape[0]].astype(np.complex64)
+    return signal.lfilter(taps, xp.array([1]), x).astype(xp.complex64)
+
+
+def channel_offsets(num_channels, channel_spacing, xp=np):
+    """Frequency offsets centered around 0
+
+    For odd num_channels: [..., -2*spacing, -spacing, 0, +spacing, +2*spacing, ...]
+    For even num_channels: [..., -1.5*spacing, -0.5*spacing, +0.5*spacing, +1.5*spacing, ...]
+    """
+    channel_indices = xp.arange(num_channels) - (num_channels - 1) / 2
+    return channel_indices * channel_spacing
+
+
+def frequency_shifts(freq_offsets, signal_length, sample_rate):
+    """Complex exponentials, one column per channel, exp(-j*2*pi*f*t) shifts frequency by +f Hz"""
+    xp, _ = get_array_module(freq_offsets)
+    dt = 1.0 / sample_rate
+    t = xp.arange(signal_length, dtype=xp.float32) * dt
+    shifts = xp.zeros((signal_length, len(freq_offsets)), dtype=xp.complex64)
+    for i, freq_offset in enumerate(freq_offsets):
+        shifts[:, i] = xp.exp(-1j * 2 * xp.pi * freq_offset * t).astype(xp.complex64)
+    return shifts
+
+
+def channelize(x, shifts):
+    """Shift a 1D signal (N,) to every channel, giving a 2D (N, num_channels) signal"""
+    xp, _ = get_array_module(x)
+    return x[:, xp.newaxis] * shifts[:x.shape[0], :]
+
+
+def welch_psd(x, nfft=1024, max_segments=64):
+    """Power spectrum of a complex signal, averaged over Hann-windowed segments
+
+    The segments are consecutive, non-overlapping blocks of `nfft` samples, at
+    most `max_segments` of them, transformed in one batched FFT. Bins are in
+    fftshift order, from -fs/2 to +fs/2, with relative power.
+    """
+    xp, signal = get_array_module(x)
+    nseg = max(1, min(x.shape[0] // nfft, max_segments))
+    if x.shape[0] < nfft:
+        x = xp.pad(x, (0, nfft - x.shape[0]))
+    window = xp.asarray(signal.get_window("hann", nfft), dtype=xp.float32)
+    segments = x[:nseg * nfft].reshape(nseg, nfft) * window
+    if xp is np:
+        import scipy.fft
+        spectrum = scipy.fft.fft(segments, axis=-1, workers=_fft_workers)
+    else:
+        spectrum = xp.fft.fft(segments, axis=-1)
+    psd = xp.mean(xp.abs(spectrum) ** 2, axis=0) / float(nfft)
+    return xp.fft.fftshift(psd)
+
+
+def channel_bins(freq_offsets, bandwidth, sample_rate, nfft):
+    """First and last-plus-one bins of `welch_psd` within bandwidth/2 of each channel center"""
+    offsets = np.asarray(to_numpy(freq_offsets), dtype=np.float64)
+    half = max(bandwidth / 2 * nfft / sample_rate, 0.5)
+    centers = offsets * nfft / sample_rate + nfft // 2
+    lo = np.clip(np.floor(centers - half), 0, nfft - 1).astype(np.int64)
+    hi = np.clip(np.ceil(centers + half), lo + 1, nfft).astype(np.int64)
+    return lo, hi
+
+
+def channel_snr_db(psd, lo, hi, floor_quantile=0.2):
+    """Mean power of every channel's bins above the noise floor, in dB
+
+    The noise floor is the `floor_quantile` quantile of all bins, so it holds as
+    long as most of the band is idle. Channels are summed from a cumulative sum,
+    one pass whatever their number.
+    """
+    xp, _ = get_array_module(psd)
+    csum = xp.concatenate([xp.zeros(1, dtype=psd.dtype), xp.cumsum(psd)])
+    lo_, hi_ = xp.asarray(lo), xp.asarray(hi)
+    power = (csum[hi_] - csum[lo_]) / (hi_ - lo_)
+    floor = xp.sort(psd)[int(floor_quantile * (psd.shape[0] - 1))]
+    tiny = xp.finfo(psd.dtype).tiny
+    return 10 * xp.log10(xp.maximum(power, tiny) / xp.maximum(floor, tiny))
+
+
+def reduce_fraction(numerator: int, denominator: int, max_up=1):
+    max_freq = numerator * float(max_up)
+    if max_freq > 10_000_000: # 10 MHz
+        raise ValueError(f"max_freq {max_freq} is too high")
+
+    out_freq_sf = round(max_freq / denominator)
+    return max_up, out_freq_sf
+
+
+def resample_factors(sample_rate_in, sample_rate_out):
+    fs_small = min(sample_rate_in, sample_rate_out)
+    fs_large = max(sample_rate_in, sample_rate_out)
+    return reduce_fraction(fs_large, fs_small)
+
+
+def resample(x, up, down):
+    if up == down:
+        return x
+    xp, signal = get_array_module(x)
+    return signal.resample_poly(x, up, down, window="hamming").astype(xp.float32)
+
+
+def float_to_pcm(f_data, dtype=np.int16):
+    """
+    Function made using the following sources:
+    - https://stackoverflow.com/a/15094612
+    - https://stackoverflow.com/a/61835960
+    - http://blog.bjornroche.com/2009/12/int-float-int-its-jungle-out-there.html
+    """
+    xp, _ = get_array_module(f_data)
+    dtype_max = xp.iinfo(dtype).max
+    dtype_min = xp.iinfo(dtype).min
+    abs_int_max = 2**(xp.iinfo(dtype).bits -1)
+    return xp.clip(f_data*abs_int_max, dtype_min, dtype_max).astype(dtype)
@@ -0,0 +1,398 @@
+######################################################################################################
+# SPDX-FileCopyrightText: Copyright (c) 2024-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: LicenseRef-NvidiaProprietary
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+######################################################################################################
+
+"""
+Benchmark of the SDR signal processing chain
+Drives the operator math with synthetic multi-channel FM I/Q on NumPy/SciPy and, when
+available, CuPy. Reports throughput per stage for each channel count and burst size,
+checks the SNR of the demodulated audio against the source, and saves JSON results
+that can be compared against a baseline run.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+
+from datetime import datetime, timezone
+
+import numpy as np
+import yaml
+
+import dsp
+from common import PARAM_FILE
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.addHandler(logging.StreamHandler())
+
+AUDIO_SAMPLE_RATE = 16_000
+# Tones of the synthetic programme of channel 0, shifted up for other channels
+BASE_TONES = (310.0, 730.0, 1290.0, 2270.0)
+AUDIO_PEAK = 0.25
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the SDR DSP chain on synthetic multi-channel FM I/Q"
+    )
+    parser.add_argument(
+        "--backends",
+        type=str,
+        nargs="*",
+        default=["numpy", "cupy"],
+        help="Array backends to benchmark, unavailable ones are skipped"
+    )
+    parser.add_argument(
+        "--channels",
+        type=int,
+        nargs="*",
+        default=[1, 2, 4, 8],
+        help="Channel counts to benchmark"
+    )
+    parser.add_argument(
+        "--burst-sizes",
+        type=int,
+        nargs="*",
+        default=[16_384, 62_500, 250_000],
+        help="I/Q samples per burst; 62500 matches 'network_rx.batch_size' of 500 kB"
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=0,
+        help="FFT worker threads of the numpy backend, 0 for all CPUs"
+    )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=10,
+        help="Timed iterations per stage"
+    )
+    parser.add_argument(
+        "--snr-duration",
+        type=float,
+        default=2.0,
+        help="Seconds of signal streamed through the chain to measure the SNR, 0 to skip"
+    )
+    parser.add_argument(
+        "--deviation",
+        type=float,
+        default=100_000,
+        help="FM deviation in Hz, matching the file replay service"
+    )
+    parser.add_argument(
+        "--params",
+        type=str,
+        default=PARAM_FILE,
+        help="SDR parameter file providing the sample rates, filter and channel spacing"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Write JSON results to this file"
+    )
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        default=None,
+        help="JSON results of a previous run to compare against"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="Relative throughput drop versus the baseline reported as a regression"
+    )
+    parser.add_argument(
+        "--snr-tolerance-db",
+        type=float,
+        default=1.0,
+        help="SNR drop in dB versus the baseline reported as a regression"
+    )
+    return parser.parse_args()
+
+def get_backend(name):
+    """Array module for a backend name, None if it is not usable here"""
+    if name == "numpy":
+        return np
+    if name == "cupy":
+        try:
+            import cupy as cp
+            cp.cuda.runtime.getDeviceCount()
+            return cp
+        except Exception as e:
+            logger.info(f"Skipping cupy backend: {e}")
+            return None
+    raise ValueError(f"Unknown backend {name}")
+
+def synchronize(xp):
+    if xp is not np:
+        xp.cuda.get_current_stream().synchronize()
+
+def channel_tones(channel):
+    return [f * (1 + 0.11 * channel) for f in BASE_TONES]
+
+def synthetic_audio(channel, duration):
+    """Deterministic multi-tone programme of a channel, as float32 at 16 kHz"""
+    t = np.arange(int(duration * AUDIO_SAMPLE_RATE)) / AUDIO_SAMPLE_RATE
+    tones = channel_tones(channel)
+    audio = sum(np.sin(2 * np.pi * f * t + i) for i, f in enumerate(tones))
+    return (AUDIO_PEAK * audio / len(tones)).astype(np.float32)
+
+def fm_modulate(xp, audio, fs_in, fs_out, deviation, freq_shift=0):
+    """ Given audio samples in floating point, FM modulate and frequency shift
+
+    Same modulation as the file replay service
+    """
+    signal = dsp.signal_module(xp)
+    nsamples = int(audio.shape[0] * fs_out / fs_in)
+    chunk = signal.resample(xp.asarray(audio), nsamples)
+
+    integrated_audio = xp.cumsum(chunk) / fs_out
+    phase_deviation = 2 * xp.pi * deviation * integrated_audio
+    fm_samples = xp.cos(phase_deviation) + 1j*xp.sin(phase_deviation)
+
+    if freq_shift != 0:
+        t = xp.arange(len(fm_samples)) / fs_out
+        fm_samples = fm_samples * xp.exp(1j * 2 * xp.pi * freq_shift * t)
+
+    return fm_samples.astype(xp.complex64)
+
+def synthetic_iq(xp, num_channels, duration, config, deviation):
+    """Sum of FM channels placed where the channelizer expects them, and their audio"""
+    offsets = dsp.channel_offsets(num_channels, config["channel_spacing"])
+    audio = [synthetic_audio(ch, duration) for ch in range(num_channels)]
+    iq = sum(
+        fm_modulate(xp, a, AUDIO_SAMPLE_RATE, config["sample_rate"], deviation, float(f))
+        for a, f in zip(audio, offsets)
+    )
+    return iq.astype(xp.complex64), audio
+
+class Chain:
+    """The operator chain from the channelizer to PCM, for one burst size"""
+    stages = ("channelizer", "lowpassfilt", "demodulate", "resample", "pcm")
+
+    def __init__(self, xp, num_channels, burst_size, config):
+        self.xp = xp
+        self.num_channels = num_channels
+        self.gain = config["gain"]
+        self.shifts = dsp.frequency_shifts(
+            dsp.channel_offsets(num_channels, config["channel_spacing"], xp=xp),
+            burst_size,
+            config["sample_rate"]
+        )
+        self.taps = dsp.lowpass_taps(
+            config["numtaps"], config["cutoff"], config["sample_rate"], xp=xp
+        )
+        self.up, self.down = dsp.resample_factors(
+            config["sample_rate"], config["sample_rate_out"]
+        )
+
+    def stage_functions(self):
+        """Functions of each stage, taking the per-channel outputs of the previous one"""
+        return {
+            "channelizer": lambda burst: dsp.channelize(burst, self.shifts),
+            "lowpassfilt": lambda x: [
+                dsp.lowpass(self.taps, x[:, ch]) for ch in range(self.num_channels)
+            ],
+            "demodulate": lambda xs: [dsp.fm_demod(x) for x in xs],
+            "resample": lambda xs: [self.gain * dsp.resample(x, self.up, self.down) for x in xs],
+            "pcm": lambda xs: [dsp.float_to_pcm(x, np.int16) for x in xs],
+        }
+
+    def process(self, burst):
+        out = burst
+        for fn in self.stage_functions().values():
+            out = fn(out)
+        return out
+
+def time_stages(chain, burst, iterations):
+    """Median seconds per burst of every stage, each fed the output of the previous one"""
+    xp = chain.xp
+    timings = {}
+    data = burst
+    for name, fn in chain.stage_functions().items():
+        # Warm up kernels and caches
+        out = fn(data)
+        synchronize(xp)
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            out = fn(data)
+            synchronize(xp)
+            samples.append(time.perf_counter() - start)
+        timings[name] = statistics.median(samples)
+        data = out
+    return timings
+
+def audio_snr_db(received, tones):
+    """SNR of received audio against the programme's tones
+
+    Amplitude and phase of every tone are fitted by least squares, so filter delay
+    and response do not count as noise, while distortion, burst-edge artifacts and
+    time-stretching do.
+    """
+    # Ignore start-up and tail transients
+    edge = min(AUDIO_SAMPLE_RATE // 10, len(received) // 4)
+    y = received[edge:len(received) - edge].astype(np.float64)
+    t = (edge + np.arange(len(y))) / AUDIO_SAMPLE_RATE
+    basis = np.column_stack(
+        [fn(2 * np.pi * f * t) for f in tones for fn in (np.cos, np.sin)] + [np.ones_like(t)]
+    )
+    coefs, _, _, _ = np.linalg.lstsq(basis, y, rcond=None)
+    fitted = basis[:, :-1] @ coefs[:-1]
+    noise = y - basis @ coefs
+    return float(10 * np.log10(np.sum(fitted ** 2) / max(np.sum(noise ** 2), 1e-20)))
+
+def measure_snr(xp, num_channels, burst_size, config, deviation, duration):
+    """Stream a synthetic signal through the chain burst by burst, as the pipeline does"""
+    iq, _ = synthetic_iq(xp, num_channels, duration, config, deviation)
+    chain = Chain(xp, num_channels, burst_size, config)
+    pcm = [[] for _ in range(num_channels)]
+    for start in range(0, iq.shape[0] - burst_size + 1, burst_size):
+        for ch, out in enumerate(chain.process(iq[start:start + burst_size])):
+            pcm[ch].append(dsp.to_numpy(out))
+    snrs = []
+    for ch in range(num_channels):
+        received = np.concatenate(pcm[ch]).astype(np.float32) / 32768
+        snrs.append(audio_snr_db(received, channel_tones(ch)))
+    return snrs
+
+def load_config(param_file):
+    with open(param_file) as f:
+        params = yaml.safe_load(f)
+    return {
+        "sample_rate": float(params["sensor"]["sample_rate"]),
+        "channel_spacing": float(params["channelizer"]["channel_spacing"]),
+        "cutoff": float(params["lowpassfilt"]["cutoff"]),
+        "numtaps": int(params["lowpassfilt"]["numtaps"]),
+        "sample_rate_out": float(params["resample"]["sample_rate_out"]),
+        "gain": float(params["resample"]["gain"]),
+    }
+
+def system_info(backends):
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "numpy": np.__version__,
+    }
+    if "cupy" in backends:
+        cp = backends["cupy"]
+        info["cupy"] = cp.__version__
+        info["device"] = cp.cuda.runtime.getDeviceProperties(0)["name"].decode()
+    return info
+
+def run(args):
+    config = load_config(args.params)
+    threads = args.threads or os.cpu_count() or 1
+    dsp.set_fft_workers(threads)
+    backends = {name: get_backend(name) for name in args.backends}
+    backends = {name: xp for name, xp in backends.items() if xp is not None}
+    results = []
+    for backend, xp in backends.items():
+        for num_channels in args.channels:
+            # Channels centered around 0 Hz must fit in the complex baseband
+            required = num_channels * config["channel_spacing"]
+            if required > config["sample_rate"]:
+                logger.info(
+                    f"Skipping {num_channels} channels, {required/1e6:.1f} MHz of spectrum "
+                    f"exceeds the {config['sample_rate']/1e6:.1f} MHz sample rate"
+                )
+                continue
+            for burst_size in args.burst_sizes:
+                burst_duration = burst_size / config["sample_rate"]
+                iq, _ = synthetic_iq(xp, num_channels, burst_duration, config, args.deviation)
+                iq = iq[:burst_size]
+                chain = Chain(xp, num_channels, burst_size, config)
+                timings = time_stages(chain, iq, args.iterations)
+                total = sum(timings.values())
+                result = {
+                    "backend": backend,
+                    "channels": num_channels,
+                    "burst_size": burst_size,
+                    "stages": {
+                        name: {"ms_per_burst": 1e3 * sec, "msps": burst_size / sec / 1e6}
+                        for name, sec in timings.items()
+                    },
+                    "chain_msps": burst_size / total / 1e6,
+                    "realtime_factor": burst_duration / total,
+                }
+                if args.snr_duration > 0:
+                    result["snr_db"] = measure_snr(
+                        xp, num_channels, burst_size, config, args.deviation, args.snr_duration
+                    )
+                results.append(result)
+                log_result(result)
+    return {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "system": system_info(backends),
+        "config": {
+            **config,
+            "deviation": args.deviation,
+            "iterations": args.iterations,
+            "threads": threads,
+        },
+        "results": results,
+    }
+
+def log_result(result):
+    stages = ", ".join(f"{name} {s['msps']:.1f}" for name, s in result["stages"].items())
+    snr = result.get("snr_db")
+    snr = f", SNR {min(snr):.1f} dB" if snr else ""
+    logger.info(
+        f"{result['backend']:>5} {result['channels']:>2} ch, burst {result['burst_size']:>7}: "
+        f"chain {result['chain_msps']:.2f} MS/s ({result['realtime_factor']:.1f}x realtime){snr}"
+        f" | MS/s per stage: {stages}"
+    )
+
+def compare(report, baseline, tolerance, snr_tolerance_db):
+    """Log changes versus a baseline report, returning the number of regressions"""
+    key = lambda r: (r["backend"], r["channels"], r["burst_size"])
+    previous = {key(r): r for r in baseline["results"]}
+    regressions = 0
+    for result in report["results"]:
+        before = previous.get(key(result))
+        if before is None:
+            continue
+        change = result["chain_msps"] / before["chain_msps"] - 1
+        regressed = change < -tolerance
+        message = f"{key(result)}: chain throughput {100 * change:+.1f}%"
+        if result.get("snr_db") and before.get("snr_db"):
+            snr_change = min(result["snr_db"]) - min(before["snr_db"])
+            regressed = regressed or snr_change < -snr_tolerance_db
+            message += f", SNR {snr_change:+.1f} dB"
+        if regressed:
+            regressions += 1
+            logger.warning(f"REGRESSION {message}")
+        else:
+            logger.info(message)
+    return regressions
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = run(args)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Saved results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.tolerance, args.snr_tolerance_db):
+            sys.exit(1)
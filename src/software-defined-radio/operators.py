@@ -13,21 +13,73 @@
 import time
 import socket
 import copy
+import threading
 
 from enum import Enum
 
-import cupy as cp
-import cupyx.scipy.signal as cusignal
-
 from holoscan.core import Operator, OperatorSpec
+from backend import get_backend
 from common import setup_logging
+from dsp import (
+    channel_offsets,
+    channelize,
+    float_to_pcm,
+    fm_demod,
+    frequency_shifts,
+    lowpass,
+    lowpass_taps,
+    resample,
+    resample_factors,
+)
+import spectrum
+import telemetry
+
+logger = setup_logging(__name__)
+
+# (operator, array module, arguments) of the kernels compiled in this process
+_warmed_up = set()
+_warmup_lock = threading.Lock()
+
+
+def jit_warmup(op_class, xp, *args):
+    """Run `op_class._jit_compile(xp, *args)` once per process
+
+    The compiled kernels are shared by the operators of every channel, so only
+    the first operator of each kind pays for the compilation. Returns True if
+    this call compiled them.
+    """
+    key = (op_class.__name__, xp.__name__, args)
+    with _warmup_lock:
+        if key in _warmed_up:
+            return False
+        start = time.perf_counter()
+        op_class._jit_compile(xp, *args)
+        _warmed_up.add(key)
+    logger.info(f"JIT compiled {op_class.__name__} in {time.perf_counter() - start:.2f}s")
+    return True
+
+
+def warmup_kernels(fragment):
+    """Compile the kernels of the signal processing operators ahead of compose()"""
+    xp = get_backend().xp
+    lowpass_params = fragment.kwargs("lowpassfilt")
+    jit_warmup(ChannelizerOp, xp)
+    jit_warmup(
+        LowPassFilterOp,
+        xp,
+        int(lowpass_params["numtaps"]),
+        float(lowpass_params["cutoff"]),
+        float(fragment.kwargs("sensor")["sample_rate"]),
+    )
+    jit_warmup(DemodulateOp, xp)
+    jit_warmup(ResampleOp, xp)
 
 
 def extract_channel_signal(signal_in, channel_index, logger=None):
     """Extract a specific channel from multi-channel input signal
 
     Args:
-        signal_in: Input signal (1D or 2D CuPy array)
+        signal_in: Input signal (1D or 2D array of the backend)
         channel_index: Index of channel to extract
         logger: Optional logger for error messages
 
@@ -62,40 +114,6 @@ class NetworkOpBurstParams:
     def __init__(self):
         self.reset()
 
-def fm_demod(x: cp.array, axis=-1):
-    """ Demodulate Frequency Modulated Signal
-    """
-    x = cp.asarray(x)
-    if cp.isrealobj(x):
-        raise AssertionError("Input signal must be complex-valued")
-    x_angle = cp.unwrap(cp.angle(x), axis=axis)
-    y = cp.diff(x_angle, axis=axis)
-    return y
-
-def lowpass(taps: cp.array, x: cp.array):
-    return cusignal.lfilter(taps, cp.array([1]), x).astype(cp.complex64)
-
-def reduce_fraction(numerator: int, denominator: int, max_up=1):
-    max_freq = numerator * float(max_up)
-    if max_freq > 10_000_000: # 10 MHz
-        raise ValueError(f"max_freq {max_freq} is too high")
-
-    out_freq_sf = round(max_freq / denominator)
-    return max_up, out_freq_sf
-
-def float_to_pcm(f_data: cp.array, dtype=cp.int16):
-    """
-    Function made using the following sources:
-    - https://stackoverflow.com/a/15094612
-    - https://stackoverflow.com/a/61835960
-    - http://blog.bjornroche.com/2009/12/int-float-int-its-jungle-out-there.html
-    """
-    dtype_max = cp.iinfo(dtype).max
-    dtype_min = cp.iinfo(dtype).min
-    abs_int_max = 2**(cp.iinfo(dtype).bits -1)
-    return cp.clip(f_data*abs_int_max, dtype_min, dtype_max).astype(cp.int16)
-
-
 class BasicNetworkRxOp(Operator):
     sock_fd: socket.socket = None
     l4_proto: L4Proto = None
@@ -122,6 +140,7 @@ class BasicNetworkRxOp(Operator):
                 self.sock_fd.listen(1)
 
             self.logger.info(f"Successfully listening on {self.ip_addr}:{self.dst_port}")
+            telemetry.mark_ready()
         except socket.error as e:
             self.logger.error(f"Failed to create socket: {e}")
 
@@ -130,6 +149,7 @@ class BasicNetworkRxOp(Operator):
     def __init__(self, fragment, *args, **kwargs):
         super().__init__(fragment, *args, **kwargs)
         self.logger = setup_logging(self.name)
+        self.telemetry = telemetry.OperatorTelemetry("network_rx")
 
     def setup(self, spec: OperatorSpec):
         # Settings
@@ -158,6 +178,22 @@ class BasicNetworkRxOp(Operator):
             finally:
                 self.sock_fd.settimeout(None)
 
+        with self.telemetry.measure():
+            burst_out = self._receive_burst()
+            if burst_out is not None:
+                # complex64 samples
+                self.telemetry.count(len(burst_out.data) // 8)
+        if burst_out is None:
+            return
+
+        # Receipt time of the burst's last packet, for air-to-transcript latency
+        self.metadata["rx_time"] = telemetry.now()
+        op_output.emit(burst_out.data, "burst_out")
+        self.logger.debug(f"Emitting burst of size {len(burst_out.data)}")
+
+    def _receive_burst(self):
+        """Read the pending packets, returning a burst once `batch_size` bytes
+        are buffered, None otherwise"""
         while True:
             try:
                 if self.l4_proto == L4Proto.UDP:
@@ -171,33 +207,35 @@ class BasicNetworkRxOp(Operator):
                 if len(self.send_burst.data) > 0:
                     break
                 else:
-                    return
+                    return None
             except Exception as e:
                 self.logger.error(f"Error receiving data: {e}")
-                return
+                return None
 
             if len(n) > 0:
                 self.send_burst.header.extend(header)
                 self.send_burst.data.extend(data)
+                telemetry.network_rx_bytes.inc(len(n))
             else:
-                return
+                return None
 
             if len(self.send_burst.data) >= self.batch_size:
                 burst_out = copy.deepcopy(self.send_burst)
-                op_output.emit(burst_out.data, "burst_out")
-                self.logger.debug(f"Emitting burst of size {len(burst_out.data)}")
                 self.send_burst.reset()
-                return
+                return burst_out
+        return None
 
 
 class PacketFormatterOp(Operator):
-    """Format data from packets into a CuPy array and emit downstream"""
+    """Format data from packets into an array of the backend and emit downstream"""
     def __init__(self, fragment, *args, **kwargs):
         super().__init__(fragment, *args, **kwargs)
+        self.backend = get_backend()
         self.sample_rate_in = float(fragment.kwargs("sensor")["sample_rate"])
         self.logger = setup_logging(self.name)
         self.prev_log_time = None
         self.bytes_sent = 0
+        self.telemetry = telemetry.OperatorTelemetry("pkt_format")
 
     def setup(self, spec: OperatorSpec):
         spec.param("log_period")
@@ -220,10 +258,13 @@ class PacketFormatterOp(Operator):
             self.prev_log_time = tnow
 
     def compute(self, op_input, op_output, context):
-        """Just copy data to a GPU CuPy array and emit"""
+        """Just copy data to a GPU CuPy array (or wrap it on CPU) and emit"""
         burst_in = op_input.receive("burst_in")
         self.logger.debug(f"Received burst of size {len(burst_in)}")
-        data = cp.frombuffer(burst_in, dtype=cp.complex64)
+        with self.telemetry.measure(len(burst_in) // 8):
+            data = self.backend.frombuffer(burst_in, dtype=self.backend.xp.complex64)
+        if self.backend.on_device:
+            self.telemetry.host_to_device(len(burst_in))
         self.metadata["sample_rate"] = self.sample_rate_in
         self.logger.debug(f"Emitting signal of size {data.shape}")
         op_output.emit(data, "signal_out")
@@ -235,27 +276,30 @@ class PacketFormatterOp(Operator):
 class ChannelizerOp(Operator):
     """Frequency shift a baseband IQ signal to multiple channels
 
-    Takes a 1D CuPy array and creates a 2D tensor where each column represents
+    Takes a 1D array and creates a 2D tensor where each column represents
     the input signal shifted to a different frequency channel.
     """
 
     @classmethod
-    def _jit_compile(cls):
+    def _jit_compile(cls, xp):
         # JIT compile frequency shifting operations
         signal_len = 100_000
-        test_signal = cp.ones(signal_len, dtype=cp.complex64)
-        test_shifts = cp.ones((signal_len, 5), dtype=cp.complex64)
-        _ = test_signal[:, cp.newaxis] * test_shifts
+        test_signal = xp.ones(signal_len, dtype=xp.complex64)
+        test_shifts = xp.ones((signal_len, 5), dtype=xp.complex64)
+        _ = channelize(test_signal, test_shifts)
 
     def __init__(self, fragment, *args, **kwargs):
         super().__init__(fragment, *args, **kwargs)
         self.logger = setup_logging(self.name)
+        self.backend = get_backend()
         self.sample_rate_in = float(fragment.kwargs("sensor")["sample_rate"])
         self.freq_shifts = None
+        self.scanner = None
+        self.telemetry = telemetry.OperatorTelemetry("channelizer")
+        self.scan_telemetry = telemetry.OperatorTelemetry("spectrum_scan")
 
         # JIT compile frequency shifting
-        self.logger.info("Doing JIT compilation")
-        ChannelizerOp._jit_compile()
+        jit_warmup(ChannelizerOp, self.backend.xp)
 
     def setup(self, spec: OperatorSpec):
         spec.param("num_channels")
@@ -267,6 +311,10 @@ class ChannelizerOp(Operator):
         Operator.initialize(self)
         self.num_channels = int(self.num_channels)
         self.channel_spacing = float(self.channel_spacing)
+        # Decode only the channels with activity, when spectrum scanning is enabled
+        self.scanner = spectrum.make_scanner(
+            channel_offsets(self.num_channels, self.channel_spacing), self.sample_rate_in
+        )
 
     def _generate_frequency_shifts(self, signal_length):
         """Generate frequency shift vectors for each channel"""
@@ -275,44 +323,55 @@ class ChannelizerOp(Operator):
             return
 
         # Create frequency offsets centered around 0
-        # For odd num_channels: [..., -2*spacing, -spacing, 0, +spacing, +2*spacing, ...]
-        # For even num_channels: [..., -1.5*spacing, -0.5*spacing, +0.5*spacing, +1.5*spacing, ...]
-        channel_indices = cp.arange(self.num_channels) - (self.num_channels - 1) / 2
-        freq_offsets = channel_indices * self.channel_spacing
-
-        self.logger.info(f"Frequency offsets (Hz): {cp.asnumpy(freq_offsets)}")
-
-        # Generate time vector
-        dt = 1.0 / self.sample_rate_in
-        t = cp.arange(signal_length, dtype=cp.float32) * dt
+        freq_offsets = channel_offsets(self.num_channels, self.channel_spacing, xp=self.backend.xp)
+        self.logger.info(f"Frequency offsets (Hz): {self.backend.asnumpy(freq_offsets)}")
 
         # Generate complex exponentials for frequency shifting
-        # exp(-j*2*pi*f*t) shifts frequency by +f Hz
-        self.freq_shifts = cp.zeros((signal_length, self.num_channels), dtype=cp.complex64)
-        for i, freq_offset in enumerate(freq_offsets):
-            self.freq_shifts[:, i] = cp.exp(-1j * 2 * cp.pi * freq_offset * t).astype(cp.complex64)
+        self.freq_shifts = frequency_shifts(freq_offsets, signal_length, self.sample_rate_in)
 
     def compute(self, op_input, op_output, context):
         signal_in = op_input.receive("signal_in")
         self.logger.debug(f"Received signal of size {signal_in.shape}")
 
-        # Check if sample rate changed or if we need to regenerate shifts for new signal length
-        if (
-            self.sample_rate_in != self.metadata["sample_rate"]
-            or self.freq_shifts is None
-            or self.freq_shifts.shape[0] < signal_in.shape[0]
-        ):
-            self.sample_rate_in = self.metadata["sample_rate"]
-            self._generate_frequency_shifts(signal_in.shape[0])
+        # Decode only the channels the scanner found active, if any
+        active = None
+        if self.scanner is not None:
+            with self.scan_telemetry.measure(signal_in.shape[0]):
+                if self.scanner.sample_rate != self.metadata["sample_rate"]:
+                    self.scanner.set_sample_rate(self.metadata["sample_rate"])
+                self.scanner.scan(signal_in)
+            active = self.scanner.scheduler.active_channels()
+            if not active:
+                return
 
-        # Apply frequency shifts to create multi-channel output
-        # signal_in is 1D (N,), freq_shifts is 2D (N, num_channels)
-        # Result is 2D (N, num_channels) where each column is a frequency-shifted version
-        signal_out = signal_in[:, cp.newaxis] * self.freq_shifts[:signal_in.shape[0], :]
+        with self.telemetry.measure(signal_in.shape[0]):
+            # Check if sample rate changed or if we need to regenerate shifts for new signal length
+            if (
+                self.sample_rate_in != self.metadata["sample_rate"]
+                or self.freq_shifts is None
+                or self.freq_shifts.shape[0] < signal_in.shape[0]
+            ):
+                self.sample_rate_in = self.metadata["sample_rate"]
+                self._generate_frequency_shifts(signal_in.shape[0])
+
+            # Apply frequency shifts to create multi-channel output
+            # signal_in is 1D (N,), freq_shifts is 2D (N, num_channels)
+            # Result is 2D (N, num_channels) where each column is a frequency-shifted version
+            if active is None or len(active) == self.num_channels:
+                signal_out = channelize(signal_in, self.freq_shifts)
+            else:
+                # Columns of idle channels are left unset, their filters skip them
+                shifted = channelize(signal_in, self.freq_shifts[:, active])
+                signal_out = self.backend.xp.empty(
+                    (signal_in.shape[0], self.num_channels), dtype=shifted.dtype
+                )
+                signal_out[:, active] = shifted
 
         # Pass through metadata
         self.metadata["sample_rate"] = self.sample_rate_in
         self.metadata["num_channels"] = self.num_channels
+        if active is not None:
+            self.metadata["active_channels"] = active
         op_output.emit(signal_out, "signal_out")
         self.logger.debug(f"Emitted signal of size {signal_out.shape}")
 
@@ -321,19 +380,22 @@ class LowPassFilterOp(Operator):
     """ Design and apply an FIR lowpass filter using a Hamming window.
     """
     @classmethod
-    def _jit_compile(cls, numtaps, cutoff, fs):
-        taps = cusignal.firwin(numtaps, cutoff=cutoff, window="hamming", fs=fs)
-        lowpass(taps, cp.ones(1000, dtype=cp.complex64))
+    def _jit_compile(cls, xp, numtaps, cutoff, fs):
+        taps = lowpass_taps(numtaps, cutoff, fs, xp=xp)
+        lowpass(taps, xp.ones(1000, dtype=xp.complex64))
 
     def __init__(self, fragment, *args, **kwargs):
         super().__init__(fragment, *args, **kwargs)
         self.logger = setup_logging(self.name)
+        self.backend = get_backend()
         self.channel_index = kwargs.get("channel_index", 0)
+        self.telemetry = telemetry.OperatorTelemetry("lowpassfilt", self.channel_index)
 
-        # JIT compile of filter
-        self.logger.info("Doing JIT compilation")
+        # JIT compile of filter, shared by the channels with the same parameters
         self.sample_rate_in = float(fragment.kwargs("sensor")["sample_rate"])
-        LowPassFilterOp._jit_compile(
+        jit_warmup(
+            LowPassFilterOp,
+            self.backend.xp,
             int(kwargs["numtaps"]), float(kwargs["cutoff"]), self.sample_rate_in
         )
 
@@ -350,20 +412,26 @@ class LowPassFilterOp(Operator):
         self.cutoff = float(self.cutoff)
         self.numtaps = int(self.numtaps)
         self.channel_index = int(self.channel_index)
-        self.taps = cusignal.firwin(
-            self.numtaps, cutoff=self.cutoff, window="hamming", fs=self.sample_rate_in
+        self.taps = lowpass_taps(
+            self.numtaps, self.cutoff, self.sample_rate_in, xp=self.backend.xp
         )
 
     def compute(self, op_input, op_output, context):
         signal_in = op_input.receive("signal_in")
         self.logger.debug(f"Received signal of size {signal_in.shape} on channel {self.channel_index}")
 
+        # Channels held idle by the spectrum scanner stop here
+        active = self.metadata.get("active_channels", None)
+        if active is not None and self.channel_index not in active:
+            return
+
         # Extract the specific channel from multi-channel input
         channel_signal = extract_channel_signal(signal_in, self.channel_index, self.logger)
         if channel_signal is None:
             return
 
-        signal_out = lowpass(self.taps, channel_signal)
+        with self.telemetry.measure(channel_signal.shape[0]):
+            signal_out = lowpass(self.taps, channel_signal)
 
         # Pass through metadata with channel info
         self.metadata["channel_id"] = self.channel_index
@@ -375,17 +443,18 @@ class DemodulateOp(Operator):
     """ Do FM demodulation using discrete time differentiator
     """
     @classmethod
-    def _jit_compile(cls):
-        fm_demod(cp.ones(1000, dtype=cp.complex64))
+    def _jit_compile(cls, xp):
+        fm_demod(xp.ones(1000, dtype=xp.complex64))
 
     def __init__(self, fragment, *args, **kwargs):
         super().__init__(fragment, *args, **kwargs)
         self.logger = setup_logging(self.name)
+        self.backend = get_backend()
         self.channel_index = kwargs.get("channel_index", 0)
+        self.telemetry = telemetry.OperatorTelemetry("demodulate", self.channel_index)
 
-        # JIT compile of demodulation
-        self.logger.info("Doing JIT compilation")
-        DemodulateOp._jit_compile()
+        # JIT compile of demodulation, shared by all channels
+        jit_warmup(DemodulateOp, self.backend.xp)
 
     def setup(self, spec: OperatorSpec):
         spec.param("channel_index")
@@ -405,7 +474,8 @@ class DemodulateOp(Operator):
         if channel_signal is None:
             return
 
-        signal_out = fm_demod(channel_signal)
+        with self.telemetry.measure(channel_signal.shape[0]):
+            signal_out = fm_demod(channel_signal)
 
         # Pass through metadata with channel info
         self.metadata["channel_id"] = self.channel_index
@@ -416,18 +486,19 @@ class ResampleOp(Operator):
     """ Up-sample or down-sample signal based on input
     """
     @classmethod
-    def _jit_compile(cls):
-        t_sig = cp.ones([int(1024*250e3//16e3)], dtype=cp.float32)
-        cusignal.resample_poly(t_sig, 1, 2, window="hamming")
+    def _jit_compile(cls, xp):
+        t_sig = xp.ones([int(1024*250e3//16e3)], dtype=xp.float32)
+        resample(t_sig, 1, 2)
 
     def __init__(self, fragment, *args, **kwargs):
         super().__init__(fragment, *args, **kwargs)
         self.logger = setup_logging(self.name)
+        self.backend = get_backend()
         self.channel_index = kwargs.get("channel_index", 0)
+        self.telemetry = telemetry.OperatorTelemetry("resample", self.channel_index)
 
-        # JIT compile resampling
-        self.logger.info("Doing JIT compilation")
-        ResampleOp._jit_compile()
+        # JIT compile resampling, shared by all channels
+        jit_warmup(ResampleOp, self.backend.xp)
 
     def setup(self, spec: OperatorSpec):
         spec.param("sample_rate_out")
@@ -444,16 +515,10 @@ class ResampleOp(Operator):
         self.channel_index = int(self.channel_index)
 
     def _set_scaling(self):
-        fs_small = min(self.sample_rate_in, self.sample_rate_out)
-        fs_large = max(self.sample_rate_in, self.sample_rate_out)
-        self.up, self.down = reduce_fraction(fs_large, fs_small)
+        self.up, self.down = resample_factors(self.sample_rate_in, self.sample_rate_out)
 
     def _resample(self, data):
-        if self.up == self.down:
-            return data
-        return cusignal.resample_poly(
-            data, self.up, self.down, window="hamming"
-        ).astype(cp.float32)
+        return resample(data, self.up, self.down)
 
     def compute(self, op_input, op_output, context):
         signal_in = op_input.receive("signal_in")
@@ -471,7 +536,8 @@ class ResampleOp(Operator):
             self._set_scaling()
 
         # Do work and emit
-        signal_out = self.gain * self._resample(channel_signal)
+        with self.telemetry.measure(channel_signal.shape[0]):
+            signal_out = self.gain * self._resample(channel_signal)
         self.metadata["sample_rate"] = self.sample_rate_out
         self.metadata["channel_id"] = self.channel_index
         op_output.emit(signal_out, "signal_out")
@@ -489,9 +555,13 @@ class PcmToAsrOp(Operator):
     def __init__(self, fragment, shared_pcm_buffer, *args, **kwargs):
         super().__init__(fragment, *args, **kwargs)
         self.logger = setup_logging(self.name)
+        self.backend = get_backend()
         self.shared_pcm_buffer = shared_pcm_buffer
         self.pcm_bytes = bytes()
+        self.pcm_rx_time = None
+        self.pcm_deactivations = None
         self.channel_index = kwargs.get("channel_index", 0)
+        self.telemetry = telemetry.OperatorTelemetry("pcm_to_asr", self.channel_index)
 
     def setup(self, spec: OperatorSpec):
         spec.param("channel_index")
@@ -510,9 +580,22 @@ class PcmToAsrOp(Operator):
         if channel_signal is None:
             return
 
+        # Samples buffered before the channel went idle would be sent to Riva
+        # spliced with the new activity, under its receipt time. Drop them
+        deactivations = spectrum.deactivations(self.channel_index)
+        if deactivations != self.pcm_deactivations:
+            if self.pcm_bytes:
+                self.logger.debug(f"Dropping {len(self.pcm_bytes)} bytes buffered before channel {self.channel_index} went idle")
+            self.pcm_bytes = bytes()
+            self.pcm_deactivations = deactivations
+
         # Put 16-bit PCM byte array on shared Riva buffer
-        pcm_data = float_to_pcm(channel_signal, cp.int16)
-        self.pcm_bytes += cp.asnumpy(pcm_data).tobytes()
+        with self.telemetry.measure(channel_signal.shape[0]):
+            pcm_data = self.backend.asnumpy(float_to_pcm(channel_signal, self.backend.xp.int16))
+        if self.backend.on_device:
+            self.telemetry.device_to_host(pcm_data.nbytes)
+        self.pcm_bytes += pcm_data.tobytes()
+        self.pcm_rx_time = self.metadata.get("rx_time", None)
         if len(self.pcm_bytes) < self.buffer_limit:
             self.logger.debug(f"Not enough data to put on shared buffer, {len(self.pcm_bytes)} < {self.buffer_limit}")
             return
@@ -520,10 +603,12 @@ class PcmToAsrOp(Operator):
         # Check queue size before putting data
         queue_size_before = self.shared_pcm_buffer.qsize()
 
-        self.shared_pcm_buffer.put(self.pcm_bytes)
+        # Chunks carry the receipt time of their newest samples
+        self.shared_pcm_buffer.put((self.pcm_bytes, self.pcm_rx_time))
 
         # Monitor queue size and warn about backpressure
         queue_size_after = self.shared_pcm_buffer.qsize()
+        telemetry.pcm_queue_depth.set(queue_size_after, str(self.channel_index))
         self.logger.debug(f"Put {len(self.pcm_bytes)} bytes on shared buffer (queue size: {queue_size_before} → {queue_size_after})")
 
         # Warn about potential backpressure
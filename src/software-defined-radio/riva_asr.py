@@ -20,11 +20,14 @@ import uuid
 import riva.client
 import riva.client.proto.riva_asr_pb2 as rasr
 
+from collections import deque
 from queue import Queue
 from queue import Empty as QueueEmptyException
 from copy import deepcopy
 from datetime import datetime, timezone
-from common import setup_logging
+from common import backoff_delays, setup_logging
+import spectrum
+import telemetry
 
 
 class RivaThread(threading.Thread):
@@ -60,37 +63,42 @@ class RivaThread(threading.Thread):
 
         self._prev_partial_transcript = None
         self._buffer_get_timeout = 30  # (sec) timeout for waiting on new buffer entries
+        self._buffer_poll_sec = 1  # (sec) interval of the spectrum scanner state checks
         self.collection_name = "RadioStream"
 
         # Timing tracking for NTP timestamps
         self._first_transcript_time = None
         self._prev_export_time = None
 
+        # Receipt times of the audio streamed in the current Riva request, as
+        # (end of chunk in seconds since the start of the request, rx_time)
+        self._audio_sent_sec = 0.0
+        self._audio_rx_times = deque()
+        self._audio_lock = threading.Lock()
+
         # Riva handlers
         self._setup_riva()
         self._kill = threading.Event()
 
         # Initialize collection
         if self.database_uri is not None and initialize:
-            attempts = 0
-            max_attempts = 10
-            sleep_time = 10
-            while attempts < max_attempts:
+            # Retry quickly at first, the service is usually up by the time we get here
+            max_attempts = 12
+            for attempts, sleep_time in enumerate(backoff_delays(0.5, 10), start=1):
                 try:
                     self._initialize_ingest_service()
                     break
                 except Exception as e:
-                    self.logger.warning(
-                        f"Error initializing ingest service, trying again in "
-                        f"{sleep_time} seconds ({attempts}/{max_attempts})"
-                    )
-                    attempts += 1
                     if attempts == max_attempts:
                         self.logger.error(
                             f"Failed to initialize ingest service after "
                             f"{max_attempts} attempts"
                         )
                         raise
+                    self.logger.warning(
+                        f"Error initializing ingest service, trying again in "
+                        f"{sleep_time} seconds ({attempts}/{max_attempts})"
+                    )
                     time.sleep(sleep_time)
 
         self.logger.info(f"RivaThread initialized for channel {self.channel_id}")
@@ -134,7 +142,16 @@ class RivaThread(threading.Thread):
             raise
 
     def run(self):
+        idle_since = None
         while not self._kill.is_set():
+            # Open a Riva stream only while the spectrum scanner finds activity
+            if not spectrum.wait_active(self.channel_id, timeout=self._buffer_poll_sec):
+                if idle_since is None:
+                    idle_since = telemetry.now()
+                continue
+            if idle_since is not None:
+                self._drop_stale_audio(idle_since)
+                idle_since = None
             try:
                 responses = self.make_riva_request()
                 self.extract_transcripts(responses)
@@ -150,6 +167,24 @@ class RivaThread(threading.Thread):
 
         self.logger.info(f"Riva thread for channel {self.channel_id} exiting")
 
+    def _drop_stale_audio(self, idle_since):
+        """Drop the audio received before the channel went idle
+
+        It was queued after the previous stream ended, so it would otherwise be
+        transcribed ahead of the new activity, late and out of context.
+        """
+        dropped = 0
+        # Chunks are queued in receipt order, the stale ones come first. The
+        # operator keeps queueing, so drop them in place rather than requeue
+        with self.buffer.mutex:
+            entries = self.buffer.queue
+            while entries and entries[0][1] is not None and entries[0][1] < idle_since:
+                entries.popleft()
+                dropped += 1
+        telemetry.pcm_queue_depth.set(self.buffer.qsize(), str(self.channel_id))
+        if dropped:
+            self.logger.info(f"Dropped {dropped} stale audio chunks on channel {self.channel_id}")
+
     def stop(self):
         self.logger.info(f"Stopping Riva thread for channel {self.channel_id}")
         self._kill.set()
@@ -306,6 +341,7 @@ class RivaThread(threading.Thread):
 
                 if result.is_final:
                     is_final = True
+                    self._record_transcript_latency(result.audio_processed)
                     self._export_final_transcript(transcript)
                 else:
                     partial_transcript += transcript
@@ -330,17 +366,53 @@ class RivaThread(threading.Thread):
         )
         return streaming_config
 
+    def _track_audio(self, audio, rx_time):
+        """Remember when the audio sent to Riva was received over the air"""
+        with self._audio_lock:
+            self._audio_sent_sec += len(audio) / 2 / self.params["sample_rate"]
+            if rx_time is not None:
+                self._audio_rx_times.append((self._audio_sent_sec, rx_time))
+
+    def _record_transcript_latency(self, audio_processed):
+        """Observe the air-to-transcript latency of a final transcript
+
+        `audio_processed` is the stream position, in seconds, up to which Riva
+        processed the audio. The latency is measured from the receipt of the
+        chunk that contains that position.
+        """
+        if not audio_processed:
+            return
+        with self._audio_lock:
+            while self._audio_rx_times and self._audio_rx_times[0][0] < audio_processed:
+                self._audio_rx_times.popleft()
+            if not self._audio_rx_times:
+                return
+            rx_time = self._audio_rx_times[0][1]
+        telemetry.air_to_transcript_seconds.observe(
+            telemetry.now() - rx_time, str(self.channel_id)
+        )
+
     def _request_generator(self):
+        with self._audio_lock:
+            self._audio_sent_sec = 0.0
+            self._audio_rx_times.clear()
         yield rasr.StreamingRecognizeRequest(streaming_config=self._riva_config)
+        idle_sec = 0
         while not self._kill.is_set():
             try:
-                yield rasr.StreamingRecognizeRequest(
-                    audio_content=self.buffer.get(timeout=self._buffer_get_timeout)
-                )
+                audio, rx_time = self.buffer.get(timeout=self._buffer_poll_sec)
+                idle_sec = 0
+                telemetry.pcm_queue_depth.set(self.buffer.qsize(), str(self.channel_id))
+                self._track_audio(audio, rx_time)
+                yield rasr.StreamingRecognizeRequest(audio_content=audio)
             except QueueEmptyException:
                 # Timeout reached. If there is no timeout, the Riva gRPC connection
                 # seems to 'forget' about the StreamingRecognizeRequest and throws an
                 # error because the first request doesn't specify the START flag.
+                # A channel the spectrum scanner deactivated ends its stream right away.
+                idle_sec += self._buffer_poll_sec
+                if idle_sec < self._buffer_get_timeout and spectrum.channel_active(self.channel_id):
+                    continue
                 break
             except Exception as e:
                 if self._kill.is_set():
@@ -0,0 +1,211 @@
+######################################################################################################
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: LicenseRef-NvidiaProprietary
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+######################################################################################################
+
+"""
+Spectrum activity scanning for the SDR pipeline
+Estimates the power of every channel from the wideband burst and runs the decode chain
+and Riva stream of a channel only while something is on the air, configured from the
+`spectrum` section of the parameter file
+"""
+import threading
+import time
+
+import numpy as np
+
+import dsp
+import telemetry
+from common import setup_logging
+
+logger = setup_logging(__name__)
+
+
+class ChannelScheduler:
+    """Activates and deactivates channels from their power above the noise floor
+
+    A channel is activated once its smoothed SNR stays at or above `on_db` for
+    `attack_bursts` consecutive scans, and deactivated once it stays below
+    `off_db` for `hold_sec`. The gap between the two thresholds and the hold
+    time keep a channel up through pauses in speech. With `max_active`, at most
+    that many channels run at once: the strongest candidates are activated
+    first, and active channels are never preempted.
+    """
+    def __init__(
+        self,
+        num_channels,
+        on_db=8.0,
+        off_db=4.0,
+        attack_bursts=2,
+        hold_sec=10.0,
+        smoothing=0.5,
+        max_active=0,
+    ):
+        if off_db > on_db:
+            raise ValueError(f"off_db ({off_db}) must not be above on_db ({on_db})")
+        self.num_channels = num_channels
+        self.on_db = on_db
+        self.off_db = off_db
+        self.attack_bursts = attack_bursts
+        self.hold_sec = hold_sec
+        self.smoothing = smoothing
+        self.max_active = max_active or num_channels
+        self.snr_db = np.full(num_channels, np.nan)
+        self._above = np.zeros(num_channels, dtype=int)
+        self._last_busy = np.zeros(num_channels)
+        self._deactivations = np.zeros(num_channels, dtype=int)
+        self._active = [threading.Event() for _ in range(num_channels)]
+        self._lock = threading.Lock()
+
+    def update(self, snr_db, now=None):
+        """Feed the SNR of every channel from one scan
+
+        Returns the channels activated and deactivated by it.
+        """
+        now = time.monotonic() if now is None else now
+        snr_db = np.asarray(snr_db, dtype=float)
+        with self._lock:
+            first = np.isnan(self.snr_db)
+            self.snr_db = np.where(
+                first, snr_db, self.smoothing * snr_db + (1 - self.smoothing) * self.snr_db
+            )
+            self._above = np.where(self.snr_db >= self.on_db, self._above + 1, 0)
+            self._last_busy[self.snr_db >= self.off_db] = now
+
+            active = np.array([event.is_set() for event in self._active])
+            deactivated = [
+                ch for ch in np.flatnonzero(active)
+                if now - self._last_busy[ch] >= self.hold_sec
+            ]
+            for ch in deactivated:
+                self._active[ch].clear()
+                self._deactivations[ch] += 1
+                active[ch] = False
+
+            candidates = np.flatnonzero(~active & (self._above >= self.attack_bursts))
+            slots = max(self.max_active - int(active.sum()), 0)
+            strongest = candidates[np.argsort(-self.snr_db[candidates])][:slots]
+            activated = sorted(int(ch) for ch in strongest)
+            for ch in activated:
+                self._last_busy[ch] = now
+                self._active[ch].set()
+
+        for ch in range(self.num_channels):
+            telemetry.channel_snr_db.set(float(self.snr_db[ch]), str(ch))
+            telemetry.channel_active.set(int(self._active[ch].is_set()), str(ch))
+        for ch in activated:
+            telemetry.channel_activations.inc(1, str(ch))
+            logger.info(f"Channel {ch} active ({self.snr_db[ch]:.1f} dB above the noise floor)")
+        for ch in deactivated:
+            logger.info(f"Channel {ch} idle for {self.hold_sec:g}s, stopping its decode chain")
+        return activated, [int(ch) for ch in deactivated]
+
+    def is_active(self, channel):
+        return self._active[channel].is_set()
+
+    def active_channels(self):
+        return [ch for ch, event in enumerate(self._active) if event.is_set()]
+
+    def deactivations(self, channel):
+        """Number of times the channel went idle"""
+        return int(self._deactivations[channel])
+
+    def wait_active(self, channel, timeout=None):
+        """Block until the channel is active or `timeout` passes, returning whether it is"""
+        return self._active[channel].wait(timeout)
+
+
+class SpectrumScanner:
+    """Welch power estimate of the wideband burst, reduced to the SNR of every channel"""
+    def __init__(self, scheduler, freq_offsets, sample_rate, nfft=1024, bandwidth=150_000,
+                 scan_every=1):
+        self.scheduler = scheduler
+        self.freq_offsets = freq_offsets
+        self.nfft = int(nfft)
+        self.bandwidth = float(bandwidth)
+        self.scan_every = max(int(scan_every), 1)
+        self._bursts = 0
+        self.set_sample_rate(sample_rate)
+
+    def set_sample_rate(self, sample_rate):
+        self.sample_rate = float(sample_rate)
+        self.lo, self.hi = dsp.channel_bins(
+            self.freq_offsets, self.bandwidth, self.sample_rate, self.nfft
+        )
+
+    def scan(self, signal):
+        """Update the scheduler from a burst, every `scan_every` bursts"""
+        self._bursts += 1
+        if (self._bursts - 1) % self.scan_every:
+            return
+        psd = dsp.welch_psd(signal, self.nfft)
+        snr_db = dsp.to_numpy(dsp.channel_snr_db(psd, self.lo, self.hi))
+        self.scheduler.update(snr_db)
+
+
+_scheduler = None
+_params = {}
+
+
+def configure(params, num_channels):
+    """Apply the `spectrum` section of the parameter file, returning the scheduler
+    or None when scanning is disabled and every channel always runs"""
+    global _scheduler, _params
+    _params = dict(params or {})
+    if not _params.get("enabled", False):
+        _scheduler = None
+        return None
+    _scheduler = ChannelScheduler(
+        num_channels,
+        on_db=float(_params.get("on_db", 8.0)),
+        off_db=float(_params.get("off_db", 4.0)),
+        attack_bursts=int(_params.get("attack_bursts", 2)),
+        hold_sec=float(_params.get("hold_sec", 10.0)),
+        smoothing=float(_params.get("smoothing", 0.5)),
+        max_active=int(_params.get("max_active", 0)),
+    )
+    logger.info(
+        f"Scanning {num_channels} channels, activating at {_scheduler.on_db:g} dB above "
+        f"the noise floor, releasing below {_scheduler.off_db:g} dB after {_scheduler.hold_sec:g}s"
+    )
+    return _scheduler
+
+
+def get_scheduler():
+    return _scheduler
+
+
+def make_scanner(freq_offsets, sample_rate):
+    """Scanner feeding the configured scheduler, None when scanning is disabled"""
+    if _scheduler is None:
+        return None
+    return SpectrumScanner(
+        _scheduler,
+        freq_offsets,
+        sample_rate,
+        nfft=_params.get("nfft", 1024),
+        bandwidth=_params.get("bandwidth", 150_000),
+        scan_every=_params.get("scan_every", 1),
+    )
+
+
+def channel_active(channel):
+    """Whether the channel's decode chain should run, always True without scanning"""
+    return _scheduler is None or _scheduler.is_active(channel)
+
+
+def deactivations(channel):
+    """Number of times the channel went idle, always 0 without scanning"""
+    return 0 if _scheduler is None else _scheduler.deactivations(channel)
+
+
+def wait_active(channel, timeout=None):
+    """Block until the channel should be decoded or `timeout` passes, returning whether it should"""
+    return _scheduler is None or _scheduler.wait_active(channel, timeout)
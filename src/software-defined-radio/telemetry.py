@@ -0,0 +1,390 @@
+######################################################################################################
+# SPDX-FileCopyrightText: Copyright (c) 2024-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: LicenseRef-NvidiaProprietary
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+######################################################################################################
+
+"""
+Telemetry for the SDR pipeline
+Per-operator compute latency, throughput and host/device traffic, PCM queue depths,
+air-to-transcript latency and startup durations, served over HTTP in the Prometheus text
+format, along with a /ready probe
+"""
+import json
+import threading
+import time
+
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from backend import get_backend
+from common import setup_logging
+
+# Seconds per compute() call, from small kernels launches up to a stalled stage
+COMPUTE_BUCKETS = (
+    5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0
+)
+# Seconds from packet receipt to final transcript
+TRANSCRIPT_BUCKETS = (0.25, 0.5, 1.0, 1.5, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 30.0, 60.0)
+# Window over which throughput and utilization gauges are computed
+RATE_WINDOW_SEC = 5.0
+
+logger = setup_logging(__name__)
+
+# Set by `configure`, read by every operator handle
+_config = {"sync_device": False}
+
+# Set once the pipeline listens for samples, served at /ready
+_ready = threading.Event()
+_start_time = time.monotonic()
+
+
+def now():
+    """Clock of the timestamps carried in metadata, comparable within the process"""
+    return time.monotonic()
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, label_names=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _new_value(self):
+        return [0.0]
+
+    def _value(self, labels):
+        value = self._values.get(labels)
+        if value is None:
+            with self._lock:
+                value = self._values.setdefault(labels, self._new_value())
+        return value
+
+    def collect(self):
+        with self._lock:
+            return {labels: list(value) for labels, value in self._values.items()}
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount, *labels):
+        value = self._value(labels)
+        with self._lock:
+            value[0] += amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, amount, *labels):
+        self._value(labels)[0] = amount
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram, values hold the bucket counts, then sum and count"""
+    kind = "histogram"
+
+    def __init__(self, name, help, label_names=(), buckets=COMPUTE_BUCKETS):
+        super().__init__(name, help, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_value(self):
+        return [0] * (len(self.buckets) + 1) + [0.0, 0]
+
+    def observe(self, amount, *labels):
+        value = self._value(labels)
+        with self._lock:
+            value[bisect_left(self.buckets, amount)] += 1
+            value[-2] += amount
+            value[-1] += 1
+
+    def quantile(self, q, value):
+        """Estimate a quantile by interpolating within the bucket that contains it"""
+        count = value[-1]
+        if not count:
+            return None
+        rank = q * count
+        cumulative = 0
+        for i, bucket_count in enumerate(value[:-2]):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                if i == len(self.buckets):
+                    return lower
+                upper = self.buckets[i]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for labels, value in sorted(metric.collect().items()):
+                pairs = list(zip(metric.label_names, labels))
+                if metric.kind != "histogram":
+                    lines.append(f"{metric.name}{_format_labels(pairs)} {value[0]}")
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(metric.buckets + ("+Inf",), value[:-2]):
+                    cumulative += bucket_count
+                    le = bound if bound == "+Inf" else repr(float(bound))
+                    lines.append(
+                        f"{metric.name}_bucket{_format_labels(pairs + [('le', le)])} {cumulative}"
+                    )
+                lines.append(f"{metric.name}_sum{_format_labels(pairs)} {value[-2]}")
+                lines.append(f"{metric.name}_count{_format_labels(pairs)} {value[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+registry = Registry()
+
+compute_seconds = registry.add(Histogram(
+    "sdr_operator_compute_seconds",
+    "Duration of operator compute() calls in seconds",
+    ("operator", "channel"),
+    COMPUTE_BUCKETS
+))
+samples_total = registry.add(Counter(
+    "sdr_operator_samples_total",
+    "Samples processed by the operator",
+    ("operator", "channel")
+))
+samples_per_second = registry.add(Gauge(
+    "sdr_operator_samples_per_second",
+    f"Samples processed per second over the last {RATE_WINDOW_SEC:g}s window",
+    ("operator", "channel")
+))
+utilization = registry.add(Gauge(
+    "sdr_operator_utilization",
+    f"Fraction of wall time spent in compute() over the last {RATE_WINDOW_SEC:g}s window",
+    ("operator", "channel")
+))
+host_to_device_bytes = registry.add(Counter(
+    "sdr_host_to_device_bytes_total",
+    "Bytes copied from host to device memory",
+    ("operator", "channel")
+))
+device_to_host_bytes = registry.add(Counter(
+    "sdr_device_to_host_bytes_total",
+    "Bytes copied from device to host memory",
+    ("operator", "channel")
+))
+network_rx_bytes = registry.add(Counter(
+    "sdr_network_rx_bytes_total",
+    "Bytes received from the network, headers included",
+    ()
+))
+pcm_queue_depth = registry.add(Gauge(
+    "sdr_pcm_queue_depth",
+    "PCM chunks waiting to be streamed to Riva",
+    ("channel",)
+))
+channel_active = registry.add(Gauge(
+    "sdr_channel_active",
+    "1 while the channel is decoded, 0 while the spectrum scanner holds it idle",
+    ("channel",)
+))
+channel_snr_db = registry.add(Gauge(
+    "sdr_channel_snr_db",
+    "Smoothed power of the channel above the noise floor of the band, in dB",
+    ("channel",)
+))
+channel_activations = registry.add(Counter(
+    "sdr_channel_activations_total",
+    "Times the spectrum scanner started the channel's decode chain",
+    ("channel",)
+))
+startup_seconds = registry.add(Gauge(
+    "sdr_startup_seconds",
+    "Duration of the startup phases: kernel warmup, dependency readiness and time to ready",
+    ("phase",)
+))
+air_to_transcript_seconds = registry.add(Histogram(
+    "sdr_air_to_transcript_seconds",
+    "Time from receipt of the audio's packets to its final Riva transcript",
+    ("channel",),
+    TRANSCRIPT_BUCKETS
+))
+
+
+class OperatorTelemetry:
+    """
+    Telemetry handle of one operator instance.
+
+    Wrap the work of `compute` in `with self.telemetry.measure(nsamples):`. On the
+    CuPy backend kernels launch asynchronously, so by default the GPU time of a
+    stage shows up in the first downstream stage that waits on the device.
+    Configure with `sync_device` to synchronize at the end of every measurement
+    instead, which attributes GPU time to the right operator at the cost of some
+    overlap.
+    """
+    def __init__(self, operator, channel=None):
+        self.labels = (operator, "" if channel is None else str(channel))
+        self._nsamples = 0
+        self._start = None
+        self._window_start = now()
+        self._window_samples = 0
+        self._window_busy = 0.0
+
+    def measure(self, nsamples=0):
+        self._nsamples = nsamples
+        return self
+
+    def count(self, nsamples):
+        """Set the samples of the current measurement, once they are known"""
+        self._nsamples = nsamples
+
+    def __enter__(self):
+        self._start = now()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if _config["sync_device"]:
+            get_backend().synchronize()
+        end = now()
+        elapsed = end - self._start
+        compute_seconds.observe(elapsed, *self.labels)
+        if self._nsamples:
+            samples_total.inc(self._nsamples, *self.labels)
+
+        # Update the windowed gauges
+        self._window_samples += self._nsamples
+        self._window_busy += elapsed
+        window = end - self._window_start
+        if window >= RATE_WINDOW_SEC:
+            samples_per_second.set(self._window_samples / window, *self.labels)
+            utilization.set(self._window_busy / window, *self.labels)
+            self._window_start = end
+            self._window_samples = 0
+            self._window_busy = 0.0
+        return False
+
+    def host_to_device(self, nbytes):
+        host_to_device_bytes.inc(nbytes, *self.labels)
+
+    def device_to_host(self, nbytes):
+        device_to_host_bytes.inc(nbytes, *self.labels)
+
+
+def summary():
+    """Per-stage latency, throughput and utilization, busiest stage first"""
+    throughput = samples_per_second.collect()
+    busy = utilization.collect()
+    stages = []
+    for labels, value in compute_seconds.collect().items():
+        if not value[-1]:
+            continue
+        p50 = compute_seconds.quantile(0.5, value)
+        p99 = compute_seconds.quantile(0.99, value)
+        stages.append({
+            "operator": labels[0],
+            "channel": labels[1],
+            "calls": value[-1],
+            "mean_ms": 1e3 * value[-2] / value[-1],
+            "p50_ms": 1e3 * p50,
+            "p99_ms": 1e3 * p99,
+            "samples_per_second": throughput.get(labels, [None])[0],
+            "utilization": busy.get(labels, [None])[0],
+        })
+    stages.sort(key=lambda s: s["utilization"] or 0.0, reverse=True)
+
+    channels = {}
+    for labels, value in pcm_queue_depth.collect().items():
+        channels.setdefault(labels[0], {})["pcm_queue_depth"] = value[0]
+    for labels, value in air_to_transcript_seconds.collect().items():
+        if value[-1]:
+            channels.setdefault(labels[0], {}).update({
+                "transcripts": value[-1],
+                "air_to_transcript_p50_sec": air_to_transcript_seconds.quantile(0.5, value),
+                "air_to_transcript_p99_sec": air_to_transcript_seconds.quantile(0.99, value),
+            })
+    return {"stages": stages, "channels": channels}
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path in ("/metrics", "/metrics.json") and not self.server.serve_metrics:
+            self.send_error(404, "Telemetry disabled")
+            return
+        if path == "/metrics":
+            body = registry.render_prometheus()
+            content_type = "text/plain; version=0.0.4"
+        elif path == "/metrics.json":
+            body = json.dumps(summary(), indent=2)
+            content_type = "application/json"
+        elif path == "/ready":
+            if not _ready.is_set():
+                self.send_error(503, "Starting")
+                return
+            body = "ready"
+            content_type = "text/plain"
+        else:
+            self.send_error(404)
+            return
+        body = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def configure(params):
+    """Apply the `telemetry` section of the parameter file"""
+    _config["sync_device"] = bool(params.get("sync_device", False))
+
+
+def mark_ready():
+    """Report the pipeline ready at /ready, recording the time since the process started"""
+    if not _ready.is_set():
+        elapsed = time.monotonic() - _start_time
+        startup_seconds.set(elapsed, "ready")
+        _ready.set()
+        logger.info(f"Ready after {elapsed:.1f}s")
+
+
+def start_server(port, host="0.0.0.0", metrics=True):
+    """Serve /ready, and /metrics and /metrics.json unless `metrics` is False,
+    from a daemon thread"""
+    server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+    server.daemon_threads = True
+    server.serve_metrics = metrics
+    thread = threading.Thread(target=server.serve_forever, name="sdr-telemetry", daemon=True)
+    thread.start()
+    if metrics:
+        logger.info(f"Serving telemetry on http://{host}:{port}/metrics")
+    else:
+        logger.info(f"Serving readiness on http://{host}:{port}/ready")
+    return server